@@ -0,0 +1,184 @@
+"""
+API админ-панели: просмотр заявок.
+"""
+import secrets
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from ..core.config import settings
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Проверяет токен администратора (заголовок X-Admin-Token)."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Админ-API отключён")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Неверный токен администратора")
+
+
+def get_repository():
+    """Репозиторий заявок (переопределяется в тестах)."""
+    from ..db.repository import application_repository
+    return application_repository
+
+
+def serialize_application(application) -> Dict[str, Any]:
+    """Заявка для ответа API."""
+    return {
+        "id": application.id,
+        "created_at": application.created_at.isoformat(),
+        "user_type": application.user_type,
+        "session_id": application.session_id,
+        "phone": application.phone,
+        "name": application.name,
+        "company_name": application.company_name,
+        "collateral": application.collateral,
+        "purpose": application.purpose,
+        "amount": application.amount,
+        "term_months": application.term_months,
+        "duplicate_of": application.duplicate_of,
+    }
+
+
+def get_funnel_recorder():
+    """Счётчики воронки диалога (переопределяются в тестах)."""
+    from ..core.dialog_manager import dialog_manager
+    return dialog_manager.funnel_recorder
+
+
+def get_transcript_log():
+    """Журнал переписки (переопределяется в тестах)."""
+    from ..core.dialog_manager import dialog_manager
+    return dialog_manager.transcript_log
+
+
+def application_filter(
+    user_type: Optional[str] = Query(None, pattern="^(individual|business|investor)$"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    amount_min: Optional[int] = Query(None, ge=0),
+    amount_max: Optional[int] = Query(None, ge=0),
+):
+    """Фильтры заявок из параметров запроса."""
+    from ..db.repository import ApplicationFilter
+
+    return ApplicationFilter(
+        user_type=user_type,
+        created_from=created_from,
+        created_to=created_to,
+        amount_min=amount_min,
+        amount_max=amount_max,
+    )
+
+
+@router.get("/applications", dependencies=[Depends(require_admin)])
+def list_applications(
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = None,
+    filters=Depends(application_filter),
+    repository=Depends(get_repository),
+):
+    """
+    Список заявок от новых к старым с пагинацией по курсору.
+
+    Для следующей страницы передайте next_cursor из предыдущего ответа.
+    """
+    try:
+        items, next_cursor = repository.list_applications(
+            filters, limit=min(limit, settings.admin_page_size_max), cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "items": [serialize_application(item) for item in items],
+        "next_cursor": next_cursor,
+        "count_estimate": repository.estimate_count(filters, cap=settings.admin_count_cap),
+    }
+
+
+@router.get("/funnel", dependencies=[Depends(require_admin)])
+def get_funnel(
+    hours: Optional[int] = Query(None, ge=1, le=settings.funnel_memory_hours),
+    recorder=Depends(get_funnel_recorder),
+):
+    """
+    Воронка диалога по шагам сценариев.
+
+    Без hours - за всё время, иначе - за последние hours часов.
+    """
+    return recorder.report(hours)
+
+
+@router.get("/transcripts/{session_id}", dependencies=[Depends(require_admin)])
+def get_transcript(session_id: str, log=Depends(get_transcript_log)):
+    """Переписка сессии (за срок хранения data_retention_hours)."""
+    records = log.get_transcript(session_id)
+    if not records:
+        raise HTTPException(status_code=404, detail="Переписка не найдена")
+
+    return {"session_id": session_id, "records": records}
+
+
+@router.get("/export/applications", dependencies=[Depends(require_admin)])
+def export_applications(
+    format: str = Query("csv", pattern="^(csv|jsonl)$"),
+    include_data: bool = False,
+    filters=Depends(application_filter),
+    repository=Depends(get_repository),
+):
+    """
+    Потоковая выгрузка заявок (от старых к новым) в CSV или JSON Lines.
+
+    include_data добавляет все собранные в диалоге данные заявки.
+    """
+    from ..db.export import EXPORT_FORMATS, export_applications as export_rows
+
+    filename = f"applications-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        export_rows(repository, format, filters, include_data=include_data),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export/transcripts", dependencies=[Depends(require_admin)])
+def export_transcripts(
+    format: str = Query("jsonl", pattern="^(csv|jsonl)$"),
+    log=Depends(get_transcript_log),
+):
+    """Потоковая выгрузка журнала переписки в CSV или JSON Lines."""
+    from ..db.export import EXPORT_FORMATS, export_transcripts as export_records
+
+    filename = f"transcripts-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        export_records(log, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/profile", dependencies=[Depends(require_admin)], response_class=PlainTextResponse)
+def profile(
+    seconds: float = Query(10, gt=0, le=settings.profiler_max_seconds),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    idle: bool = False,
+):
+    """
+    Сэмплирующий профиль процесса за seconds секунд в формате collapsed stacks.
+
+    Результат открывается в speedscope или flamegraph.pl. idle добавляет
+    стеки потоков, ожидающих работы. Одновременно выполняется один замер.
+    """
+    from ..core.profiler import ProfilerBusy, collapsed, profiler
+
+    try:
+        stacks = profiler.profile(seconds, interval=interval_ms / 1000, include_idle=idle)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="Профилирование уже выполняется")
+    return PlainTextResponse(collapsed(stacks))
@@ -1,12 +1,16 @@
 """
 API endpoints для чат-виджета.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Optional
 
 # Используем относительные импорты
+from ..core.config import settings
 from ..core.dialog_manager import dialog_manager
+from ..core.rate_limit import RateLimited, rate_limiter
+from .lifespan import accepting_chats
+from .responses import ChatJSONResponse
 
 router = APIRouter(prefix="/api/v1", tags=["chat"])
 
@@ -27,11 +31,41 @@ class ChatResponse(BaseModel):
     completed: bool = False
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def process_chat_message(request: ChatRequest):
+def client_address(request: Request) -> str:
+    """Адрес клиента (за своим прокси - последний адрес в X-Forwarded-For)."""
+    if settings.rate_limit_trust_forwarded:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else ""
+
+
+def too_many_requests(e: RateLimited) -> HTTPException:
+    return HTTPException(status_code=429, detail="Слишком много запросов, повторите позже",
+                         headers={"Retry-After": e.retry_after_header})
+
+
+def limit_client(request: Request) -> str:
+    """Зависимость маршрутов чата: лимит запросов с адреса. Возвращает адрес клиента."""
+    client = client_address(request)
+    try:
+        rate_limiter.check_client(client)
+    except RateLimited as e:
+        raise too_many_requests(e)
+    return client
+
+
+@router.post("/chat", response_model=ChatResponse, response_class=ChatJSONResponse,
+             dependencies=[Depends(accepting_chats)])
+async def process_chat_message(request: ChatRequest, client: str = Depends(limit_client)):
     """
     Обрабатывает сообщение пользователя и возвращает ответ ИИ.
     """
+    try:
+        rate_limiter.check_session(request.session_id)
+    except RateLimited as e:
+        raise too_many_requests(e)
+
     try:
         # Обработка действия перезапуска
         if request.action == "restart" and request.session_id:
@@ -42,11 +76,15 @@ async def process_chat_message(request: ChatRequest):
         # Обработка сообщения
         result = dialog_manager.process_user_message(
             request.session_id or "",
-            request.message or ""
+            request.message or "",
+            client=client
         )
 
-        return ChatResponse(**result)
+        # Модель валидируется один раз, дальше ответ сериализуется напрямую
+        return ChatJSONResponse(ChatResponse(**result))
 
+    except RateLimited as e:
+        raise too_many_requests(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка обработки сообщения: {str(e)}")
 
@@ -70,7 +108,8 @@ async def get_chat_state(session_id: str):
     }
 
 
-@router.post("/chat/quick-start")
+@router.post("/chat/quick-start", response_model=ChatResponse, response_class=ChatJSONResponse,
+             dependencies=[Depends(accepting_chats), Depends(limit_client)])
 async def quick_start_dialog(option: str):
     """
     Быстрый старт диалога с выбранной опцией.
@@ -89,4 +128,4 @@ async def quick_start_dialog(option: str):
     elif option == "investor":
         result = dialog_manager.process_user_message(result["session_id"], "Инвестировать")
 
-    return ChatResponse(**result)
\ No newline at end of file
+    return ChatJSONResponse(ChatResponse(**result))
\ No newline at end of file
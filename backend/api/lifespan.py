@@ -0,0 +1,77 @@
+"""
+Запуск и остановка приложения.
+
+При запуске выполняется ленивая инициализация (сценарии, соединения
+с Telegram, база, журналы), и только потом приложение принимает
+запросы. При остановке новые сообщения чата отклоняются с 503, а
+очереди уведомлений и журналов дописываются в пределах срока.
+"""
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.dialog_manager import dialog_manager
+from ..core.readiness import create_readiness_checker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AppState:
+    """Состояние процесса приложения."""
+    accepting: bool = True   # принимать сообщения чата
+    ready: bool = False      # подготовка при запуске завершена
+    warmup: Dict[str, float] = field(default_factory=dict)
+
+
+app_state = AppState()
+
+# Проверки каналов и хранилищ для /ready (обновляются в фоне)
+readiness = create_readiness_checker(dialog_manager)
+
+
+def readiness_status() -> Tuple[bool, Dict[str, Dict[str, object]]]:
+    """Готовность: подготовка завершена, остановка не начата, проверки пройдены."""
+    ready, checks = readiness.status()
+    return ready and app_state.ready, checks
+
+
+def accepting_chats():
+    """Зависимость маршрутов чата: во время остановки - 503."""
+    if not app_state.accepting:
+        raise HTTPException(status_code=503, detail="Сервис перезапускается, повторите запрос позже",
+                            headers={"Retry-After": "5"})
+
+
+async def start_up():
+    if settings.warmup_enabled:
+        app_state.warmup = await run_in_threadpool(dialog_manager.warm_up)
+        logger.info("Подготовка завершена: %s", app_state.warmup)
+    # Первые результаты проверок - до того, как оркестратор начнёт слать трафик
+    await run_in_threadpool(readiness.refresh)
+    readiness.start()
+    app_state.accepting = True
+    app_state.ready = True
+
+
+async def shut_down():
+    app_state.ready = False
+    app_state.accepting = False
+    readiness.close()
+    timeout = settings.shutdown_timeout_seconds
+    if await run_in_threadpool(dialog_manager.close, timeout):
+        logger.info("Очереди дописаны, приложение остановлено")
+    else:
+        logger.error("Очереди не дописаны за %s с, часть данных потеряна", timeout)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await start_up()
+    yield
+    await shut_down()
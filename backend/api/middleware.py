@@ -0,0 +1,114 @@
+"""
+ASGI-middleware приложения.
+
+Все middleware работают на уровне ASGI (без BaseHTTPMiddleware), чтобы
+не создавать объекты запроса и не копировать тело ответа.
+"""
+import time
+from typing import Dict, Iterable, Optional
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Route, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import settings
+from ..core.tracing import server_timing, trace
+
+# Маршруты виджета на сайте (путь и вложенные пути): единственные, которым нужен CORS
+WIDGET_PATHS = ("/api/v1/chat",)
+
+# Служебные маршруты для проб: без middleware
+BYPASS_PATHS = frozenset({"/health", "/ready"})
+
+
+class WidgetCORSMiddleware:
+    """
+    CORS только для маршрутов виджета: путь совпадает с одним из paths
+    или вложен в него ("/api/v1/chat/state/..."), но не "/api/v1/chatty".
+
+    Остальные запросы передаются приложению без проверки заголовков.
+    Предварительные запросы кэшируются браузером на max_age секунд.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Iterable[str],
+                 paths: Iterable[str] = WIDGET_PATHS, max_age: int = 600):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.prefixes = tuple(path + "/" for path in self.paths)
+        self.cors = CORSMiddleware(
+            app,
+            allow_origins=list(allow_origins),
+            allow_methods=["GET", "POST"],
+            allow_headers=["Content-Type"],
+            max_age=max_age,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and (scope["path"] in self.paths or scope["path"].startswith(self.prefixes)):
+            await self.cors(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+class TraceMiddleware:
+    """
+    Трассировка запросов с заголовком X-Trace (при TRACE_ENABLED).
+
+    Время этапов обработки возвращается в заголовке Server-Timing ответа
+    (видно во вкладке Network инструментов разработчика браузера).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (scope["type"] != "http" or not settings.trace_enabled
+                or not any(name == b"x-trace" for name, _ in scope["headers"])):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with trace() as spans:
+            async def send_with_timing(message: Message):
+                if message["type"] == "http.response.start":
+                    header = server_timing(spans, time.perf_counter() - started)
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+
+class BypassMiddleware:
+    """
+    Передаёт запросы к служебным маршрутам сразу обработчику маршрута.
+
+    Должен быть добавлен последним (внешним), тогда пробы не проходят
+    через остальные middleware и перебор маршрутов роутера.
+    """
+
+    def __init__(self, app: ASGIApp, router: Router, paths: Iterable[str] = BYPASS_PATHS):
+        self.app = app
+        self.router = router
+        self.paths = frozenset(paths)
+        self._routes: Optional[Dict[str, Route]] = None
+
+    def _resolve(self) -> Dict[str, Route]:
+        # Маршруты регистрируются после создания middleware, поэтому ищем при первом запросе
+        if self._routes is None:
+            self._routes = {
+                route.path: route for route in self.router.routes
+                if isinstance(route, Route) and route.path in self.paths
+            }
+        return self._routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["path"] in self.paths:
+            route = self._resolve().get(scope["path"])
+            # Ошибки (404, 405) обрабатывает приложение целиком
+            if route is not None and (route.methods is None or scope["method"] in route.methods):
+                scope["router"] = self.router
+                scope["path_params"] = {}
+                scope["endpoint"] = route.endpoint
+                await route.handle(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,90 @@
+"""
+Быстрая сериализация ответов чат-виджета.
+"""
+import json
+from typing import Any, Dict, Tuple
+
+from fastapi.responses import Response
+
+from ..core.scenario_manager import scenario_manager, DialogStep
+
+try:
+    import orjson
+except ImportError:  # orjson опционален, без него работаем на стандартном json
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """Сериализует значение в JSON (через orjson, если он установлен)."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class StepPayloadCache:
+    """
+    Заранее сериализованные фрагменты ответа для каждого шага диалога.
+
+    Для шагов с постоянным текстом сообщение и варианты ответов
+    сериализуются один раз, на запросе остаётся только склеить байты.
+    """
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+        # step -> (message, options, префикс с message/options, суффикс со step)
+        self._payloads: Dict[str, Tuple[str, list, bytes, bytes]] = {}
+        self._suffixes: Dict[str, bytes] = {}
+        self.build()
+
+    def build(self):
+        """Пересобирает кэш по текущим текстам сценария."""
+        self._payloads.clear()
+        self._suffixes.clear()
+
+        for step in DialogStep:
+            suffix = b',"step":' + dumps(step.value) + b',"completed":'
+            self._suffixes[step.value] = suffix
+
+            message = self.scenario.get_static_message(step)
+            if message is None:
+                # Шаблонные сообщения (подтверждение) зависят от данных сессии
+                continue
+
+            options = list(self.scenario.get_options(step))
+            prefix = b'{"message":' + dumps(message) + b',"options":' + dumps(options)
+            self._payloads[step.value] = (message, options, prefix, suffix)
+
+    def render(self, message: str, options: list, session_id: str,
+               step: str, completed: bool) -> bytes:
+        """Собирает JSON ответа, используя готовые фрагменты там, где возможно."""
+        cached = self._payloads.get(step)
+
+        if cached is not None and cached[0] == message and cached[1] == options:
+            prefix, suffix = cached[2], cached[3]
+        else:
+            prefix = b'{"message":' + dumps(message) + b',"options":' + dumps(options)
+            suffix = self._suffixes.get(step) or (b',"step":' + dumps(step) + b',"completed":')
+
+        return (prefix + b',"session_id":' + dumps(session_id) + suffix +
+                (b"true}" if completed else b"false}"))
+
+
+class ChatJSONResponse(Response):
+    """
+    Ответ чат-виджета с быстрой сериализацией.
+
+    Принимает уже провалидированную модель ChatResponse: FastAPI не
+    выполняет повторную валидацию по response_model для экземпляров Response.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return step_payloads.render(
+            content.message, content.options, content.session_id,
+            content.step, content.completed
+        )
+
+
+# Глобальный кэш фрагментов ответов
+step_payloads = StepPayloadCache(scenario_manager)
@@ -0,0 +1,196 @@
+"""
+Маршрутизатор перед воркерами с сессиями в памяти процесса.
+
+Каждый воркер запускается отдельным процессом со своим WORKER_ID и
+портом, ID его сессий начинаются с номера воркера. Маршрутизатор
+определяет сессию запроса (заголовок X-Session-Id, путь
+/api/v1/chat/state/{id} или поле session_id в теле POST /api/v1/chat)
+и передаёт запрос её воркеру. Запросы без сессии распределяются по
+активным воркерам по кругу.
+
+Изменение числа воркеров:
+- добавление: запустить воркеры с новыми номерами и перезапустить
+  маршрутизатор с дополненным списком; сессии остаются на своих воркерах;
+- удаление: перевести воркеры в sticky_draining (они дообслуживают свои
+  сессии, новых не получают), через SESSION_TIMEOUT_MINUTES остановить и
+  убрать из списка. Запросы сессий удалённого воркера уходят активному,
+  и диалог начинается заново.
+
+Адрес клиента передаётся в X-Forwarded-For, воркерам нужен
+RATE_LIMIT_TRUST_FORWARDED=true.
+
+Запуск:
+    WORKER_ID=0 uvicorn backend.main:app --port 8001
+    WORKER_ID=1 uvicorn backend.main:app --port 8002
+    python -m backend.cli sticky-router --upstream http://127.0.0.1:8001 --upstream http://127.0.0.1:8002
+"""
+import itertools
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Union
+
+import httpx
+from starlette.types import Receive, Scope, Send
+
+from ..core.config import settings
+from ..core.sharding import session_worker
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+CHAT_PATH = "/api/v1/chat"
+STATE_PREFIX = "/api/v1/chat/state/"
+SESSION_HEADER = b"x-session-id"
+
+# Заголовки соединения, которые не передаются через прокси
+HOP_HEADERS = frozenset({b"connection", b"keep-alive", b"proxy-connection", b"transfer-encoding",
+                         b"te", b"trailer", b"upgrade", b"host"})
+
+
+def parse_upstreams(items: Iterable[str]) -> Dict[int, str]:
+    """Адреса воркеров: "URL" (номер - позиция в списке) или "номер=URL"."""
+    upstreams = {}
+    for position, item in enumerate(items):
+        worker, separator, url = item.partition("=")
+        if separator and worker.isdigit():
+            upstreams[int(worker)] = url.rstrip("/")
+        else:
+            upstreams[position] = item.rstrip("/")
+    return upstreams
+
+
+class StickyRouter:
+    """ASGI-прокси: запросы сессии - воркеру, создавшему сессию."""
+
+    def __init__(self, upstreams: Union[Dict[int, str], List[str]], draining: Iterable[int] = (),
+                 max_body: int = 64 * 1024, timeout: float = 30.0):
+        self.upstreams = parse_upstreams(upstreams) if isinstance(upstreams, list) else dict(upstreams)
+        self.draining = frozenset(draining)
+        self.active = [worker for worker in sorted(self.upstreams) if worker not in self.draining]
+        if not self.active:
+            raise ValueError("Нет активных воркеров")
+        self.max_body = max_body
+        self.timeout = timeout
+        self._next = itertools.cycle(self.active)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def route(self, method: str, path: str, headers: Dict[bytes, bytes], body: bytes) -> int:
+        """Номер воркера для запроса."""
+        worker = session_worker(self._session_id(method, path, headers, body))
+        if worker is not None and worker in self.upstreams:
+            return worker
+        return next(self._next)
+
+    @staticmethod
+    def _session_id(method: str, path: str, headers: Dict[bytes, bytes], body: bytes) -> Optional[str]:
+        header = headers.get(SESSION_HEADER)
+        if header:
+            return header.decode("latin-1")
+        if path.startswith(STATE_PREFIX):
+            return path[len(STATE_PREFIX):]
+        if method == "POST" and path == CHAT_PATH and body:
+            try:
+                data = orjson.loads(body) if orjson is not None else json.loads(body)
+            except ValueError:
+                return None
+            session_id = data.get("session_id") if isinstance(data, dict) else None
+            return session_id if isinstance(session_id, str) else None
+        return None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Пул соединений с воркерами (создаётся в цикле событий при первом запросе)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=False)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            await _reply(send, 413, b'{"detail":"Request body too large"}')
+            return
+
+        headers = dict(scope["headers"])
+        worker = self.route(scope["method"], scope["path"], headers, body)
+
+        forwarded = [(name, value) for name, value in scope["headers"] if name not in HOP_HEADERS]
+        if scope.get("client"):
+            previous = headers.get(b"x-forwarded-for")
+            client = scope["client"][0].encode("latin-1")
+            forwarded = [(name, value) for name, value in forwarded if name != b"x-forwarded-for"]
+            forwarded.append((b"x-forwarded-for", previous + b", " + client if previous else client))
+
+        url = self.upstreams[worker] + scope["raw_path"].decode("latin-1")
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+
+        request = self.client.build_request(scope["method"], url, headers=forwarded, content=body)
+        try:
+            response = await self.client.send(request, stream=True)
+        except httpx.HTTPError as e:
+            logger.error("Воркер %s недоступен: %s", worker, e)
+            await _reply(send, 502, b'{"detail":"Upstream unavailable"}')
+            return
+
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [(name, value) for name, value in response.headers.raw
+                            if name.lower() not in HOP_HEADERS],
+            })
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            await response.aclose()
+
+    async def _read_body(self, receive: Receive) -> Optional[bytes]:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    async def _lifespan(self, receive: Receive, send: Send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _reply(send: Send, status: int, body: bytes):
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_router() -> StickyRouter:
+    """Маршрутизатор по настройкам STICKY_UPSTREAMS и STICKY_DRAINING."""
+    return StickyRouter(list(settings.sticky_upstreams), draining=settings.sticky_draining)
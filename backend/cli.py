@@ -0,0 +1,174 @@
+"""
+Командная строка обслуживания ИИ-консультанта.
+
+Примеры:
+    python -m backend.cli export --format csv --output leads.csv
+    python -m backend.cli export --format jsonl --from 2024-01-01 --include-data
+    python -m backend.cli export-transcripts --output transcripts.jsonl
+    python -m backend.cli sticky-router --upstream http://127.0.0.1:8001 --upstream http://127.0.0.1:8002
+    python -m backend.cli build-faq-index
+    python -m backend.cli import-leads partner.csv --user-type individual --source partner
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Добавляем путь к проекту для корректных импортов
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.config import settings
+from backend.core.transcripts import TranscriptLog
+from backend.db.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_applications, export_transcripts
+from backend.db.repository import ApplicationFilter, ApplicationRepository
+
+
+def export_command(args) -> int:
+    """Выгружает заявки в файл или stdout."""
+    repository = ApplicationRepository(url=args.database_url)
+    filters = ApplicationFilter(
+        user_type=args.user_type,
+        created_from=args.created_from,
+        created_to=args.created_to,
+    )
+
+    chunks = export_applications(repository, args.format, filters,
+                                 chunk_size=args.chunk_size, include_data=args.include_data)
+    write_chunks(chunks, args.output)
+    return 0
+
+
+def export_transcripts_command(args) -> int:
+    """Выгружает журнал переписки в файл или stdout."""
+    log = TranscriptLog(directory=args.directory)
+    write_chunks(export_transcripts(log, args.format, chunk_size=args.chunk_size), args.output)
+    return 0
+
+
+def sticky_router_command(args) -> int:
+    """Запускает маршрутизатор перед воркерами (сессии остаются на своём воркере)."""
+    import uvicorn
+    from backend.api.sticky_router import StickyRouter
+
+    router = StickyRouter(args.upstream or list(settings.sticky_upstreams),
+                          draining=args.drain if args.drain is not None else settings.sticky_draining)
+    uvicorn.run(router, host=args.host, port=args.port)
+    return 0
+
+
+def build_faq_index_command(args) -> int:
+    """Строит индекс базы знаний заранее (воркеры при запуске читают готовый файл)."""
+    from backend.core.knowledge_base import build_index, faq_files, fingerprint, save_index
+
+    index = build_index(args.docs_dir)
+    save_index(index, args.output, fingerprint(faq_files(args.docs_dir), args.docs_dir))
+    print(f"{len(index)} вопросов, {len(index.postings)} основ -> {args.output}")
+    return 0
+
+
+def import_leads_command(args) -> int:
+    """Импортирует заявки из CSV; код возврата 1, если были строки с ошибками."""
+    from backend.db.lead_import import LeadImporter
+
+    repository = ApplicationRepository(url=args.database_url)
+    notifications = None
+    if args.notify:
+        from backend.integrations.notification_queue import NotificationQueue
+        from backend.utils.telegram_helper import create_notification_service
+
+        service = create_notification_service()
+        notifications = NotificationQueue(lambda: service, max_queue_size=settings.notification_queue_size)
+
+    importer = LeadImporter(repository, notifications, user_type=args.user_type, source=args.source,
+                            chunk_size=args.chunk_size)
+    try:
+        if args.input == "-":
+            report = importer.run(sys.stdin, delimiter=args.delimiter)
+        else:
+            with open(args.input, encoding="utf-8-sig", newline="") as file:
+                report = importer.run(file, delimiter=args.delimiter)
+    except (ValueError, RuntimeError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if notifications is not None:
+            notifications.close()
+
+    for line, field, message in report.errors:
+        print(f"строка {line}, {field}: {message}", file=sys.stderr)
+    print(f"Строк: {report.rows}, загружено: {report.imported}, с ошибками: {report.invalid}, "
+          f"повторов: {report.duplicates}, в уведомлениях: {report.notified} "
+          f"({report.rows_per_second:.0f} строк/с)")
+    return 1 if report.invalid else 0
+
+
+def write_chunks(chunks, output: str):
+    if output == "-":
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+    else:
+        with open(output, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend.cli", description="Обслуживание ИИ-консультанта")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Выгрузка заявок в CSV или JSON Lines")
+    export.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+    export.add_argument("--output", default="-", help="Файл выгрузки (по умолчанию stdout)")
+    export.add_argument("--user-type", choices=("individual", "business", "investor"))
+    export.add_argument("--from", dest="created_from", type=datetime.fromisoformat,
+                        help="Заявки с этой даты (ISO 8601)")
+    export.add_argument("--to", dest="created_to", type=datetime.fromisoformat,
+                        help="Заявки до этой даты (ISO 8601)")
+    export.add_argument("--include-data", action="store_true", help="Добавить все данные диалога")
+    export.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    export.add_argument("--database-url", help="URL базы (по умолчанию из настроек)")
+    export.set_defaults(handler=export_command)
+
+    transcripts = commands.add_parser("export-transcripts", help="Выгрузка журнала переписки")
+    transcripts.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="jsonl")
+    transcripts.add_argument("--output", default="-", help="Файл выгрузки (по умолчанию stdout)")
+    transcripts.add_argument("--directory", default=settings.transcripts_dir, help="Каталог журнала")
+    transcripts.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    transcripts.set_defaults(handler=export_transcripts_command)
+
+    sticky = commands.add_parser("sticky-router", help="Маршрутизатор запросов сессии к её воркеру")
+    sticky.add_argument("--upstream", action="append",
+                        help="Адрес воркера: URL (номер - позиция) или номер=URL; по умолчанию STICKY_UPSTREAMS")
+    sticky.add_argument("--drain", type=int, action="append",
+                        help="Номер воркера, который только дообслуживает свои сессии")
+    sticky.add_argument("--host", default="0.0.0.0")
+    sticky.add_argument("--port", type=int, default=8000)
+    sticky.set_defaults(handler=sticky_router_command)
+
+    leads = commands.add_parser("import-leads", help="Импорт заявок партнёров из CSV")
+    leads.add_argument("input", help="CSV-файл (- для stdin)")
+    leads.add_argument("--user-type", choices=("individual", "business", "investor"),
+                       help="Тип заявок, если в файле нет столбца user_type")
+    leads.add_argument("--source", default="import", help="Источник заявок (имя партнёра)")
+    leads.add_argument("--delimiter", help="Разделитель столбцов (по умолчанию - по заголовку)")
+    leads.add_argument("--chunk-size", type=int, default=settings.import_chunk_size)
+    leads.add_argument("--no-notify", dest="notify", action="store_false", help="Без уведомлений о заявках")
+    leads.add_argument("--database-url", help="URL базы (по умолчанию из настроек)")
+    leads.set_defaults(handler=import_leads_command)
+
+    faq = commands.add_parser("build-faq-index", help="Индекс базы знаний для ответов на вопросы")
+    faq.add_argument("--docs-dir", default=settings.faq_docs_dir, help="Каталог Markdown-файлов с вопросами")
+    faq.add_argument("--output", default=settings.faq_index_path, help="Файл индекса")
+    faq.set_defaults(handler=build_faq_index_command)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,8 @@
 """
-Ленивая загрузка настроек.
-"""
-from backend.core.config import Settings
+Доступ к настройкам (совместимость со старым импортом).
 
-# Ленивая загрузка настроек
-_settings_instance = None
+Настройки создаются один раз в backend.core.config.
+"""
+from backend.core.config import Settings, get_settings
 
-def get_settings() -> Settings:
-    """Возвращает экземпляр настроек (синглтон)."""
-    global _settings_instance
-    if _settings_instance is None:
-        _settings_instance = Settings()
-    return _settings_instance
\ No newline at end of file
+__all__ = ["Settings", "get_settings"]
@@ -1,9 +1,31 @@
 """
 Пакет ядра диалоговой системы.
+
+Объекты загружаются при первом обращении, поэтому импорт
+backend.core.config (CLI, миграции, база) не создаёт менеджер диалогов.
 """
+import importlib
+
+_EXPORTS = {
+    "dialog_manager": ".dialog_manager",
+    "scenario_manager": ".scenario_manager",
+    "DialogStep": ".scenario_manager",
+    "validators": ".validators",
+    "session_store": ".session_store",
+    "UserType": ".models",
+    "LoanPurpose": ".models",
+    "InvestmentGoal": ".models",
+    "BaseApplication": ".models",
+    "IndividualApplication": ".models",
+    "BusinessApplication": ".models",
+    "InvestorApplication": ".models",
+    "DialogState": ".models",
+}
+
+__all__ = list(_EXPORTS)
+
 
-from .dialog_manager import dialog_manager
-from .scenario_manager import scenario_manager, DialogStep
-from .validators import validators
-from .session_store import session_store
-from .models import *
\ No newline at end of file
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
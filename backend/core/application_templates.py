@@ -0,0 +1,319 @@
+"""
+Компилируемые шаблоны заявок для Telegram, email и компактного формата.
+
+Поля заявок описаны один раз; для каждой пары (тип пользователя, формат)
+шаблон компилируется в функцию отрисовки при первом обращении.
+"""
+import html
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Значение для незаполненного поля
+MISSING_VALUE = "Не указано"
+
+# Поддерживаемые форматы вывода
+OUTPUT_FORMATS = ("telegram", "plain", "compact", "email_html")
+
+SEPARATOR = "────────────────"
+
+
+class TimestampClock:
+    """
+    Общие часы для отметок времени в заявках.
+
+    Строка времени форматируется не чаще раза в секунду и
+    переиспользуется всеми шаблонами.
+    """
+
+    def __init__(self, fmt: str = "%Y-%m-%d %H:%M:%S"):
+        self.fmt = fmt
+        self._cached: Tuple[int, str] = (-1, "")
+
+    def now(self) -> str:
+        """Возвращает текущее время в формате fmt."""
+        second = int(time.time())
+        cached_second, text = self._cached
+        if cached_second != second:
+            text = time.strftime(self.fmt, time.localtime(second))
+            self._cached = (second, text)
+        return text
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Описание поля заявки."""
+    key: Optional[str]  # None - постоянное значение
+    icon: str
+    label: str
+    compact_label: Optional[str] = None
+    kind: str = "text"  # text, money, months
+    constant: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ApplicationLayout:
+    """Описание заявки одного типа пользователя."""
+    user_type: str
+    title: str
+    title_icon: str
+    color: str
+    fields: Tuple[FieldSpec, ...]
+
+
+LAYOUTS: Dict[str, ApplicationLayout] = {
+    'individual': ApplicationLayout(
+        user_type='individual',
+        title="Физическое лицо",
+        title_icon="🆕",
+        color="#4CAF50",
+        fields=(
+            FieldSpec('name', "👤", "Имя"),
+            FieldSpec('collateral', "🏠", "Залог"),
+            FieldSpec('amount', "💰", "Сумма", kind="money"),
+            FieldSpec('purpose', "🎯", "Цель займа"),
+            FieldSpec('phone', "📞", "Телефон"),
+        ),
+    ),
+    'business': ApplicationLayout(
+        user_type='business',
+        title="Бизнес",
+        title_icon="🏢",
+        color="#2196F3",
+        fields=(
+            FieldSpec('company_name', "🏛️", "Компания", compact_label="Имя"),
+            FieldSpec(None, "📝", "Тип", constant="Заемщик (бизнес)"),
+            FieldSpec('amount', "💰", "Сумма", kind="money"),
+            FieldSpec('collateral', "🔒", "Обеспечение"),
+            FieldSpec('purpose', "🎯", "Цель займа"),
+            FieldSpec('phone', "📞", "Телефон"),
+        ),
+    ),
+    'investor': ApplicationLayout(
+        user_type='investor',
+        title="Инвестор",
+        title_icon="🤝",
+        color="#9C27B0",
+        fields=(
+            FieldSpec('name', "👤", "Имя"),
+            FieldSpec(None, "📝", "Тип", constant="Инвестор"),
+            FieldSpec('investment_amount', "💰", "Сумма для инвестирования", kind="money"),
+            FieldSpec('term_months', "⏱️", "Горизонт инвестирования", kind="months"),
+            FieldSpec('investment_goal', "🎯", "Цель"),
+            FieldSpec('phone', "📞", "Телефон"),
+        ),
+    ),
+}
+
+EMAIL_STYLE = (
+    "body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }"
+    ".container { max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 5px; }"
+    ".header { background-color: %s; color: white; padding: 15px; border-radius: 5px 5px 0 0; text-align: center; }"
+    ".content { padding: 20px; }"
+    ".field { margin-bottom: 10px; }"
+    ".label { font-weight: bold; color: #555; }"
+    ".value { margin-left: 10px; }"
+    ".footer { margin-top: 20px; padding-top: 10px; border-top: 1px solid #ddd; font-size: 12px; color: #777; text-align: center; }"
+)
+
+# Функция отрисовки: (данные, отметка времени) -> текст
+Renderer = Callable[[Dict[str, Any], str], str]
+
+
+def _escape_telegram(value: str) -> str:
+    """Экранирование для parse_mode: HTML в Telegram."""
+    return html.escape(value, quote=False)
+
+
+def _escape_email(value: str) -> str:
+    return html.escape(value, quote=True)
+
+
+def _no_escape(value: str) -> str:
+    return value
+
+
+def _value_getter(field: FieldSpec, output: str, escape: Callable[[str], str]) -> Callable[[Dict[str, Any]], str]:
+    """Создаёт функцию получения отформатированного значения поля."""
+    key = field.key
+    raw = output == "compact"
+    missing = escape(MISSING_VALUE)
+
+    if field.kind == "money" and not raw:
+        def get_money(data):
+            value = data.get(key)
+            if value is None:
+                value = 0
+            try:
+                return f"{value:,} руб."
+            except (ValueError, TypeError):
+                return escape(f"{value} руб.")
+        return get_money
+
+    if field.kind == "months":
+        def get_months(data):
+            value = data.get(key)
+            if value is None:
+                return missing if raw else "0 месяцев"
+            return escape(f"{value} месяцев")
+        return get_months
+
+    def get_text(data):
+        value = data.get(key)
+        if value is None or value == "":
+            return missing
+        return escape(value if isinstance(value, str) else str(value))
+    return get_text
+
+
+def _compile_parts(parts: List[Any]) -> Renderer:
+    """
+    Превращает список литералов и функций в функцию отрисовки.
+
+    Соседние литералы склеиваются при компиляции.
+    """
+    merged: List[Any] = []
+    for part in parts:
+        if isinstance(part, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += part
+        else:
+            merged.append(part)
+
+    compiled = tuple(merged)
+
+    def render(data: Dict[str, Any], timestamp: str) -> str:
+        return "".join([part if part.__class__ is str else part(data, timestamp) for part in compiled])
+
+    return render
+
+
+def _field_part(field: FieldSpec, output: str, escape: Callable[[str], str]) -> Any:
+    """Часть шаблона для поля: литерал для постоянных значений, иначе функция."""
+    if field.key is None:
+        return escape(field.constant)
+
+    getter = _value_getter(field, output, escape)
+    return lambda data, timestamp: getter(data)
+
+
+def _timestamp_part(data, timestamp):
+    return timestamp
+
+
+def _compile_text(layout: ApplicationLayout, output: str) -> Renderer:
+    """Компилирует текстовые форматы: telegram, plain, compact."""
+    escape = _escape_telegram if output == "telegram" else _no_escape
+    parts: List[Any] = []
+
+    if output == "compact":
+        for index, field in enumerate(layout.fields):
+            if index:
+                parts.append("\n")
+            parts.append(f"{field.compact_label or field.label}: ")
+            parts.append(_field_part(field, output, escape))
+        return _compile_parts(parts)
+
+    def duplicate_line(data, timestamp):
+        duplicate_of = data.get('duplicate_of')
+        if not duplicate_of:
+            return ""
+        return f"⚠️ ПОВТОРНАЯ ЗАЯВКА (предыдущая сессия: {escape(str(duplicate_of))})\n"
+
+    parts.append(duplicate_line)
+    parts.append(f"{layout.title_icon} НОВАЯ ЗАЯВКА: {layout.title}\n📅 ")
+    parts.append(_timestamp_part)
+    parts.append(f"\n{SEPARATOR}\n")
+    for field in layout.fields:
+        parts.append(f"{field.icon} {field.label}: ")
+        parts.append(_field_part(field, output, escape))
+        parts.append("\n")
+    parts.append(f"{SEPARATOR}\n🔗 ID сессии: ")
+    parts.append(_field_part(FieldSpec('session_id', "", ""), output, escape))
+    return _compile_parts(parts)
+
+
+def _compile_email_html(layout: ApplicationLayout) -> Renderer:
+    """Компилирует HTML-версию письма."""
+    escape = _escape_email
+    parts: List[Any] = [
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="UTF-8">\n<style>',
+        EMAIL_STYLE % layout.color,
+        '</style>\n</head>\n<body>\n<div class="container">\n<div class="header">\n',
+        f"<h2>🆕 Новая заявка: {escape(layout.title)}</h2>\n<p>",
+        _timestamp_part,
+        "</p>\n",
+    ]
+
+    def duplicate_note(data, timestamp):
+        duplicate_of = data.get('duplicate_of')
+        if not duplicate_of:
+            return ""
+        return f"<p>⚠️ Повторная заявка (предыдущая сессия: {escape(str(duplicate_of))})</p>\n"
+
+    parts.append(duplicate_note)
+    parts.append('</div>\n<div class="content">\n')
+
+    for field in layout.fields:
+        parts.append(f'<div class="field"><span class="label">{escape(field.icon + " " + field.label)}:</span> '
+                     f'<span class="value">')
+        parts.append(_field_part(field, "email_html", escape))
+        parts.append("</span></div>\n")
+
+    parts.append('</div>\n<div class="footer">\n'
+                 '<p>Это автоматическое уведомление от ИИ-консультанта BBKinvest</p>\n<p>ID сессии: ')
+    parts.append(_field_part(FieldSpec('session_id', "", ""), "email_html", escape))
+    parts.append("</p>\n</div>\n</div>\n</body>\n</html>\n")
+    return _compile_parts(parts)
+
+
+class ApplicationTemplates:
+    """Кэш скомпилированных шаблонов заявок."""
+
+    def __init__(self, layouts: Dict[str, ApplicationLayout] = None, clock: TimestampClock = None):
+        self.layouts = layouts or LAYOUTS
+        self.clock = clock or TimestampClock()
+        self._renderers: Dict[Tuple[str, str], Renderer] = {}
+        self._lock = threading.Lock()
+
+    def get_renderer(self, user_type: str, output: str = "telegram") -> Renderer:
+        """Возвращает (и при необходимости компилирует) функцию отрисовки."""
+        renderer = self._renderers.get((user_type, output))
+        if renderer is not None:
+            return renderer
+
+        if user_type not in self.layouts:
+            raise ValueError(f"Неизвестный тип пользователя: {user_type}")
+        if output not in OUTPUT_FORMATS:
+            raise ValueError(f"Неизвестный формат заявки: {output}")
+
+        with self._lock:
+            layout = self.layouts[user_type]
+            if output == "email_html":
+                renderer = _compile_email_html(layout)
+            else:
+                renderer = _compile_text(layout, output)
+            self._renderers[(user_type, output)] = renderer
+        return renderer
+
+    def compile_all(self):
+        """Компилирует все шаблоны заранее (например, при старте)."""
+        for user_type in self.layouts:
+            for output in OUTPUT_FORMATS:
+                self.get_renderer(user_type, output)
+
+    def render(self, user_type: str, data: Dict[str, Any], output: str = "telegram") -> str:
+        """Отрисовывает одну заявку."""
+        return self.get_renderer(user_type, output)(data, self.clock.now())
+
+    def render_batch(self, applications: Iterable[Tuple[str, Dict[str, Any]]],
+                     output: str = "telegram") -> List[str]:
+        """Отрисовывает пачку заявок (user_type, data) с общей отметкой времени."""
+        timestamp = self.clock.now()
+        get_renderer = self.get_renderer
+        return [get_renderer(user_type, output)(data, timestamp) for user_type, data in applications]
+
+
+# Глобальный экземпляр шаблонов
+application_templates = ApplicationTemplates()
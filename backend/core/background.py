@@ -0,0 +1,94 @@
+"""
+Фоновая запись через ограниченную очередь.
+
+Общая основа очереди уведомлений, репозитория заявок и журнала
+переписки: вызывающий поток только кладёт элемент в очередь, фоновый
+поток его обрабатывает. Остановка дописывает очередь в пределах одного
+общего срока.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """
+    Очередь и фоновый поток с остановкой по сроку.
+
+    Подкласс реализует _run: берёт элементы из self._queue, вызывает
+    task_done для каждого (и для метки конца очереди None) и завершается
+    по метке None или по событию self._shutdown.
+    """
+
+    thread_name = "background-writer"
+
+    def __init__(self, max_queue_size: int):
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stopped = False
+        self._shutdown = threading.Event()
+
+    @property
+    def pending(self) -> int:
+        """Элементы в очереди и в обработке."""
+        return self._queue.unfinished_tasks
+
+    def start(self):
+        """Запускает фоновый поток (один раз)."""
+        if self._thread is not None:
+            return
+
+        with self._start_lock:
+            if self._thread is None and not self._stopped:
+                self._prepare()
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Ждёт обработки очереди. Возвращает False по таймауту."""
+        if self._thread is None:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Дописывает очередь и останавливает поток; всё - в пределах timeout.
+
+        Returns:
+            False, если очередь не успела обработаться
+        """
+        self._stopped = True
+        if self._thread is None:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flushed = self.flush(timeout)
+        if not flushed:
+            logger.error("Поток %s остановлен, не обработано: %s", self.thread_name, self.pending)
+        # Поток останавливается по событию: метка конца очереди только будит
+        # его и не ставится в заполненную очередь (put ждал бы без срока)
+        self._shutdown.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(None if deadline is None else max(deadline - time.monotonic(), 0.0))
+        self._thread = None
+        return flushed
+
+    def _prepare(self):
+        """Подготовка перед запуском потока (под блокировкой запуска)."""
+
+    def _run(self):
+        raise NotImplementedError
@@ -1,8 +1,9 @@
 """
 Конфигурация приложения.
 """
+from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -14,11 +15,16 @@ class Settings(BaseSettings):
 
     # База данных
     database_url: str = "sqlite:///./database/bbk_ai.db"
+    database_enabled: bool = True
+    db_batch_size: int = 500
+    db_flush_interval_seconds: float = 1.0
+    db_queue_size: int = 10000
 
     # Telegram
     telegram_bot_token: str = ""
     telegram_chat_id: str = ""
     telegram_enabled: bool = True
+    telegram_api_url: str = "https://api.telegram.org"  # локальная заглушка в тестах: tests/fake_telegram_api.py
 
     # Email
     email_enabled: bool = False
@@ -29,12 +35,90 @@ class Settings(BaseSettings):
     email_from: str = ""
     email_to: str = "7504020@bk.ru"
 
+    # Отправка уведомлений (фоновая очередь)
+    notification_queue_size: int = 1000
+
+    # Запуск и остановка
+    warmup_enabled: bool = True
+    shutdown_timeout_seconds: float = 10.0  # срок дописывания очередей при остановке
+
+    # Проба готовности /ready: проверки в фоне, проба читает кэш
+    readiness_interval_seconds: float = 15.0
+    readiness_stale_seconds: float = 60.0  # более старый результат считается непройденным
+
+    # Логирование (запись в фоновом потоке)
+    log_level: str = "INFO"
+    log_format: str = "json"  # json - одна запись JSON в строке, text - прежний текстовый формат
+    log_queue_size: int = 10000  # при переполнении записи отбрасываются
+    log_sample_window_seconds: float = 60.0
+    log_sample_burst: int = 20  # одинаковых предупреждений и ошибок за окно, остальные пропускаются
+
+    # Админ-панель (пустой токен - админ-API отключён)
+    admin_token: str = ""
+    admin_page_size_max: int = 500
+    admin_count_cap: int = 10000
+
+    # Диагностика: профилирование через админ-API и трассировка запросов (заголовок X-Trace)
+    profiler_max_seconds: int = 60
+    trace_enabled: bool = False  # при включении ответ на запрос с X-Trace содержит Server-Timing
+
+    # Хранилище сессий: memory - в процессе, shared - общий файл в /dev/shm для нескольких воркеров
+    session_backend: str = "memory"
+    session_shm_path: str = ""  # по умолчанию /dev/shm/bbkinvest-sessions-<слоты>x<байт>
+    session_shm_slots: int = 16384  # максимум одновременных сессий (держите заполнение ниже 70%)
+    session_shm_slot_bytes: int = 4096  # вмещает заявку с ответами максимальной длины (TEXT_MAX_LENGTH)
+
+    # Липкая маршрутизация: номер воркера в ID сессии и адреса воркеров для маршрутизатора
+    worker_id: Optional[int] = None
+    sticky_upstreams: List[str] = []  # "http://127.0.0.1:8001" (номер - позиция) или "3=http://..."
+    sticky_draining: List[int] = []  # воркеры, которые дообслуживают свои сессии, новых не получают
+
     # Безопасность
     data_retention_hours: int = 24
     session_timeout_minutes: int = 15
 
-    # CORS
+    # Журнал переписки (хранится data_retention_hours)
+    transcripts_enabled: bool = True
+    transcripts_dir: str = "./database/transcripts"
+    transcript_segment_max_bytes: int = 16 * 1024 * 1024
+    transcript_segment_max_minutes: int = 60
+    transcript_fsync_interval_seconds: float = 1.0
+    transcript_queue_size: int = 10000
+
+    # Воронка диалога
+    funnel_enabled: bool = True
+    funnel_bucket_minutes: int = 60
+    funnel_memory_hours: int = 168
+    funnel_flush_interval_seconds: float = 10.0
+
+    # Массовый импорт заявок из CSV (python -m backend.cli import-leads)
+    import_chunk_size: int = 1000  # строк в порции: проверка, запись одной транзакцией
+    import_notify_batch_size: int = 20  # заявок в одной сводке уведомления
+
+    # База знаний: ответы на вопросы посетителя без смены шага диалога
+    faq_enabled: bool = True
+    faq_docs_dir: str = "./docs/faq"
+    faq_index_path: str = "./database/faq_index.json"  # перестраивается при изменении документов
+    faq_min_confidence: float = 0.4  # ниже - вопрос обрабатывается как ответ на шаг
+
+    # Повторные заявки (по нормализованному телефону)
+    duplicate_policy: Literal["flag", "suppress", "off"] = "flag"  # flag - пометить, suppress - не отправлять, off - не проверять
+    duplicate_window_minutes: int = 60
+    duplicate_index_size: int = 10000
+
+    # Ограничение частоты запросов чата (429 с Retry-After)
+    rate_limit_enabled: bool = True
+    rate_limit_client_per_minute: int = 120  # с одного адреса (за NAT бывает много посетителей)
+    rate_limit_client_burst: int = 60
+    rate_limit_session_per_minute: int = 30
+    rate_limit_session_burst: int = 20
+    rate_limit_applications_per_hour: int = 5  # завершённых заявок с одного адреса
+    rate_limit_max_keys: int = 100000
+    rate_limit_trust_forwarded: bool = False  # брать адрес из X-Forwarded-For (за своим прокси)
+
+    # CORS (только маршруты виджета /api/v1/chat)
     cors_origins: List[str] = ["*"]
+    cors_max_age: int = 600  # кэш предварительных запросов в браузере, секунды
 
     class Config:
         env_file = ".env"
@@ -42,4 +126,10 @@ class Settings(BaseSettings):
         extra = "ignore"
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Единственный экземпляр настроек (.env читается один раз)."""
+    return Settings()
+
+
+settings = get_settings()
\ No newline at end of file
@@ -2,13 +2,26 @@
 Главный менеджер диалоговых состояний.
 """
 from typing import Dict, Tuple, Optional, Any
+from .config import settings
 from .models import DialogState
 from .session_store import session_store
 from .scenario_manager import scenario_manager, DialogStep
+from .validators import normalize_phone
+from .lead_index import lead_index
+from .rate_limit import rate_limiter
+from .funnel import ENTERED, ERROR, create_funnel_recorder
+from .transcripts import create_transcript_log
+from .knowledge_base import create_faq_index, is_question
+from .logging_config import log_context, update_log_context
+from .tracing import span
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Данные сессии, которые определяют сценарий и не сбрасываются при исправлении заявки
+SCENARIO_KEYS = ("service_type", "user_type")
+
 
 class DialogStateManager:
     """Координатор всех компонентов диалоговой системы."""
@@ -16,6 +29,11 @@ class DialogStateManager:
     def __init__(self):
         self.scenario_manager = scenario_manager
         self._notification_service = None
+        self._application_repository = None
+        self._funnel_recorder = None
+        self._transcript_log = None
+        self._notification_queue = None
+        self._faq_index = None
 
     @property
     def notification_service(self):
@@ -25,41 +43,129 @@ class DialogStateManager:
             self._notification_service = create_notification_service()
         return self._notification_service
 
-    def process_user_message(self, session_id: str, user_message: str) -> Dict[str, Any]:
-        """Обрабатывает сообщение пользователя и возвращает ответ."""
+    @property
+    def notification_queue(self):
+        """Ленивая загрузка очереди отправки уведомлений."""
+        if self._notification_queue is None:
+            from backend.integrations.notification_queue import NotificationQueue
+            self._notification_queue = NotificationQueue(lambda: self.notification_service,
+                                                          max_queue_size=settings.notification_queue_size)
+        return self._notification_queue
+
+    @property
+    def application_repository(self):
+        """Ленивая загрузка репозитория заявок."""
+        if self._application_repository is None:
+            from backend.db.repository import application_repository
+            self._application_repository = application_repository
+        return self._application_repository
+
+    @property
+    def funnel_recorder(self):
+        """Ленивая загрузка счётчиков воронки."""
+        if self._funnel_recorder is None:
+            self._funnel_recorder = create_funnel_recorder()
+        return self._funnel_recorder
+
+    @property
+    def transcript_log(self):
+        """Ленивая загрузка журнала переписки."""
+        if self._transcript_log is None:
+            self._transcript_log = create_transcript_log()
+        return self._transcript_log
+
+    @property
+    def faq_index(self):
+        """Ленивая загрузка индекса базы знаний."""
+        if self._faq_index is None:
+            self._faq_index = create_faq_index()
+        return self._faq_index
+
+    def process_user_message(self, session_id: str, user_message: str,
+                             client: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Обрабатывает сообщение пользователя и возвращает ответ.
+
+        client - адрес клиента для лимита заявок; при превышении лимита
+        поднимается RateLimited, сессия остаётся на прежнем шаге.
+        """
+        with log_context(session_id=session_id):
+            response = self._process_user_message(session_id, user_message, client)
+
+        if settings.transcripts_enabled:
+            self.transcript_log.append(response["session_id"], response["step"],
+                                       user_message, response["message"])
+
+        return response
+
+    def _process_user_message(self, session_id: str, user_message: str,
+                              client: Optional[str] = None) -> Dict[str, Any]:
+        funnel = self.funnel_recorder if settings.funnel_enabled else None
 
         # Получаем или создаём сессию
-        session = session_store.get_session(session_id)
-        if not session:
-            session_id = session_store.create_session()
+        with span("session.read"):
             session = session_store.get_session(session_id)
+            if not session:
+                session_id = session_store.create_session()
+                session = session_store.get_session(session_id)
+                if funnel is not None:
+                    funnel.record(session.current_step, ENTERED)
 
-        # Если диалог завершён, начинаем новый
-        if session.completed:
-            session_store.delete_session(session_id)
-            session_id = session_store.create_session()
-            session = session_store.get_session(session_id)
+            # Если диалог завершён, начинаем новый
+            if session.completed:
+                session_store.delete_session(session_id)
+                session_id = session_store.create_session()
+                session = session_store.get_session(session_id)
+                if funnel is not None:
+                    funnel.record(session.current_step, ENTERED)
+
+        update_log_context(session_id=session_id, step=session.current_step)
+
+        # Вопрос вне сценария получает ответ из базы знаний, шаг не меняется.
+        # На шагах с вариантами ответа подходящий вариант важнее вопроса,
+        # поэтому там база знаний проверяется, только если сценарий ввод не принял
+        question = settings.faq_enabled and is_question(user_message)
+        choice_step = bool(self.scenario_manager.get_options(DialogStep(session.current_step)))
+        if question and not choice_step:
+            response = self._faq_response(session_id, session, user_message)
+            if response is not None:
+                return response
 
         # Определяем следующий шаг
-        next_step, updates = self.scenario_manager.get_next_step(
-            DialogStep(session.current_step),
-            user_message,
-            session.collected_data
-        )
+        with span("scenario"):
+            next_step, updates = self.scenario_manager.get_next_step(
+                DialogStep(session.current_step),
+                user_message,
+                session.collected_data
+            )
+
+        if question and choice_step and "error" in updates:
+            response = self._faq_response(session_id, session, user_message)
+            if response is not None:
+                return response
 
         # Обрабатываем ошибки валидации
         if "error" in updates:
-            response = {
-                "message": f"❌ {updates['error']}\n\n{self.scenario_manager.get_message(DialogStep(session.current_step))}",
-                "options": self.scenario_manager.get_options(DialogStep(session.current_step)),
-                "session_id": session_id,
-                "step": session.current_step
-            }
+            current_step = DialogStep(session.current_step)
+            if funnel is not None:
+                funnel.record(current_step.value, ERROR)
+            with span("format"):
+                response = {
+                    "message": f"❌ {updates['error']}\n\n{self.scenario_manager.get_message(current_step, session.collected_data)}",
+                    "options": self.scenario_manager.get_options(current_step),
+                    "session_id": session_id,
+                    "step": session.current_step
+                }
             return response
 
-        # Если нужно сбросить данные
+        # Лимит заявок проверяется до изменения сессии, чтобы последний шаг можно было повторить
+        if next_step == DialogStep.COMPLETED:
+            rate_limiter.check_application(client)
+
+        # Если нужно сбросить данные (выбранный сценарий сохраняется)
         if updates.get("reset"):
-            session.collected_data = {}
+            session.collected_data = {key: session.collected_data[key]
+                                      for key in SCENARIO_KEYS if key in session.collected_data}
 
         # Обновляем данные сессии
         if updates:
@@ -71,6 +177,8 @@ class DialogStateManager:
                 session.user_type = updates["user_type"]
 
         # Обновляем состояние сессии
+        if funnel is not None:
+            funnel.transition(session.current_step, next_step.value, restarted=bool(updates.get("reset")))
         session.current_step = next_step.value
 
         # ОБРАБОТКА ЗАВЕРШЕНИЯ ДИАЛОГА
@@ -78,19 +186,22 @@ class DialogStateManager:
             session.completed = True
 
             # Отправляем уведомление о заявке
-            self._send_application_notification(session.user_type, session.collected_data, session_id)
+            with span("notification.enqueue"):
+                self._send_application_notification(session.user_type, session.collected_data, session_id)
 
         # Формируем ответное сообщение
-        message_text = self.scenario_manager.get_message(next_step, session.collected_data)
-        options = self.scenario_manager.get_options(next_step)
+        with span("format"):
+            message_text = self.scenario_manager.get_message(next_step, session.collected_data)
+            options = self.scenario_manager.get_options(next_step)
 
         # Сохраняем обновлённую сессию
-        session_store.update_session(session_id, {
-            "user_type": session.user_type,  # Обновляем тип пользователя
-            "current_step": session.current_step,
-            "collected_data": session.collected_data,
-            "completed": session.completed
-        })
+        with span("session.write"):
+            session_store.update_session(session_id, {
+                "user_type": session.user_type,  # Обновляем тип пользователя
+                "current_step": session.current_step,
+                "collected_data": session.collected_data,
+                "completed": session.completed
+            })
 
         return {
             "message": message_text,
@@ -100,8 +211,25 @@ class DialogStateManager:
             "completed": session.completed
         }
 
+    def _faq_response(self, session_id: str, session: DialogState,
+                      user_message: str) -> Optional[Dict[str, Any]]:
+        """Ответ из базы знаний с повтором вопроса текущего шага или None."""
+        with span("faq"):
+            match = self.faq_index.answer(user_message, settings.faq_min_confidence)
+        if match is None:
+            return None
+
+        current_step = DialogStep(session.current_step)
+        with span("format"):
+            return {
+                "message": f"{match.entry.answer}\n\n{self.scenario_manager.get_message(current_step, session.collected_data)}",
+                "options": self.scenario_manager.get_options(current_step),
+                "session_id": session_id,
+                "step": session.current_step
+            }
+
     def _send_application_notification(self, user_type, collected_data: Dict[str, Any], session_id: str):
-        """Отправляет уведомление о новой заявке."""
+        """Сохраняет новую заявку и отправляет уведомление о ней."""
         try:
             # Подготавливаем данные для отправки
             application_data = collected_data.copy()
@@ -110,18 +238,87 @@ class DialogStateManager:
             # Конвертируем UserType enum в строку
             user_type_str = user_type.value if hasattr(user_type, 'value') else str(user_type)
 
-            # Отправляем через notification service
-            success = self.notification_service.send_application_notification(
-                user_type_str, application_data
-            )
+            # Проверяем повторную заявку с того же телефона
+            duplicate = None
+            if settings.duplicate_policy != "off":
+                phone = normalize_phone(str(collected_data.get('phone') or ''))
+                duplicate = lead_index.check_and_add(phone, session_id, user_type_str) if phone else None
+                if duplicate is not None:
+                    application_data['duplicate_of'] = duplicate.session_id
 
-            if success:
-                logger.info(f"Уведомление о заявке отправлено. Session: {session_id}")
-            else:
-                logger.error(f"Не удалось отправить уведомление о заявке. Session: {session_id}")
+            # Сохраняем заявку (запись в базу идёт в фоне)
+            if settings.database_enabled:
+                self.application_repository.add(user_type_str, application_data)
+
+            if duplicate is not None and settings.duplicate_policy == "suppress":
+                logger.info("Повторная заявка не отправлена. Session: %s, предыдущая: %s",
+                            session_id, duplicate.session_id)
+                return
+
+            # Отправка идёт в фоне, ответ пользователю не ждёт Telegram
+            self.notification_queue.submit(user_type_str, application_data)
 
         except Exception as e:
-            logger.error(f"Ошибка при отправке уведомления: {str(e)}", exc_info=True)
+            logger.error("Ошибка при отправке уведомления: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Выполняет ленивую инициализацию заранее, до первых запросов.
+
+        Returns:
+            Время подготовки каждой части в секундах
+        """
+        parts = [
+            ("scenarios", self.scenario_manager.warm_up),
+            ("notifications", lambda: (self.notification_service.warm_up(), self.notification_queue.start())),
+        ]
+        if settings.database_enabled:
+            parts.append(("database", self.application_repository.wait_ready))
+        if settings.funnel_enabled:
+            parts.append(("funnel", self.funnel_recorder.ensure_loaded))
+        if settings.faq_enabled:
+            parts.append(("faq", lambda: self.faq_index))
+        if settings.transcripts_enabled:
+            parts.append(("transcripts", self.transcript_log.start))
+
+        timings = {}
+        for name, warm_up in parts:
+            started = time.perf_counter()
+            try:
+                warm_up()
+            except Exception as e:
+                logger.error("Ошибка подготовки %s: %s", name, e)
+            timings[name] = round(time.perf_counter() - started, 3)
+        return timings
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Дописывает очереди: уведомления, журнал переписки, воронку, заявки.
+
+        Общий срок timeout делится между очередями по порядку: каждая
+        получает остаток срока. Сессии не сохраняются: в режиме memory они
+        теряются при остановке, в режиме shared остаются в файле
+        разделяемой памяти для других воркеров.
+
+        Returns:
+            False, если что-то не успело записаться
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+        # Уведомления первыми: это заявки клиентов
+        complete = True
+        if self._notification_queue is not None:
+            complete &= self._notification_queue.close(remaining())
+        if self._transcript_log is not None:
+            complete &= self._transcript_log.close(remaining())
+        if self._funnel_recorder is not None:
+            self._funnel_recorder.close(remaining())
+        if self._application_repository is not None:
+            complete &= self._application_repository.close(remaining())
+        return complete
 
     def get_dialog_state(self, session_id: str) -> Optional[DialogState]:
         """Получает текущее состояние диалога."""
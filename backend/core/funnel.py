@@ -0,0 +1,236 @@
+"""
+Воронка диалога: инкрементальные счётчики по шагам.
+
+Каждое сообщение увеличивает несколько счётчиков в памяти (за O(1)),
+фоновый поток периодически дописывает накопленные приращения в базу.
+Отчёт строится по счётчикам в памяти и не зависит от числа событий.
+
+Счётчики считают события, а не уникальные сессии: сессия, начавшая
+заполнение заново, снова приходит на шаги сценария, а после завершения
+диалога сообщение открывает новую сессию. Поэтому доля от первого шага
+ограничена единицей. При нескольких воркерах каждый считает свои события
+(счётчики других воркеров из базы загружаются один раз, при запуске).
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+from .scenario_manager import DialogStep, ScenarioManager
+
+logger = logging.getLogger(__name__)
+
+# События воронки
+ENTERED = "entered"      # сессия пришла на шаг
+ADVANCED = "advanced"    # сессия ушла с шага дальше
+ERROR = "error"          # ошибка валидации на шаге
+RESTARTED = "restarted"  # пользователь начал заполнение заново
+EVENTS = (ENTERED, ADVANCED, ERROR, RESTARTED)
+
+# Шаги каждого сценария в порядке прохождения
+SCENARIO_STEPS: Dict[str, Tuple[DialogStep, ...]] = {
+    "common": (DialogStep.WELCOME, DialogStep.ASK_LOAN_OR_INVEST, DialogStep.ASK_INDIVIDUAL_OR_BUSINESS),
+}
+for _confirm, _steps in ScenarioManager.CONFIRM_STEPS.items():
+    SCENARIO_STEPS[_confirm.value.split("_", 1)[0]] = tuple(step for step, _, _ in _steps) + (_confirm,)
+
+CounterKey = Tuple[str, str]  # (шаг, событие)
+
+
+class FunnelRecorder:
+    """
+    Счётчики воронки в интервалах по bucket_minutes.
+
+    В памяти хранятся итоги за всё время и последние memory_hours часов
+    по интервалам; в базу пишутся только приращения с прошлой записи.
+    """
+
+    def __init__(self, bucket_minutes: int = 60, memory_hours: int = 168,
+                 flush_interval: float = 10.0, store=None):
+        self.bucket_seconds = bucket_minutes * 60
+        self.memory_seconds = memory_hours * 3600
+        self.flush_interval = flush_interval
+        self.store = store
+
+        self._totals: Dict[CounterKey, int] = {}
+        self._buckets: Dict[int, Dict[CounterKey, int]] = {}
+        self._pending: Dict[Tuple[int, str, str], int] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._loaded = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- Запись событий ---
+
+    def record(self, step: str, event: str, now: Optional[float] = None):
+        """Увеличивает счётчик события на шаге."""
+        now = time.time() if now is None else now
+        bucket = int(now) - int(now) % self.bucket_seconds
+        key = (step, event)
+
+        with self._lock:
+            counters = self._buckets.get(bucket)
+            if counters is None:
+                counters = self._buckets[bucket] = {}
+                self._evict(bucket)
+            counters[key] = counters.get(key, 0) + 1
+            self._totals[key] = self._totals.get(key, 0) + 1
+            pending_key = (bucket, step, event)
+            self._pending[pending_key] = self._pending.get(pending_key, 0) + 1
+
+        if self.store is not None and self._thread is None:
+            self.start()
+
+    def transition(self, from_step: str, to_step: str, restarted: bool = False, now: Optional[float] = None):
+        """Переход сессии с шага на шаг."""
+        self.record(from_step, ADVANCED, now)
+        if restarted:
+            self.record(from_step, RESTARTED, now)
+        self.record(to_step, ENTERED, now)
+
+    def _evict(self, newest: int):
+        """Удаляет из памяти интервалы старше memory_hours."""
+        cutoff = newest - self.memory_seconds
+        for bucket in [bucket for bucket in self._buckets if bucket <= cutoff]:
+            del self._buckets[bucket]
+
+    # --- Отчёт ---
+
+    def counters(self, hours: Optional[int] = None, now: Optional[float] = None) -> Dict[CounterKey, int]:
+        """Счётчики за последние hours часов (None - за всё время)."""
+        self.ensure_loaded()
+
+        with self._lock:
+            if hours is None:
+                return dict(self._totals)
+
+            now = time.time() if now is None else now
+            since = now - hours * 3600
+            result: Dict[CounterKey, int] = {}
+            for bucket, counters in self._buckets.items():
+                if bucket + self.bucket_seconds > since:
+                    for key, count in counters.items():
+                        result[key] = result.get(key, 0) + count
+            return result
+
+    def report(self, hours: Optional[int] = None, now: Optional[float] = None) -> Dict[str, object]:
+        """
+        Воронка по сценариям.
+
+        Для каждого шага: сколько раз на него пришли, ушли дальше, ошиблись,
+        сколько ушло с него (dropped) и доля от первого шага сценария
+        (conversion, не больше 1: повторные проходы считаются событиями).
+        """
+        counters = self.counters(hours, now)
+        scenarios: Dict[str, List[Dict[str, object]]] = {}
+
+        for scenario, steps in SCENARIO_STEPS.items():
+            first = counters.get((steps[0].value, ENTERED), 0)
+            rows = []
+            for step in steps:
+                entered = counters.get((step.value, ENTERED), 0)
+                advanced = counters.get((step.value, ADVANCED), 0)
+                rows.append({
+                    "step": step.value,
+                    "entered": entered,
+                    "advanced": advanced,
+                    "errors": counters.get((step.value, ERROR), 0),
+                    "restarted": counters.get((step.value, RESTARTED), 0),
+                    "dropped": max(entered - advanced, 0),
+                    "conversion": round(min(entered / first, 1.0), 4) if first else 0.0,
+                })
+            scenarios[scenario] = rows
+
+        return {
+            "hours": hours,
+            "scenarios": scenarios,
+            "completed": counters.get((DialogStep.COMPLETED.value, ENTERED), 0),
+        }
+
+    # --- Хранение ---
+
+    def ensure_loaded(self):
+        """Один раз добавляет к счётчикам в памяти сохранённые в базе."""
+        if self._loaded or self.store is None:
+            return
+
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                totals, buckets = self.store.load(time.time() - self.memory_seconds)
+            except Exception as e:
+                logger.error("Не удалось загрузить счётчики воронки: %s", e)
+                return
+
+            with self._lock:
+                for key, count in totals.items():
+                    self._totals[key] = self._totals.get(key, 0) + count
+                for (bucket, step, event), count in buckets.items():
+                    counters = self._buckets.setdefault(bucket, {})
+                    counters[(step, event)] = counters.get((step, event), 0) + count
+            self._loaded = True
+
+    def flush(self) -> bool:
+        """Записывает накопленные приращения в базу."""
+        if self.store is None:
+            return True
+
+        # Пока итоги из базы не загружены, запись исказила бы их при загрузке
+        self.ensure_loaded()
+        if not self._loaded:
+            return False
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return True
+
+        try:
+            self.store.save(pending)
+            return True
+        except Exception as e:
+            # Возвращаем приращения, чтобы записать их в следующий раз
+            with self._lock:
+                for key, count in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + count
+            logger.error("Ошибка записи счётчиков воронки: %s", e)
+            return False
+
+    def start(self):
+        """Запускает фоновую запись (один раз)."""
+        with self._start_lock:
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name="funnel-writer", daemon=True)
+                self._thread.start()
+
+    def close(self, timeout: Optional[float] = None):
+        """Останавливает фоновую запись и дописывает приращения."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        self.ensure_loaded()
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+def create_funnel_recorder() -> FunnelRecorder:
+    """Глобальная воронка; с базой данных, если она включена."""
+    store = None
+    if settings.database_enabled:
+        from backend.db.funnel import FunnelStore
+        store = FunnelStore()
+
+    return FunnelRecorder(
+        bucket_minutes=settings.funnel_bucket_minutes,
+        memory_hours=settings.funnel_memory_hours,
+        flush_interval=settings.funnel_flush_interval_seconds,
+        store=store,
+    )
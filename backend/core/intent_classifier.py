@@ -0,0 +1,264 @@
+"""
+Быстрая классификация намерений для ветвлений диалога.
+
+Ключевые слова компилируются в автомат Ахо-Корасик, который находит все
+совпадения за один проход по нормализованному вводу.
+"""
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Латиница -> кириллица для ввода в транслите ("zaim", "biznes")
+_TRANSLIT_DIGRAPHS = [
+    ("shch", "щ"), ("sch", "щ"), ("zh", "ж"), ("kh", "х"), ("ch", "ч"),
+    ("sh", "ш"), ("ts", "ц"), ("yu", "ю"), ("ya", "я"), ("yo", "е"),
+]
+_TRANSLIT_LETTERS = str.maketrans({
+    "a": "а", "b": "б", "c": "к", "d": "д", "e": "е", "f": "ф", "g": "г",
+    "h": "х", "i": "и", "j": "и", "k": "к", "l": "л", "m": "м", "n": "н",
+    "o": "о", "p": "п", "q": "к", "r": "р", "s": "с", "t": "т", "u": "у",
+    "v": "в", "w": "в", "x": "кс", "y": "ы", "z": "з",
+})
+_LATIN_RE = re.compile(r"[a-z]")
+_DIGRAPH_RE = re.compile("|".join(digraph for digraph, _ in _TRANSLIT_DIGRAPHS))
+_DIGRAPHS = dict(_TRANSLIT_DIGRAPHS)
+
+# Всё, кроме букв и цифр, считается разделителем слов
+_SEPARATOR_RE = re.compile(r"[^0-9a-zа-я]+")
+
+# ё и й сводятся к е и и: "заём", "заем" и "займ" дают одну основу
+_LETTER_FOLDING = str.maketrans({"ё": "е", "й": "и"})
+
+
+def normalize_text(text: str) -> str:
+    """
+    Нормализует ввод для поиска ключевых слов.
+
+    Возвращает слова через один пробел с пробелами по краям, чтобы
+    границы слов можно было закодировать прямо в ключевых словах.
+    """
+    text = text.lower().translate(_LETTER_FOLDING)
+
+    if _LATIN_RE.search(text):
+        text = _DIGRAPH_RE.sub(lambda m: _DIGRAPHS[m.group(0)], text)
+        text = text.translate(_TRANSLIT_LETTERS)
+
+    return " " + _SEPARATOR_RE.sub(" ", text).strip() + " "
+
+
+# Гласные, которые часто путают в безударной позиции
+_VOWEL_CONFUSIONS = {"а": "о", "о": "а", "е": "и", "и": "е"}
+
+
+def _typo_variants(stem: str) -> Iterable[str]:
+    """Варианты основы с одной пропущенной, переставленной или перепутанной буквой."""
+    for i in range(1, len(stem) - 1):
+        yield stem[:i] + stem[i + 1:]
+    for i in range(1, len(stem) - 1):
+        yield stem[:i] + stem[i + 1] + stem[i] + stem[i + 2:]
+    for i in range(1, len(stem)):
+        confused = _VOWEL_CONFUSIONS.get(stem[i])
+        if confused:
+            yield stem[:i] + confused + stem[i + 1:]
+
+
+@dataclass(frozen=True)
+class Keyword:
+    """Ключевое слово намерения."""
+    text: str
+    intent: str
+    weight: float = 1.0
+    whole_word: bool = False  # True - только отдельным словом, иначе - как начало слова
+
+
+@dataclass
+class IntentMatch:
+    """Результат классификации."""
+    intent: Optional[str]
+    score: float = 0.0
+    confidence: float = 0.0
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+class KeywordAutomaton:
+    """Автомат Ахо-Корасик над строками."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self._built = False
+
+    def add(self, pattern: str, payload: int):
+        """Добавляет шаблон с номером полезной нагрузки."""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (payload,)
+        self._built = False
+
+    def build(self):
+        """Строит функцию неудач (BFS по бору)."""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._built = True
+
+    def find(self, text: str) -> List[int]:
+        """Возвращает полезные нагрузки всех совпадений в тексте."""
+        if not self._built:
+            self.build()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        found: List[int] = []
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.extend(output[state])
+
+        return found
+
+
+class IntentClassifier:
+    """Классификатор намерений по взвешенным ключевым словам."""
+
+    # Минимальная длина основы, для которой генерируются опечатки
+    TYPO_MIN_LENGTH = 5
+    # Вес совпадения по опечатке относительно точного
+    TYPO_WEIGHT = 0.8
+
+    def __init__(self, keywords: Iterable[Keyword]):
+        # Варианты написания и номер исходного ключевого слова для каждого
+        self.keywords: List[Keyword] = []
+        self._sources: List[int] = []
+        self._automaton = KeywordAutomaton()
+        seen: Dict[str, int] = {}
+
+        for source, keyword in enumerate(keywords):
+            stem = normalize_text(keyword.text).strip()
+            variants = [(stem, keyword.weight)]
+            if not keyword.whole_word and len(stem) >= self.TYPO_MIN_LENGTH and " " not in stem:
+                variants += [(typo, keyword.weight * self.TYPO_WEIGHT) for typo in _typo_variants(stem)]
+
+            for variant, weight in variants:
+                pattern = " " + variant + (" " if keyword.whole_word else "")
+                if pattern in seen:
+                    # Точная основа важнее опечатки другого слова
+                    existing = self.keywords[seen[pattern]]
+                    if existing.weight >= weight:
+                        continue
+                seen[pattern] = len(self.keywords)
+                self.keywords.append(Keyword(variant, keyword.intent, weight, keyword.whole_word))
+                self._sources.append(source)
+                self._automaton.add(pattern, seen[pattern])
+
+        self._automaton.build()
+
+    def classify(self, text: str) -> IntentMatch:
+        """
+        Определяет намерение за один проход по вводу.
+
+        Каждое ключевое слово учитывается один раз, по лучшему из
+        совпавших вариантов написания. Если у лучших намерений одинаковый
+        счёт, намерение не определяется.
+        """
+        if not text:
+            return IntentMatch(None)
+
+        matched: Dict[int, Keyword] = {}
+        for index in self._automaton.find(normalize_text(text)):
+            keyword = self.keywords[index]
+            source = self._sources[index]
+            if source not in matched or matched[source].weight < keyword.weight:
+                matched[source] = keyword
+
+        scores: Dict[str, float] = {}
+        for keyword in matched.values():
+            scores[keyword.intent] = scores.get(keyword.intent, 0.0) + keyword.weight
+
+        if not scores:
+            return IntentMatch(None)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_intent, best_score = ranked[0]
+        if len(ranked) > 1 and ranked[1][1] == best_score:
+            return IntentMatch(None, best_score, 0.0, scores)
+
+        return IntentMatch(best_intent, best_score, best_score / sum(scores.values()), scores)
+
+
+# Займ или инвестиции
+SERVICE_KEYWORDS = [
+    Keyword("займ", "loan"),
+    Keyword("заем", "loan"),
+    Keyword("кредит", "loan"),
+    Keyword("ссуд", "loan"),
+    Keyword("одолж", "loan"),
+    Keyword("занять", "loan"),
+    Keyword("долг", "loan", 0.7),
+    Keyword("деньги под залог", "loan"),
+    Keyword("loan", "loan"),
+    Keyword("инвест", "invest"),
+    Keyword("вложит", "invest"),
+    Keyword("вложен", "invest"),
+    Keyword("вклад", "invest"),
+    Keyword("приумнож", "invest"),
+    Keyword("депозит", "invest"),
+    Keyword("разместить", "invest", 0.7),
+    Keyword("доход", "invest", 0.7),
+    Keyword("invest", "invest"),
+]
+
+# Физическое лицо или бизнес
+BORROWER_KEYWORDS = [
+    Keyword("физ", "individual"),
+    Keyword("частн", "individual"),
+    Keyword("личн", "individual"),
+    Keyword("на себя", "individual"),
+    Keyword("для себя", "individual"),
+    Keyword("гражданин", "individual", 0.7),
+    Keyword("самозанят", "individual", 0.7),
+    Keyword("биз", "business"),
+    Keyword("юр", "business"),
+    Keyword("ип", "business", whole_word=True),
+    Keyword("ооо", "business", whole_word=True),
+    Keyword("оао", "business", whole_word=True),
+    Keyword("зао", "business", whole_word=True),
+    Keyword("пао", "business", whole_word=True),
+    Keyword("ао", "business", whole_word=True),
+    Keyword("компан", "business"),
+    Keyword("фирм", "business"),
+    Keyword("организац", "business"),
+    Keyword("предприят", "business"),
+    Keyword("предпринимат", "business"),
+]
+
+
+# Глобальные экземпляры классификаторов
+service_classifier = IntentClassifier(SERVICE_KEYWORDS)
+borrower_classifier = IntentClassifier(BORROWER_KEYWORDS)
@@ -0,0 +1,308 @@
+"""
+База знаний: ответы на вопросы посетителя вне сценария диалога.
+
+Вопросы и ответы хранятся в Markdown-файлах каталога docs/faq (заголовок
+"## " - вопрос, текст под ним - ответ). Слова приводятся к основам
+(normalize_text и отсечение русских окончаний), по основам строится
+обратный индекс с весами BM25. Веса считаются при построении, поэтому
+поиск - сумма весов из списков нескольких основ запроса.
+
+Индекс сохраняется в JSON вместе с отпечатком исходных файлов: воркер
+при запуске читает готовый файл и перестраивает индекс, только если
+документы изменились.
+"""
+import glob
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+from .intent_classifier import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Версия формата файла индекса и правил выделения основ
+INDEX_VERSION = 2
+
+# Параметры BM25
+K1 = 1.2
+B = 0.75
+# Слова вопроса весят больше слов ответа
+QUESTION_WEIGHT = 2
+
+# Окончания (после сведения ё и й к е и и), от длинных к коротким
+_ENDINGS = sorted({
+    # возвратные и личные формы глаголов
+    "итесь", "етесь", "ается", "яется", "ются", "ется", "ится", "аться", "яться", "ться", "тся",
+    "лась", "лось", "лись",
+    "ает", "яет", "ают", "яют", "ует", "уют", "ить", "ать", "ять", "еть", "уть", "ешь", "ишь",
+    "ила", "ыла", "ило", "ыло", "или", "ыли", "ите", "еите", "ет", "ит", "ут", "ют", "ть",
+    # прилагательные и причастия
+    "его", "ого", "ему", "ому", "ими", "ыми", "ее", "ие", "ые", "ое", "еи", "ии", "ыи", "ои",
+    "ем", "им", "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+    # существительные
+    "иями", "ями", "ами", "ием", "иях", "ях", "ах", "ям", "ам", "ев", "ов", "ия", "ья", "ию", "ью",
+    "а", "я", "о", "е", "и", "ы", "у", "ю", "ь",
+}, key=len, reverse=True)
+_MIN_STEM = 3
+
+# Синонимы предметной области: основа с этим началом -> общая основа
+_SYNONYMS = (
+    ("кредит", "заим"), ("заем", "заим"), ("ссуд", "заим"),
+    ("машин", "автомобил"), ("авто", "автомобил"),
+    ("процент", "ставк"), ("доходн", "доход"),
+    ("влож", "инвест"), ("вклад", "инвест"),
+)
+# Слово, которое начинается с общей основы, тоже сводится к ней
+# (инвестиции, инвестор -> инвест), а не к основе по окончанию
+_SYNONYM_PREFIXES = _SYNONYMS + tuple(
+    (canonical, canonical) for canonical in dict.fromkeys(canonical for _, canonical in _SYNONYMS)
+)
+
+_STOP_WORDS = frozenset(normalize_text(" ".join("""
+    а без более бы был была были было быть в вам вас ваш ваша ваше вы во вот все всё всего всех
+    где да для до его ее её если есть еще ещё же за и из или им их к как какая какие какой ко когда
+    кто ли либо меня мне можно мой мы на над надо нам нас не него нее неё нет ни них но ну о об
+    однако он она они оно от по под при про с себя со так также такой там те тем то того тоже
+    только том тот ту у уже чем что чтобы эта эти это этот я сколько нибудь
+""".split())).split())
+
+# Первые слова вопроса (после нормализации). Слова, с которых начинаются и
+# обычные ответы ("есть машина", "можно в залог"), сюда не входят: без знака
+# вопроса такое сообщение считается ответом на шаг сценария
+_QUESTION_WORDS = frozenset(normalize_text("""
+    как какой какая какое какие каков каковы сколько что чем где куда откуда когда почему зачем
+    ли кто чей выдаете выдаёте берете берёте
+""").split())
+
+_HEADING_RE = re.compile(r"^##\s+(.+?)\s*$")
+
+
+def stem(word: str) -> str:
+    """Основа нормализованного слова: отсекается самое длинное окончание."""
+    for prefix, canonical in _SYNONYM_PREFIXES:
+        if word.startswith(prefix):
+            return canonical
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Основы значимых слов текста."""
+    return [stem(word) for word in normalize_text(text).split() if word not in _STOP_WORDS]
+
+
+def is_question(text: str) -> bool:
+    """Похоже ли сообщение на вопрос (знак вопроса или вопросительное слово в начале)."""
+    text = text.strip()
+    if not text:
+        return False
+    if text.endswith("?"):
+        return True
+    words = normalize_text(text[:48]).split()
+    # Вопросительное слово - первое или второе ("а сколько...", "на какой срок...")
+    return len(words) > 1 and (words[0] in _QUESTION_WORDS or words[1] in _QUESTION_WORDS)
+
+
+@dataclass(frozen=True)
+class FaqEntry:
+    """Вопрос базы знаний."""
+    question: str
+    answer: str
+    source: str
+
+
+@dataclass
+class FaqMatch:
+    """Найденный ответ."""
+    entry: FaqEntry
+    score: float
+    confidence: float  # доля от наибольшего возможного счёта для слов запроса, 0..1
+
+
+def parse_faq(text: str, source: str = "") -> List[FaqEntry]:
+    """Вопросы и ответы Markdown-файла (разделы "## ")."""
+    entries = []
+    question: Optional[str] = None
+    lines: List[str] = []
+
+    def flush():
+        answer = " ".join(" ".join(lines).split())
+        if question and answer:
+            entries.append(FaqEntry(question, answer, source))
+
+    for line in text.splitlines():
+        heading = _HEADING_RE.match(line)
+        if heading:
+            flush()
+            question, lines = heading.group(1), []
+        elif line.startswith("#"):
+            flush()
+            question, lines = None, []
+        elif question is not None:
+            lines.append(line.strip())
+    flush()
+    return entries
+
+
+class FaqIndex:
+    """Обратный индекс основа -> [(номер вопроса, вес BM25)]."""
+
+    def __init__(self, entries: List[FaqEntry], postings: Dict[str, List[Tuple[int, float]]],
+                 document_count: int):
+        self.entries = entries
+        self.postings = postings
+        self.document_count = document_count
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, entries: Iterable[FaqEntry]) -> "FaqIndex":
+        """Строит индекс: веса BM25 считаются для каждой пары (основа, вопрос)."""
+        entries = list(entries)
+        frequencies: List[Dict[str, int]] = []
+        lengths: List[int] = []
+        for entry in entries:
+            terms = tokenize(entry.question) * QUESTION_WEIGHT + tokenize(entry.answer)
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            frequencies.append(counts)
+            lengths.append(len(terms))
+
+        average = sum(lengths) / len(lengths) if lengths else 0.0
+        document_count = len(entries)
+        documents: Dict[str, List[Tuple[int, int]]] = {}
+        for number, counts in enumerate(frequencies):
+            for term, count in counts.items():
+                documents.setdefault(term, []).append((number, count))
+
+        postings = {}
+        for term, items in documents.items():
+            idf = _idf(document_count, len(items))
+            postings[term] = [
+                (number, idf * count * (K1 + 1) / (count + K1 * (1 - B + B * lengths[number] / average)))
+                for number, count in items
+            ]
+        return cls(entries, postings, document_count)
+
+    def search(self, query: str, limit: int = 3) -> List[FaqMatch]:
+        """Лучшие вопросы для запроса по убыванию счёта."""
+        terms = set(tokenize(query))
+        if not terms or not self.entries:
+            return []
+
+        scores: Dict[int, float] = {}
+        best_possible = 0.0
+        for term in terms:
+            items = self.postings.get(term)
+            best_possible += _idf(self.document_count, len(items) if items else 0) * (K1 + 1)
+            if items:
+                for number, weight in items:
+                    scores[number] = scores.get(number, 0.0) + weight
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [FaqMatch(self.entries[number], score, min(score / best_possible, 1.0))
+                for number, score in ranked]
+
+    def answer(self, query: str, min_confidence: float = 0.4) -> Optional[FaqMatch]:
+        """Лучший ответ, если он достаточно уверенный, иначе None."""
+        matches = self.search(query, limit=1)
+        if matches and matches[0].confidence >= min_confidence:
+            return matches[0]
+        return None
+
+    def to_dict(self, fingerprint: str = "") -> Dict:
+        return {
+            "version": INDEX_VERSION,
+            "fingerprint": fingerprint,
+            "document_count": self.document_count,
+            "entries": [[entry.question, entry.answer, entry.source] for entry in self.entries],
+            "postings": {term: [[number, round(weight, 6)] for number, weight in items]
+                         for term, items in self.postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FaqIndex":
+        entries = [FaqEntry(*entry) for entry in data["entries"]]
+        postings = {term: [(number, weight) for number, weight in items]
+                    for term, items in data["postings"].items()}
+        return cls(entries, postings, data["document_count"])
+
+
+def _idf(document_count: int, document_frequency: int) -> float:
+    return math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+def faq_files(docs_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(docs_dir, "**", "*.md"), recursive=True))
+
+
+def fingerprint(paths: List[str], docs_dir: str) -> str:
+    """
+    Отпечаток исходных файлов (путь относительно docs_dir, размер, время
+    изменения) и версии индекса.
+    """
+    digest = hashlib.sha1(str(INDEX_VERSION).encode())
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.relpath(path, docs_dir)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def build_index(docs_dir: str) -> FaqIndex:
+    """Индекс по всем Markdown-файлам каталога."""
+    entries = []
+    for path in faq_files(docs_dir):
+        with open(path, encoding="utf-8") as file:
+            entries.extend(parse_faq(file.read(), os.path.relpath(path, docs_dir)))
+    return FaqIndex.build(entries)
+
+
+def save_index(index: FaqIndex, path: str, fingerprint: str = ""):
+    """Записывает индекс атомарно (через временный файл)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(index.to_dict(fingerprint), file, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+def load_index(docs_dir: str, index_path: str) -> FaqIndex:
+    """
+    Готовый индекс с диска; если документы изменились (или файла нет) -
+    строит индекс заново и сохраняет его.
+    """
+    expected = fingerprint(faq_files(docs_dir), docs_dir)
+    try:
+        with open(index_path, encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") == INDEX_VERSION and data.get("fingerprint") == expected:
+            return FaqIndex.from_dict(data)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error("Ошибка чтения индекса базы знаний %s: %s", index_path, e)
+
+    index = build_index(docs_dir)
+    try:
+        save_index(index, index_path, expected)
+    except OSError as e:
+        logger.error("Ошибка записи индекса базы знаний %s: %s", index_path, e)
+    logger.info("Индекс базы знаний построен: %d вопросов", len(index))
+    return index
+
+
+def create_faq_index() -> FaqIndex:
+    """Индекс базы знаний по настройкам FAQ_DOCS_DIR и FAQ_INDEX_PATH."""
+    return load_index(settings.faq_docs_dir, settings.faq_index_path)
@@ -0,0 +1,87 @@
+"""
+Индекс недавних заявок по нормализованному телефону.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from .config import settings
+
+
+@dataclass(frozen=True)
+class RecentApplication:
+    """Запись о недавней заявке."""
+    phone: str
+    session_id: str
+    user_type: str
+    created_at: float
+
+
+class RecentApplicationIndex:
+    """
+    Индекс телефон -> последняя заявка за окно дедупликации.
+
+    Записи упорядочены по времени добавления, поэтому устаревшие
+    удаляются с начала словаря, а поиск и добавление работают за O(1).
+    Размер ограничен: при переполнении вытесняются самые старые записи.
+    """
+
+    def __init__(self, window_minutes: int = 60, max_size: int = 10000):
+        self.window_seconds = window_minutes * 60
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, RecentApplication]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def find(self, phone: str, now: Optional[float] = None) -> Optional[RecentApplication]:
+        """Возвращает недавнюю заявку с этим телефоном, если она есть."""
+        now = time.time() if now is None else now
+        entry = self._entries.get(phone)
+        if entry is None or now - entry.created_at > self.window_seconds:
+            return None
+        return entry
+
+    def check_and_add(self, phone: str, session_id: str, user_type: str,
+                      now: Optional[float] = None) -> Optional[RecentApplication]:
+        """
+        Регистрирует заявку и возвращает предыдущую заявку с тем же
+        телефоном в пределах окна (или None, если заявка первая).
+        """
+        now = time.time() if now is None else now
+
+        with self._lock:
+            self._evict(now)
+            previous = self.find(phone, now)
+
+            self._entries[phone] = RecentApplication(phone, session_id, user_type, now)
+            self._entries.move_to_end(phone)
+
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return previous
+
+    def _evict(self, now: float):
+        """Удаляет записи старше окна дедупликации."""
+        entries = self._entries
+        while entries:
+            oldest = next(iter(entries.values()))
+            if now - oldest.created_at <= self.window_seconds:
+                break
+            entries.popitem(last=False)
+
+    def clear(self):
+        """Очищает индекс."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Глобальный индекс недавних заявок
+lead_index = RecentApplicationIndex(
+    window_minutes=settings.duplicate_window_minutes,
+    max_size=settings.duplicate_index_size
+)
@@ -0,0 +1,212 @@
+"""
+Настройка логирования.
+
+Записи уходят в очередь и пишутся в stdout фоновым потоком, поэтому
+запись в лог не блокирует обработку запросов. Формат - JSON (одна
+запись в строке) с session_id и шагом диалога из контекста запроса.
+Одинаковые предупреждения и ошибки (например, при недоступности
+Telegram) прореживаются: не больше burst записей за окно, число
+пропущенных указывается в следующей записи.
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Поля контекста, которые попадают в каждую запись
+CONTEXT_FIELDS = ("session_id", "step")
+
+_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+# Аргументы этих типов не меняются, их можно форматировать в фоновом потоке
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+
+@contextmanager
+def log_context(**fields):
+    """Добавляет поля (session_id, step) ко всем записям внутри блока."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def update_log_context(**fields):
+    """Дополняет контекст до конца текущего блока log_context (например, шагом после перехода)."""
+    _context.set({**_context.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    """Переносит поля контекста в запись (поля из extra имеют приоритет)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class RepeatSampler(logging.Filter):
+    """
+    Прореживание повторяющихся записей уровня WARNING и выше.
+
+    Ключ - логгер и шаблон сообщения (без аргументов), поэтому ошибки
+    с разными session_id считаются одинаковыми.
+    """
+
+    MAX_KEYS = 1000
+
+    def __init__(self, window: float = 60.0, burst: int = 20, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.clock = clock
+        self._state: Dict[Tuple[str, str], list] = {}  # ключ -> [начало окна, записано, пропущено]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or self.burst <= 0:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = self.clock()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state is not None else 0
+                if state is None and len(self._state) >= self.MAX_KEYS:
+                    self._state.pop(next(iter(self._state)))
+                self._state[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись одной строкой JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+
+        if orjson is not None:
+            return orjson.dumps(entry, default=str).decode("utf-8")
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Очередь записей без ожидания: при переполнении запись отбрасывается.
+
+    Сообщение форматируется в фоновом потоке, если аргументы неизменяемые;
+    иначе (словари, объекты) - сразу, чтобы в лог попало их текущее значение.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        if record.args and not all(isinstance(arg, _IMMUTABLE) for arg in
+                                   (record.args.values() if isinstance(record.args, dict) else record.args)):
+            record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            # Трассировка ссылается на кадры стека, её форматируем сразу
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def setup_logging(level: Optional[str] = None, log_format: Optional[str] = None, stream=None,
+                  queue_size: Optional[int] = None) -> NonBlockingQueueHandler:
+    """
+    Настраивает корневой логгер: очередь, фоновая запись, JSON или текст.
+
+    Повторный вызов заменяет прежнюю настройку.
+    """
+    global _listener, _handler
+    shutdown_logging()
+
+    log_format = log_format or settings.log_format
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size or settings.log_queue_size))
+    handler.addFilter(ContextFilter())
+    handler.addFilter(RepeatSampler(window=settings.log_sample_window_seconds, burst=settings.log_sample_burst))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel((level or settings.log_level).upper())
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    _handler = handler
+    return handler
+
+
+def shutdown_logging():
+    """Дописывает очередь записей и останавливает фоновый поток."""
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,88 @@
+"""
+Сэмплирующий профилировщик для диагностики на рабочем сервере.
+
+Фоновый поток раз в interval секунд снимает стеки всех потоков
+(sys._current_frames) и считает одинаковые стеки. Профилируемый код
+не инструментируется, поэтому накладные расходы - только сам снимок.
+Результат - collapsed stacks ("модуль:функция;...;модуль:функция N"),
+которые принимают flamegraph.pl, speedscope и inferno.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, FrozenSet, Optional, Tuple
+
+# Листовые вызовы потоков, ожидающих работы (очереди, таймеры, цикл событий)
+IDLE_LEAVES: FrozenSet[Tuple[str, str]] = frozenset({
+    ("threading", "wait"),
+    ("threading", "_wait_for_tstate_lock"),
+    ("queue", "get"),
+    ("selectors", "select"),
+    ("socket", "accept"),
+    ("socketserver", "serve_forever"),
+})
+
+MAX_DEPTH = 128
+
+
+class ProfilerBusy(Exception):
+    """Профилирование уже выполняется."""
+
+
+class SamplingProfiler:
+    """Сэмплирование стеков потоков процесса. Одновременно - один замер."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, duration: float, interval: float = 0.005, include_idle: bool = False) -> Dict[str, int]:
+        """
+        Снимает стеки в течение duration секунд (блокирует вызывающий поток).
+
+        Returns:
+            Стек (от корня к листу, через ";") -> число снимков
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("Профилирование уже выполняется")
+        try:
+            return self._sample(duration, interval, include_idle)
+        finally:
+            self._lock.release()
+
+    def _sample(self, duration: float, interval: float, include_idle: bool) -> Dict[str, int]:
+        stacks: Counter = Counter()
+        labels: Dict[object, str] = {}
+        own = threading.get_ident()
+        deadline = time.monotonic() + duration
+
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                leaf: Optional[Tuple[str, str]] = None
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+                    if leaf is None:
+                        leaf = (frame.f_globals.get("__name__", "?"), code.co_name)
+                    stack.append(label)
+                    frame = frame.f_back
+                if not stack or (not include_idle and leaf in IDLE_LEAVES):
+                    continue
+                stacks[";".join(reversed(stack))] += 1
+            time.sleep(interval)
+
+        return dict(stacks)
+
+
+def collapsed(stacks: Dict[str, int]) -> str:
+    """Стеки в формате collapsed stacks, частые - первыми."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items(), key=lambda item: -item[1]))
+
+
+# Глобальный экземпляр (один замер на процесс)
+profiler = SamplingProfiler()
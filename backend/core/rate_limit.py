@@ -0,0 +1,113 @@
+"""
+Ограничение частоты запросов чата.
+
+Token bucket на ключ (адрес клиента, сессия): ключ накапливает до burst
+запросов и восстанавливает их со скоростью rate в секунду. Число ключей
+ограничено, при переполнении вытесняются давно не использованные.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from .config import settings
+
+
+class RateLimited(Exception):
+    """Лимит исчерпан, повторить можно через retry_after секунд."""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Превышен лимит запросов ({scope})")
+        self.scope = scope
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Значение заголовка Retry-After (целые секунды, не меньше 1)."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket для множества ключей.
+
+    Вытесненный ключ начинает с полного запаса, поэтому max_keys должен
+    быть больше числа ключей, активных за время восстановления запаса.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()  # ключ -> [запас, время обновления]
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Списывает один запрос.
+
+        Returns:
+            0, если запрос разрешён, иначе - секунды до следующего разрешённого
+        """
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate if self.rate > 0 else float("inf")
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class ChatRateLimiter:
+    """
+    Лимиты маршрутов чата по настройкам приложения.
+
+    client - запросы с одного адреса, session - сообщения в одной сессии,
+    applications - завершённые заявки (уведомления в Telegram) с одного адреса.
+    """
+
+    def __init__(self):
+        max_keys = settings.rate_limit_max_keys
+        self.client = TokenBucketLimiter(settings.rate_limit_client_per_minute / 60,
+                                         settings.rate_limit_client_burst, max_keys)
+        self.session = TokenBucketLimiter(settings.rate_limit_session_per_minute / 60,
+                                          settings.rate_limit_session_burst, max_keys)
+        self.applications = TokenBucketLimiter(settings.rate_limit_applications_per_hour / 3600,
+                                               settings.rate_limit_applications_per_hour, max_keys)
+
+    def check_client(self, client: str):
+        self._check(self.client, "client", client)
+
+    def check_session(self, session_id: Optional[str]):
+        if session_id:
+            self._check(self.session, "session", session_id)
+
+    def check_application(self, client: Optional[str]):
+        if client:
+            self._check(self.applications, "applications", client)
+
+    @staticmethod
+    def _check(limiter: TokenBucketLimiter, scope: str, key: str):
+        if not settings.rate_limit_enabled:
+            return
+        retry_after = limiter.acquire(key)
+        if retry_after:
+            raise RateLimited(scope, retry_after)
+
+
+# Глобальный экземпляр (состояние своё у каждого процесса)
+rate_limiter = ChatRateLimiter()
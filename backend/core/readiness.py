@@ -0,0 +1,142 @@
+"""
+Проверки готовности к работе (readiness).
+
+Проверки каналов и хранилищ выполняются в фоновом потоке раз в
+interval секунд, проба /ready только читает сохранённые результаты.
+Поэтому частые пробы оркестратора ничего не стоят и не создают
+запросов к Telegram или почтовому серверу.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+from .session_store import session_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckResult:
+    """Результат одной проверки."""
+    ok: bool
+    checked_at: float
+    duration_ms: float
+    error: Optional[str] = None
+
+
+class ReadinessChecker:
+    """
+    Кэш результатов проверок с фоновым обновлением.
+
+    required - группы проверок: готовность требует, чтобы в каждой группе
+    прошла хотя бы одна проверка (например, Telegram или резервный email).
+    Результат старше stale_after секунд считается непройденным.
+    """
+
+    def __init__(self, checks: Dict[str, Callable[[], bool]], required: Iterable[Tuple[str, ...]] = (),
+                 interval: float = 15.0, stale_after: float = 60.0):
+        self.checks = checks
+        self.required: List[Tuple[str, ...]] = [tuple(group) for group in required]
+        self.interval = interval
+        self.stale_after = stale_after
+
+        self._results: Dict[str, CheckResult] = {}
+        self._refresh_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def refresh(self) -> Dict[str, CheckResult]:
+        """Выполняет все проверки и сохраняет результаты."""
+        with self._refresh_lock:
+            for name, check in self.checks.items():
+                started = time.perf_counter()
+                try:
+                    ok, error = bool(check()), None
+                except Exception as e:
+                    ok, error = False, str(e)
+                result = CheckResult(ok, time.time(), round((time.perf_counter() - started) * 1000, 1), error)
+                if not ok and (self._results.get(name) is None or self._results[name].ok):
+                    logger.error("Проверка готовности %s не пройдена: %s", name, error or 'нет ответа')
+                self._results[name] = result
+            return dict(self._results)
+
+    def status(self, now: Optional[float] = None) -> Tuple[bool, Dict[str, Dict[str, object]]]:
+        """
+        Готовность по сохранённым результатам (сами проверки не выполняются).
+
+        Returns:
+            (готов ли сервис, результаты проверок для ответа пробы)
+        """
+        now = time.time() if now is None else now
+        results = dict(self._results)
+
+        passed = set()
+        report = {}
+        for name in self.checks:
+            result = results.get(name)
+            if result is None:
+                report[name] = {"ok": False, "error": "ещё не проверялось"}
+                continue
+            age = now - result.checked_at
+            stale = age > self.stale_after
+            if result.ok and not stale:
+                passed.add(name)
+            report[name] = {"ok": result.ok and not stale, "age_s": round(age, 1),
+                            "duration_ms": result.duration_ms}
+            if stale:
+                report[name]["stale"] = True
+            if result.error:
+                report[name]["error"] = result.error
+
+        ready = all(passed.intersection(group) for group in self.required)
+        return ready, report
+
+    def start(self):
+        """Запускает фоновое обновление (один раз)."""
+        with self._start_lock:
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name="readiness-checker", daemon=True)
+                self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+
+def create_readiness_checker(manager) -> ReadinessChecker:
+    """
+    Проверки по настройкам приложения.
+
+    Обязательны хранилище сессий и база (если включена); из каналов
+    уведомлений достаточно одного работающего.
+    """
+    checks: Dict[str, Callable[[], bool]] = {"sessions": session_store.ping}
+    required: List[Tuple[str, ...]] = [("sessions",)]
+
+    if settings.database_enabled:
+        checks["database"] = lambda: manager.application_repository.ping()
+        required.append(("database",))
+
+    channels = []
+    if settings.telegram_enabled and settings.telegram_bot_token:
+        checks["telegram"] = lambda: manager.notification_service.telegram_sender.ping()
+        channels.append("telegram")
+    if settings.email_enabled:
+        checks["email"] = lambda: manager.notification_service.email_sender.ping()
+        channels.append("email")
+    if channels:
+        required.append(tuple(channels))
+
+    return ReadinessChecker(checks, required, interval=settings.readiness_interval_seconds,
+                            stale_after=settings.readiness_stale_seconds)
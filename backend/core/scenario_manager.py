@@ -2,9 +2,12 @@
 Управление логикой трёх сценариев.
 """
 from enum import Enum
-from typing import Dict, List, Tuple, Optional, Any
+from string import Formatter
+from typing import Callable, Dict, List, Tuple, Optional, Any
 from .models import UserType, LoanPurpose, InvestmentGoal
 from .validators import validators
+from .intent_classifier import service_classifier, borrower_classifier
+from .tracing import span
 
 
 class DialogStep(str, Enum):
@@ -86,6 +89,139 @@ class ScenarioManager:
         DialogStep.INVESTOR_CONFIRM: ["Да, отправить", "Нет, исправить"],
     }
 
+    # Сообщение для шагов без текста
+    DEFAULT_MESSAGE = "Извините, произошла ошибка."
+
+    # Подстановка для поля, которое ещё не собрано
+    MISSING_VALUE = "Не указано"
+
+    # Шаги сценариев: (шаг, поле, валидатор)
+    INDIVIDUAL_STEPS = [
+        (DialogStep.INDIVIDUAL_ASK_NAME, "name", validators.validate_name),
+        (DialogStep.INDIVIDUAL_ASK_COLLATERAL, "collateral", validators.validate_text),
+        (DialogStep.INDIVIDUAL_ASK_AMOUNT, "amount", validators.validate_amount),
+        (DialogStep.INDIVIDUAL_ASK_PURPOSE, "purpose", validators.validate_text),
+        (DialogStep.INDIVIDUAL_ASK_PHONE, "phone", validators.validate_phone),
+    ]
+
+    BUSINESS_STEPS = [
+        (DialogStep.BUSINESS_ASK_COMPANY_NAME, "company_name", validators.validate_company_name),
+        (DialogStep.BUSINESS_ASK_AMOUNT, "amount", validators.validate_amount),
+        (DialogStep.BUSINESS_ASK_COLLATERAL, "collateral", validators.validate_text),
+        (DialogStep.BUSINESS_ASK_PURPOSE, "purpose", validators.validate_text),
+        (DialogStep.BUSINESS_ASK_PHONE, "phone", validators.validate_phone),
+    ]
+
+    INVESTOR_STEPS = [
+        (DialogStep.INVESTOR_ASK_NAME, "name", validators.validate_name),
+        (DialogStep.INVESTOR_ASK_AMOUNT, "investment_amount", validators.validate_amount),
+        (DialogStep.INVESTOR_ASK_TERM, "term_months", validators.validate_term_months),
+        (DialogStep.INVESTOR_ASK_GOAL, "investment_goal", validators.validate_text),
+        (DialogStep.INVESTOR_ASK_PHONE, "phone", validators.validate_phone),
+    ]
+
+    # Шаги подтверждения и шаги, на которых собираются их данные
+    CONFIRM_STEPS = {
+        DialogStep.INDIVIDUAL_CONFIRM: INDIVIDUAL_STEPS,
+        DialogStep.BUSINESS_CONFIRM: BUSINESS_STEPS,
+        DialogStep.INVESTOR_CONFIRM: INVESTOR_STEPS,
+    }
+
+    def __init__(self):
+        self._static_messages: Dict[DialogStep, str] = {}
+        self._formatters: Dict[DialogStep, Callable[[Dict[str, Any]], str]] = {}
+        self._options: Dict[DialogStep, List[str]] = {}
+        self.compile()
+
+    def compile(self):
+        """
+        Предварительно обрабатывает тексты всех шагов.
+
+        Постоянные тексты сохраняются как есть, шаблоны подтверждения
+        компилируются в функции подстановки полей. Ссылки на поля, которые
+        сценарий не собирает, приводят к ValueError здесь, а не на запросе.
+        """
+        self._static_messages.clear()
+        self._formatters.clear()
+        self._options.clear()
+
+        for step in DialogStep:
+            template = self.MESSAGES.get(step, self.DEFAULT_MESSAGE)
+            parts = self._parse_template(step, template)
+
+            if len(parts) == 1 and isinstance(parts[0], str):
+                self._static_messages[step] = parts[0]
+            elif not parts:
+                self._static_messages[step] = ""
+            else:
+                self._formatters[step] = self._build_formatter(parts)
+
+            self._options[step] = list(self.OPTIONS.get(step, []))
+
+    def _parse_template(self, step: DialogStep, template: str) -> List[Any]:
+        """Разбирает шаблон на литералы и (поле, формат) с проверкой полей."""
+        parts: List[Any] = []
+        allowed_fields = None
+
+        for literal, field, format_spec, conversion in Formatter().parse(template):
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+
+            if allowed_fields is None:
+                if step not in self.CONFIRM_STEPS:
+                    raise ValueError(f"Шаг {step.value}: шаблон без сценария, собирающего данные")
+                allowed_fields = {field_name for _, field_name, _ in self.CONFIRM_STEPS[step]}
+
+            if field not in allowed_fields:
+                raise ValueError(f"Шаг {step.value}: поле '{field}' не собирается в сценарии")
+            if conversion:
+                raise ValueError(f"Шаг {step.value}: преобразование !{conversion} не поддерживается")
+            if format_spec:
+                # Числовой формат проверяем сразу, а не на первом запросе
+                format(0, format_spec)
+
+            parts.append((field, format_spec))
+
+        # Склеиваем соседние литералы
+        merged: List[Any] = []
+        for part in parts:
+            if merged and isinstance(part, str) and isinstance(merged[-1], str):
+                merged[-1] += part
+            else:
+                merged.append(part)
+        return merged
+
+    def _build_formatter(self, parts: List[Any]) -> Callable[[Dict[str, Any]], str]:
+        """Создаёт функцию, подставляющую поля сессии в скомпилированный шаблон."""
+        missing = self.MISSING_VALUE
+        compiled = tuple(
+            (part, None, None) if isinstance(part, str) else (None, part[0], part[1])
+            for part in parts
+        )
+
+        def render(data: Dict[str, Any]) -> str:
+            chunks = []
+            for literal, field, format_spec in compiled:
+                if literal is not None:
+                    chunks.append(literal)
+                    continue
+
+                value = data.get(field)
+                if value is None:
+                    chunks.append(missing)
+                elif format_spec:
+                    try:
+                        chunks.append(format(value, format_spec))
+                    except (ValueError, TypeError):
+                        chunks.append(str(value))
+                else:
+                    chunks.append(str(value))
+            return "".join(chunks)
+
+        return render
+
     def get_next_step(self, current_step: DialogStep, user_input: str,
                       session_data: Dict[str, Any]) -> Tuple[DialogStep, Dict[str, Any]]:
         """Определяет следующий шаг на основе текущего и ввода пользователя."""
@@ -96,24 +232,26 @@ class ScenarioManager:
 
         # Определение типа услуги
         if current_step == DialogStep.ASK_LOAN_OR_INVEST:
-            user_input_lower = user_input.lower()
-            if "займ" in user_input_lower or "кредит" in user_input_lower:
+            intent = service_classifier.classify(user_input).intent
+            if intent == "loan":
                 session_data["service_type"] = "loan"
                 return DialogStep.ASK_INDIVIDUAL_OR_BUSINESS, {}
-            elif "инвест" in user_input_lower:
+            elif intent == "invest":
                 session_data["service_type"] = "invest"
                 session_data["user_type"] = UserType.INVESTOR
                 return DialogStep.INVESTOR_ASK_NAME, {}
+            return current_step, {"error": "Пожалуйста, выберите: «Займ» или «Инвестировать»"}
 
         # Определение типа заемщика
         if current_step == DialogStep.ASK_INDIVIDUAL_OR_BUSINESS:
-            user_input_lower = user_input.lower()
-            if "физ" in user_input_lower or "лич" in user_input_lower:
+            intent = borrower_classifier.classify(user_input).intent
+            if intent == "individual":
                 session_data["user_type"] = UserType.INDIVIDUAL
                 return DialogStep.INDIVIDUAL_ASK_NAME, {}
-            elif "биз" in user_input_lower or "юр" in user_input_lower or "ип" in user_input_lower:
+            elif intent == "business":
                 session_data["user_type"] = UserType.BUSINESS
                 return DialogStep.BUSINESS_ASK_COMPANY_NAME, {}
+            return current_step, {"error": "Пожалуйста, выберите: «Физическое лицо» или «Бизнес»"}
 
         # Обработка сценариев
         if session_data.get("user_type") == UserType.INDIVIDUAL:
@@ -129,18 +267,13 @@ class ScenarioManager:
                                     session_data: Dict[str, Any]) -> Tuple[DialogStep, Dict[str, Any]]:
         """Обработка сценария физического лица."""
 
-        steps = [
-            (DialogStep.INDIVIDUAL_ASK_NAME, "name", validators.validate_name),
-            (DialogStep.INDIVIDUAL_ASK_COLLATERAL, "collateral", None),
-            (DialogStep.INDIVIDUAL_ASK_AMOUNT, "amount", validators.validate_amount),
-            (DialogStep.INDIVIDUAL_ASK_PURPOSE, "purpose", None),
-            (DialogStep.INDIVIDUAL_ASK_PHONE, "phone", validators.validate_phone),
-        ]
+        steps = self.INDIVIDUAL_STEPS
 
         for step, field, validator in steps:
             if current_step == step:
                 if validator:
-                    is_valid, result = validator(user_input)
+                    with span("validation"):
+                        is_valid, result = validator(user_input)
                     if not is_valid:
                         return current_step, {"error": result}
                     session_data[field] = result
@@ -169,18 +302,13 @@ class ScenarioManager:
                                   session_data: Dict[str, Any]) -> Tuple[DialogStep, Dict[str, Any]]:
         """Обработка сценария бизнеса."""
 
-        steps = [
-            (DialogStep.BUSINESS_ASK_COMPANY_NAME, "company_name", validators.validate_company_name),
-            (DialogStep.BUSINESS_ASK_AMOUNT, "amount", validators.validate_amount),
-            (DialogStep.BUSINESS_ASK_COLLATERAL, "collateral", None),
-            (DialogStep.BUSINESS_ASK_PURPOSE, "purpose", None),
-            (DialogStep.BUSINESS_ASK_PHONE, "phone", validators.validate_phone),
-        ]
+        steps = self.BUSINESS_STEPS
 
         for step, field, validator in steps:
             if current_step == step:
                 if validator:
-                    is_valid, result = validator(user_input)
+                    with span("validation"):
+                        is_valid, result = validator(user_input)
                     if not is_valid:
                         return current_step, {"error": result}
                     session_data[field] = result
@@ -205,18 +333,13 @@ class ScenarioManager:
                                   session_data: Dict[str, Any]) -> Tuple[DialogStep, Dict[str, Any]]:
         """Обработка сценария инвестора."""
 
-        steps = [
-            (DialogStep.INVESTOR_ASK_NAME, "name", validators.validate_name),
-            (DialogStep.INVESTOR_ASK_AMOUNT, "investment_amount", validators.validate_amount),
-            (DialogStep.INVESTOR_ASK_TERM, "term_months", validators.validate_term_months),
-            (DialogStep.INVESTOR_ASK_GOAL, "investment_goal", None),
-            (DialogStep.INVESTOR_ASK_PHONE, "phone", validators.validate_phone),
-        ]
+        steps = self.INVESTOR_STEPS
 
         for step, field, validator in steps:
             if current_step == step:
                 if validator:
-                    is_valid, result = validator(user_input)
+                    with span("validation"):
+                        is_valid, result = validator(user_input)
                     if not is_valid:
                         return current_step, {"error": result}
                     session_data[field] = result
@@ -237,21 +360,46 @@ class ScenarioManager:
 
         return DialogStep.ERROR, {"error": "Неизвестный шаг в сценарии инвестора"}
 
+    def warm_up(self):
+        """
+        Прогоняет классификаторы, валидаторы и шаблоны всех шагов.
+
+        Вызывается при запуске, чтобы первый пользователь не платил
+        за ленивую инициализацию (компиляция регулярных выражений и т.п.).
+        """
+        for user_input in ("займ", "инвестировать"):
+            self.get_next_step(DialogStep.ASK_LOAN_OR_INVEST, user_input, {})
+        for user_input in ("физическое лицо", "бизнес"):
+            self.get_next_step(DialogStep.ASK_INDIVIDUAL_OR_BUSINESS, user_input, {})
+
+        for confirm, steps in self.CONFIRM_STEPS.items():
+            data = {"user_type": UserType(confirm.value.split("_", 1)[0])}
+            for step, _, _ in steps:
+                self.get_next_step(step, "", dict(data))
+
+        for step in DialogStep:
+            self.get_message(step, {})
+            self.get_options(step)
+
     def get_message(self, step: DialogStep, data: Dict[str, Any] = None) -> str:
         """Получает текст сообщения для шага."""
-        message_template = self.MESSAGES.get(step, "Извините, произошла ошибка.")
+        message = self._static_messages.get(step)
+        if message is not None:
+            return message
+
+        formatter = self._formatters.get(step)
+        if formatter is None:
+            return self.DEFAULT_MESSAGE
 
-        if data and "{" in message_template:
-            try:
-                return message_template.format(**data)
-            except KeyError:
-                return message_template
+        return formatter(data or {})
 
-        return message_template
+    def get_static_message(self, step: DialogStep) -> Optional[str]:
+        """Возвращает постоянный текст шага или None для шаблонных шагов."""
+        return self._static_messages.get(step)
 
     def get_options(self, step: DialogStep) -> List[str]:
         """Получает варианты ответов для шага."""
-        return self.OPTIONS.get(step, [])
+        return self._options.get(step, [])
 
 
 scenario_manager = ScenarioManager()
\ No newline at end of file
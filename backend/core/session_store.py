@@ -1,24 +1,39 @@
 """
 Хранилище сессий в памяти с очисткой по таймауту.
 """
-import uuid
 import time
 from typing import Dict, Optional
-from datetime import datetime, timedelta
 
 from .config import settings
 from .models import DialogState
+from .sharding import make_session_id
 
 class SessionStore:
-    """Хранилище диалоговых сессий в оперативной памяти."""
+    """
+    Хранилище диалоговых сессий в оперативной памяти.
 
-    def __init__(self):
+    Сессия, которую не обновляли дольше timeout_minutes, считается
+    истёкшей; истёкшие сессии удаляются при создании новых (не чаще
+    раза в CLEANUP_INTERVAL секунд).
+    """
+
+    CLEANUP_INTERVAL = 60
+
+    def __init__(self, timeout_minutes: Optional[int] = None):
         self.sessions: Dict[str, DialogState] = {}
-        self.timeout_minutes = settings.session_timeout_minutes
+        self.timeout_minutes = settings.session_timeout_minutes if timeout_minutes is None else timeout_minutes
+        # session_id -> время последнего обновления
+        self._updated: Dict[str, float] = {}
+        self._last_cleanup = time.time()
 
     def create_session(self) -> str:
         """Создаёт новую сессию и возвращает её ID."""
-        session_id = str(uuid.uuid4())
+        now = time.time()
+        if now - self._last_cleanup >= self.CLEANUP_INTERVAL:
+            self.cleanup_expired(now)
+
+        session_id = make_session_id(settings.worker_id)
+        self._updated[session_id] = now
         self.sessions[session_id] = DialogState(
             session_id=session_id,
             user_type=None,
@@ -29,12 +44,13 @@ class SessionStore:
         return session_id
 
     def get_session(self, session_id: str) -> Optional[DialogState]:
-        """Получает сессию по ID, проверяя таймаут."""
+        """Получает сессию по ID (None, если нет или истёк таймаут)."""
         if session_id not in self.sessions:
             return None
 
-        # Здесь можно добавить проверку таймаута по времени создания
-        # Пока просто возвращаем сессию
+        if self._expired(self._updated[session_id], time.time()):
+            self.delete_session(session_id)
+            return None
         return self.sessions[session_id]
 
     def update_session(self, session_id: str, updates: dict):
@@ -42,24 +58,51 @@ class SessionStore:
         if session_id in self.sessions:
             for key, value in updates.items():
                 setattr(self.sessions[session_id], key, value)
+            self._updated[session_id] = time.time()
 
     def delete_session(self, session_id: str):
         """Удаляет сессию."""
         if session_id in self.sessions:
             del self.sessions[session_id]
+            del self._updated[session_id]
 
-    def cleanup_expired(self):
-        """Очищает просроченные сессии."""
-        current_time = datetime.now()
-        expired = []
+    def __len__(self) -> int:
+        return len(self.sessions)
 
-        for session_id, session in self.sessions.items():
-            # Здесь добавим логику проверки времени
-            pass
+    def ping(self) -> bool:
+        """Проверка хранилища для пробы готовности (в памяти - всегда доступно)."""
+        return True
 
+    def cleanup_expired(self, now: Optional[float] = None) -> int:
+        """Удаляет сессии с истёкшим таймаутом. Возвращает их число."""
+        now = time.time() if now is None else now
+        expired = [session_id for session_id, updated in self._updated.items() if self._expired(updated, now)]
         for session_id in expired:
-            del self.sessions[session_id]
+            self.delete_session(session_id)
+        self._last_cleanup = now
+        return len(expired)
+
+    def _expired(self, updated: float, now: float) -> bool:
+        return now - updated > self.timeout_minutes * 60
+
+
+def create_session_store():
+    """
+    Хранилище по настройке SESSION_BACKEND.
+
+    memory - словарь в памяти процесса (один воркер), shared - файл в
+    разделяемой памяти, общий для всех воркеров на сервере.
+    """
+    if settings.session_backend == "shared":
+        from .shared_session_store import SharedSessionStore
+        return SharedSessionStore(
+            path=settings.session_shm_path or None,
+            slots=settings.session_shm_slots,
+            slot_bytes=settings.session_shm_slot_bytes,
+            timeout_minutes=settings.session_timeout_minutes,
+        )
+    return SessionStore()
 
 
 # Глобальный экземпляр хранилища
-session_store = SessionStore()
\ No newline at end of file
+session_store = create_session_store()
\ No newline at end of file
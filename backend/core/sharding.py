@@ -0,0 +1,28 @@
+"""
+Номер воркера в ID сессии для липкой маршрутизации.
+
+Воркер с настройкой WORKER_ID создаёт сессии вида "<номер>.<uuid>",
+и маршрутизатор перед воркерами (backend/api/sticky_router.py)
+отправляет все запросы сессии тому воркеру, в памяти которого она
+хранится. Без WORKER_ID ID сессии - обычный UUID.
+"""
+import uuid
+from typing import Optional
+
+SEPARATOR = "."
+
+
+def make_session_id(worker_id: Optional[int] = None) -> str:
+    """Новый ID сессии с номером воркера (если он задан)."""
+    session_id = str(uuid.uuid4())
+    return session_id if worker_id is None else f"{worker_id}{SEPARATOR}{session_id}"
+
+
+def session_worker(session_id: Optional[str]) -> Optional[int]:
+    """Номер воркера из ID сессии (None, если номера нет)."""
+    if not session_id:
+        return None
+    prefix, separator, _ = session_id.partition(SEPARATOR)
+    if not separator or not (prefix.isascii() and prefix.isdigit()) or len(prefix) > 4:
+        return None
+    return int(prefix)
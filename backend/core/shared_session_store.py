@@ -0,0 +1,328 @@
+"""
+Хранилище сессий в разделяемой памяти для нескольких процессов.
+
+Файл (по умолчанию в /dev/shm) отображается в память каждым воркером
+uvicorn, поэтому любой воркер обслуживает любую сессию без обращения
+к внешнему сервису. Файл - хэш-таблица с фиксированным числом слотов
+одинакового размера и линейным пробированием.
+
+Слот: seq (seqlock), состояние, UUID сессии, время обновления, длина
+и JSON с шагом, типом пользователя и собранными данными. Чтение идёт
+без блокировок: если seq нечётный или изменился за время чтения,
+слот читается заново. Запись - под блокировкой слота (поток процесса
+и fcntl-блокировка байта слота между процессами).
+"""
+import fcntl
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from .models import DialogState, UserType
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+MAGIC = b"BBKSESS1"
+_HEADER = struct.Struct("<8sII")             # magic, число слотов, размер слота
+HEADER_SIZE = 64
+_SEQ = struct.Struct("<I")
+_SLOT = struct.Struct("<IB3x16sdH")          # seq, состояние, UUID, время обновления, длина данных
+_KEY = struct.Struct("<IB3x16sd")            # то же без длины - для пробирования
+
+EMPTY, USED, DELETED = 0, 1, 2
+
+
+def default_path(slots: int, slot_bytes: int) -> str:
+    """
+    Файл в /dev/shm (в памяти), если он есть, иначе во временном каталоге.
+
+    Размеры входят в имя: после их изменения воркеры новой версии
+    открывают новый файл, а не размечают заново файл работающих воркеров.
+    """
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"bbkinvest-sessions-{slots}x{slot_bytes}")
+
+
+def _parse_key(session_id: str) -> Optional[bytes]:
+    """UUID сессии в 16 байт (None для строк не в формате UUID)."""
+    if not isinstance(session_id, str) or len(session_id) != 36 or session_id.count("-") != 4:
+        return None
+    try:
+        key = bytes.fromhex(session_id.replace("-", ""))
+    except ValueError:
+        return None
+    return key if len(key) == 16 else None
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+class SharedSessionStore:
+    """
+    Хранилище сессий в файле, отображённом в память.
+
+    Интерфейс совпадает с SessionStore. get_session возвращает копию
+    сессии: изменения сохраняются только через update_session (так
+    работает менеджер диалога). Сессии старше timeout_minutes считаются
+    удалёнными, их слоты занимают новые сессии.
+    """
+
+    MAX_PROBES = 64     # длина цепочки пробирования; при заполнении выше ~70% растёт
+    STRIPES = 64        # блокировки потоков внутри процесса
+    READ_RETRIES = 100
+
+    def __init__(self, path: Optional[str] = None, slots: int = 16384, slot_bytes: int = 4096,
+                 timeout_minutes: int = 15):
+        if slot_bytes <= _SLOT.size:
+            raise ValueError(f"Размер слота должен быть больше {_SLOT.size} байт")
+
+        self.path = path or default_path(slots, slot_bytes)
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.payload_max = slot_bytes - _SLOT.size
+        self.timeout_seconds = timeout_minutes * 60
+
+        self._size = HEADER_SIZE + slots * slot_bytes
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._init_file()
+        except ValueError:
+            os.close(self._fd)
+            raise
+        self._mm = mmap.mmap(self._fd, self._size)
+        self._stripes = [threading.Lock() for _ in range(self.STRIPES)]
+
+    def _init_file(self):
+        """
+        Размечает файл, если он только что создан (пуст или без заголовка).
+
+        Размеченный файл с другими размерами не трогается: его могут
+        использовать работающие воркеры, и разметка заново стёрла бы их
+        сессии (а усечение отображённого файла - SIGBUS). ValueError.
+        """
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self._fd, _HEADER.size, 0)
+            if not header.strip(b"\0"):
+                # Новый файл (или процесс упал до записи заголовка - файл ещё никто не отобразил)
+                os.ftruncate(self._fd, self._size)
+                os.pwrite(self._fd, _HEADER.pack(MAGIC, self.slots, self.slot_bytes), 0)
+                return
+            if (len(header) < _HEADER.size or _HEADER.unpack(header) != (MAGIC, self.slots, self.slot_bytes)
+                    or os.fstat(self._fd).st_size != self._size):
+                raise ValueError(
+                    f"Файл сессий {self.path} размечен для других размеров: задайте одинаковые "
+                    f"SESSION_SHM_SLOTS ({self.slots}) и SESSION_SHM_SLOT_BYTES ({self.slot_bytes}) "
+                    f"во всех воркерах или другой SESSION_SHM_PATH")
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+    # --- Интерфейс хранилища ---
+
+    def create_session(self) -> str:
+        """Создаёт новую сессию и возвращает её ID."""
+        key = uuid.uuid4().bytes
+        state = DialogState(session_id=str(uuid.UUID(bytes=key)), user_type=None,
+                            current_step="welcome", collected_data={}, completed=False)
+        payload = self._encode(state)
+
+        for attempt in range(2):
+            now = time.time()
+            for index in self._probe(key):
+                offset = self._offset(index)
+                _, status, _, updated = _KEY.unpack_from(self._mm, offset)
+                if status == USED and not self._expired(updated, now):
+                    continue
+                with self._locked(index):
+                    _, status, _, updated = _KEY.unpack_from(self._mm, offset)
+                    if status == USED and not self._expired(updated, now):
+                        continue
+                    self._write(offset, USED, key, now, payload)
+                return state.session_id
+            # Цепочка занята живыми сессиями: освобождаем удалённые и повторяем
+            if attempt == 0:
+                self.cleanup_expired()
+        raise RuntimeError("Хранилище сессий заполнено")
+
+    def get_session(self, session_id: str) -> Optional[DialogState]:
+        """Получает копию сессии по ID (None, если нет или истёк таймаут)."""
+        found = self._find(session_id)
+        return self._decode(found[2], session_id) if found is not None else None
+
+    def update_session(self, session_id: str, updates: dict):
+        """Обновляет данные сессии."""
+        found = self._find(session_id)
+        if found is None:
+            return
+        key, index, _ = found
+        offset = self._offset(index)
+        with self._locked(index):
+            _, status, stored_key, updated, length = _SLOT.unpack_from(self._mm, offset)
+            if status != USED or stored_key != key:
+                return
+            start = offset + _SLOT.size
+            state = self._decode(self._mm[start:start + length], session_id)
+            for field, value in updates.items():
+                setattr(state, field, value)
+            self._write(offset, USED, key, time.time(), self._encode(state))
+
+    def delete_session(self, session_id: str):
+        """Удаляет сессию."""
+        found = self._find(session_id)
+        if found is None:
+            return
+        key, index, _ = found
+        offset = self._offset(index)
+        with self._locked(index):
+            _, status, stored_key, _ = _KEY.unpack_from(self._mm, offset)
+            if status == USED and stored_key == key:
+                self._mark(offset, DELETED)
+
+    def ping(self) -> bool:
+        """Проверка хранилища для пробы готовности: файл на месте и размечен."""
+        return _HEADER.unpack_from(self._mm, 0) == (MAGIC, self.slots, self.slot_bytes)
+
+    def cleanup_expired(self, now: Optional[float] = None) -> int:
+        """Помечает удалёнными сессии с истёкшим таймаутом. Возвращает их число."""
+        now = time.time() if now is None else now
+        removed = 0
+        for index in range(self.slots):
+            offset = self._offset(index)
+            _, status, _, updated = _KEY.unpack_from(self._mm, offset)
+            if status != USED or not self._expired(updated, now):
+                continue
+            with self._locked(index):
+                _, status, _, updated = _KEY.unpack_from(self._mm, offset)
+                if status == USED and self._expired(updated, now):
+                    self._mark(offset, DELETED)
+                    removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        """Число живых сессий (полный просмотр файла)."""
+        now = time.time()
+        count = 0
+        for index in range(self.slots):
+            _, status, _, updated = _KEY.unpack_from(self._mm, self._offset(index))
+            if status == USED and not self._expired(updated, now):
+                count += 1
+        return count
+
+    # --- Слоты ---
+
+    def _offset(self, index: int) -> int:
+        return HEADER_SIZE + index * self.slot_bytes
+
+    def _expired(self, updated: float, now: float) -> bool:
+        return now - updated > self.timeout_seconds
+
+    def _probe(self, key: bytes) -> Iterator[int]:
+        home = int.from_bytes(key[:8], "little") % self.slots
+        for step in range(min(self.MAX_PROBES, self.slots)):
+            yield (home + step) % self.slots
+
+    def _find(self, session_id: str) -> Optional[Tuple[bytes, int, bytes]]:
+        """Ищет живую сессию: (UUID, номер слота, данные) или None."""
+        key = _parse_key(session_id)
+        if key is None:
+            return None
+
+        now = time.time()
+        for index in self._probe(key):
+            status, stored_key, updated, payload = self._read(index, key)
+            if status == EMPTY:
+                return None
+            if status == USED and stored_key == key:
+                return (key, index, payload) if not self._expired(updated, now) else None
+        return None
+
+    def _read(self, index: int, key: bytes) -> Tuple[int, bytes, float, Optional[bytes]]:
+        """
+        Заголовок слота (seqlock); данные - только если в слоте сессия key.
+
+        Returns:
+            (состояние, UUID, время обновления, данные или None)
+        """
+        offset = self._offset(index)
+        for _ in range(self.READ_RETRIES):
+            seq, status, stored_key, updated, length = _SLOT.unpack_from(self._mm, offset)
+            if seq & 1:
+                continue
+            payload = None
+            if stored_key == key:
+                start = offset + _SLOT.size
+                payload = self._mm[start:start + min(length, self.payload_max)]
+            if _SEQ.unpack_from(self._mm, offset)[0] == seq:
+                return status, stored_key, updated, payload
+        # Запись не завершилась (процесс упал посреди записи) - читаем под блокировкой
+        with self._locked(index):
+            _, status, stored_key, updated, length = _SLOT.unpack_from(self._mm, offset)
+            if length > self.payload_max:
+                # Длина испорчена недописанной записью: слот считается удалённым
+                return DELETED if status == USED else status, stored_key, updated, None
+            start = offset + _SLOT.size
+            return status, stored_key, updated, self._mm[start:start + length]
+
+    def _write(self, offset: int, status: int, key: bytes, updated: float, payload: bytes):
+        """Запись слота под блокировкой: seq нечётный на время записи."""
+        if len(payload) > self.payload_max:
+            raise ValueError(f"Данные сессии ({len(payload)} байт) не помещаются в слот "
+                             f"({self.payload_max} байт)")
+        seq = _SEQ.unpack_from(self._mm, offset)[0] | 1
+        _SEQ.pack_into(self._mm, offset, seq)
+        start = offset + _SLOT.size
+        self._mm[start:start + len(payload)] = payload
+        _SLOT.pack_into(self._mm, offset, seq, status, key, updated, len(payload))
+        _SEQ.pack_into(self._mm, offset, seq + 1)
+
+    def _mark(self, offset: int, status: int):
+        seq = _SEQ.unpack_from(self._mm, offset)[0] | 1
+        _SEQ.pack_into(self._mm, offset, seq)
+        self._mm[offset + _SEQ.size] = status
+        _SEQ.pack_into(self._mm, offset, seq + 1)
+
+    @contextmanager
+    def _locked(self, index: int):
+        """Блокировка слота: поток процесса, затем fcntl-блокировка первого байта слота."""
+        offset = self._offset(index)
+        with self._stripes[index % self.STRIPES]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, offset)
+
+    # --- Сериализация ---
+
+    @staticmethod
+    def _encode(state: DialogState) -> bytes:
+        user_type = state.user_type.value if hasattr(state.user_type, "value") else state.user_type
+        return _dumps([user_type, state.current_step, state.completed, state.collected_data])
+
+    @staticmethod
+    def _decode(raw: bytes, session_id: str) -> DialogState:
+        user_type, step, completed, data = _loads(raw)
+        if data.get("user_type"):
+            data["user_type"] = UserType(data["user_type"])
+        return DialogState(session_id=session_id, user_type=user_type, current_step=step,
+                           collected_data=data, completed=completed)
@@ -0,0 +1,66 @@
+"""
+Трассировка отдельного запроса: время этапов обработки.
+
+Этапы размечаются span("имя") в коде диалога. Вне трассировки span
+ничего не делает (одна проверка переменной контекста), поэтому разметка
+остаётся в горячем пути. Трассировку запроса включает TraceMiddleware
+(заголовок X-Trace при TRACE_ENABLED), итог уходит в заголовок
+Server-Timing ответа.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Span = Tuple[str, float]
+
+_spans: ContextVar[Optional[List[Span]]] = ContextVar("trace_spans", default=None)
+
+
+class span:
+    """Замер этапа: with span("validation"): ..."""
+
+    __slots__ = ("name", "spans", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.spans = _spans.get()
+
+    def __enter__(self):
+        if self.spans is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.spans is not None:
+            self.spans.append((self.name, time.perf_counter() - self.started))
+        return False
+
+
+@contextmanager
+def trace() -> Iterator[List[Span]]:
+    """Включает запись этапов внутри блока; возвращает список (этап, секунды)."""
+    spans: List[Span] = []
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+def summarize(spans: List[Span]) -> Dict[str, Tuple[int, float]]:
+    """Этап -> (число вызовов, суммарное время в мс), в порядке первого вызова."""
+    summary: Dict[str, Tuple[int, float]] = {}
+    for name, seconds in spans:
+        count, total = summary.get(name, (0, 0.0))
+        summary[name] = (count + 1, total + seconds * 1000)
+    return summary
+
+
+def server_timing(spans: List[Span], total: Optional[float] = None) -> str:
+    """Значение заголовка Server-Timing."""
+    parts = [f"{name};dur={duration:.3f}" + (f';desc="x{count}"' if count > 1 else "")
+             for name, (count, duration) in summarize(spans).items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
@@ -0,0 +1,430 @@
+"""
+Журнал переписки по сессиям.
+
+Каждый обмен (ввод пользователя и ответ бота) дописывается строкой JSON
+в конец текущего сегмента. Запись идёт в фоновом потоке с периодическим
+fsync; сегменты ротируются по размеру и возрасту и удаляются целиком по
+истечении срока хранения (в переписке есть персональные данные).
+Открытый для записи сегмент писатель держит под блокировкой (flock):
+чужой текущий сегмент не удаляется, даже если в него давно не писали.
+
+Каждый процесс (воркер) пишет свои сегменты: в имени сегмента - метка
+писателя. Для поиска переписки сессии в памяти хранится индекс
+session_id -> позиции записей, поэтому чтение не сканирует журнал.
+Свои записи попадают в индекс при записи, записи других воркеров -
+при чтении: дочитываются только новые строки их сегментов.
+"""
+import fcntl
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .background import BackgroundWriter
+from .config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# transcript-<писатель>-<номер>.jsonl; без метки - сегменты прежних версий
+SEGMENT_PATTERN = re.compile(r"^transcript-(?:([A-Za-z0-9]+)-)?(\d{8})\.jsonl$")
+
+# Позиция записи упаковывается в одно целое: номер сегмента в индексе и смещение
+_OFFSET_BITS = 40
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+
+
+def _dumps(record: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _loads(line: bytes) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def segment_name(sequence: int, writer: str = "") -> str:
+    if writer:
+        return f"transcript-{writer}-{sequence:08d}.jsonl"
+    return f"transcript-{sequence:08d}.jsonl"
+
+
+def _remove_unlocked(path: str) -> bool:
+    """Удаляет сегмент, если его не держит открытым для записи ни один писатель."""
+    with open(path, "rb") as handle:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        os.remove(path)
+        return True
+
+
+def default_writer() -> str:
+    """Метка писателя: номер воркера (WORKER_ID), иначе PID процесса."""
+    if settings.worker_id is not None:
+        return f"w{settings.worker_id}"
+    return f"p{os.getpid()}"
+
+
+class TranscriptLog(BackgroundWriter):
+    """
+    Журнал переписки из сегментов JSON Lines.
+
+    Запись: {"s": session_id, "t": время, "step": шаг, "in": ввод, "out": ответ}
+    """
+
+    thread_name = "transcript-writer"
+
+    def __init__(self, directory: str, segment_max_bytes: int = 16 * 1024 * 1024,
+                 segment_max_minutes: int = 60, retention_hours: int = 24,
+                 fsync_interval: float = 1.0, max_queue_size: int = 10000,
+                 writer: Optional[str] = None):
+        super().__init__(max_queue_size)
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_seconds = segment_max_minutes * 60
+        self.retention_seconds = retention_hours * 3600
+        self.fsync_interval = fsync_interval
+        self.writer = writer or default_writer()
+        self.dropped = 0
+
+        # session_id -> упакованные позиции записей; сегмент -> его сессии
+        self._index: Dict[str, List[int]] = {}
+        self._segment_sessions: Dict[int, Set[str]] = {}
+        # Файл сегмента <-> его номер в индексе; сколько байт сегмента проиндексировано
+        self._segment_numbers: Dict[str, int] = {}
+        self._segment_files: Dict[int, str] = {}
+        self._indexed_bytes: Dict[int, int] = {}
+        self._next_number = 0
+        self._index_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._index_loaded = False
+
+        self._file = None
+        self._file_number = 0
+        self._sequence = 0
+        self._segment_size = 0
+        self._segment_opened = 0.0
+        self._last_fsync = 0.0
+        self._last_sweep = 0.0
+
+    # --- Запись ---
+
+    def append(self, session_id: str, step: str, user_message: str, bot_message: str) -> bool:
+        """Ставит обмен в очередь на запись. Не блокирует."""
+        if self._stopped:
+            return False
+
+        self.start()
+        try:
+            self._queue.put_nowait({
+                "s": session_id, "t": round(time.time(), 3), "step": step,
+                "in": user_message, "out": bot_message,
+            })
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.error("Очередь журнала переписки переполнена, запись сессии %s потеряна", session_id)
+            return False
+
+    # --- Чтение ---
+
+    def get_transcript(self, session_id: str) -> List[Dict[str, Any]]:
+        """Все записи сессии по времени (сессию могли обслуживать несколько воркеров)."""
+        self._refresh_index()
+        with self._index_lock:
+            positions = list(self._index.get(session_id, ()))
+            files = dict(self._segment_files)
+
+        records = []
+        handle, handle_number = None, None
+        try:
+            for position in positions:
+                number, offset = position >> _OFFSET_BITS, position & _OFFSET_MASK
+                if number != handle_number:
+                    if handle is not None:
+                        handle.close()
+                    try:
+                        handle = open(os.path.join(self.directory, files[number]), "rb")
+                    except (FileNotFoundError, KeyError):
+                        # Сегмент удалён по сроку хранения между чтением индекса и файла
+                        handle, handle_number = None, None
+                        continue
+                    handle_number = number
+                handle.seek(offset)
+                records.append(_loads(handle.readline()))
+        finally:
+            if handle is not None:
+                handle.close()
+        # Сортировка устойчивая: записи одного воркера с равным временем сохраняют порядок
+        records.sort(key=lambda record: record["t"])
+        return records
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """Все записи журнала по сегментам, строками JSON (для выгрузки)."""
+        for name in self._segments():
+            try:
+                with open(os.path.join(self.directory, name), "rb") as handle:
+                    for line in handle:
+                        if line.endswith(b"\n"):
+                            yield line
+            except FileNotFoundError:
+                continue
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Все записи журнала по сегментам."""
+        for line in self.iter_lines():
+            yield _loads(line)
+
+    def __contains__(self, session_id: str) -> bool:
+        self._refresh_index()
+        return session_id in self._index
+
+    # --- Срок хранения ---
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Удаляет сегменты (всех воркеров), последняя запись в которые старше
+        срока хранения. Текущие сегменты писателей не удаляются: свой
+        закрывает фоновый поток (_close_expired_segment), чужой - его воркер.
+        """
+        now = time.time() if now is None else now
+        current = segment_name(self._sequence, self.writer) if self._file is not None else None
+        removed = 0
+
+        for name in self._segments():
+            if name == current:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) <= self.retention_seconds or not _remove_unlocked(path):
+                    continue
+            except FileNotFoundError:
+                pass
+            self._forget_segment(name)
+            removed += 1
+
+        self._last_sweep = now
+        return removed
+
+    def _forget_segment(self, name: str):
+        with self._index_lock:
+            number = self._segment_numbers.pop(name, None)
+            if number is None:
+                return
+            del self._segment_files[number]
+            self._indexed_bytes.pop(number, None)
+            for session_id in self._segment_sessions.pop(number, ()):
+                positions = [p for p in self._index.get(session_id, ()) if p >> _OFFSET_BITS != number]
+                if positions:
+                    self._index[session_id] = positions
+                else:
+                    self._index.pop(session_id, None)
+
+    # --- Индекс ---
+
+    def _segments(self) -> List[str]:
+        """Имена сегментов по писателю и номеру."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        matches = [match for match in map(SEGMENT_PATTERN.match, names) if match]
+        matches.sort(key=lambda match: (match.group(1) or "", int(match.group(2))))
+        return [match.group(0) for match in matches]
+
+    def _load_index(self):
+        """Один раз строит индекс по сегментам, оставшимся с прошлого запуска."""
+        with self._load_lock:
+            if not self._index_loaded:
+                os.makedirs(self.directory, exist_ok=True)
+                self._scan_segments(own=True)
+                # Запись продолжается в новом сегменте
+                for name in self._segment_numbers:
+                    writer, sequence = SEGMENT_PATTERN.match(name).groups()
+                    if writer == self.writer:
+                        self._sequence = max(self._sequence, int(sequence))
+                self._index_loaded = True
+
+    def _refresh_index(self):
+        """Дочитывает в индекс новые записи других воркеров."""
+        self._load_index()
+        with self._load_lock:
+            self._scan_segments(own=False)
+
+    def _scan_segments(self, own: bool):
+        """
+        Индексирует строки сегментов после уже проиндексированных и
+        забывает удалённые сегменты.
+
+        Свои сегменты читаются только при загрузке (own=True): дальше
+        текущий сегмент индексируется при записи. Недописанная последняя
+        строка чужого сегмента дочитывается в следующий раз.
+        """
+        names = self._segments()
+        own_prefix = f"transcript-{self.writer}-"
+        for name in names:
+            if not own and name.startswith(own_prefix):
+                continue
+            number = self._segment_number(name)
+            path = os.path.join(self.directory, name)
+            start = offset = self._indexed_bytes.get(number, 0)
+            entries: List[Tuple[str, int]] = []
+            try:
+                if os.path.getsize(path) <= start:
+                    continue
+                with open(path, "rb") as handle:
+                    handle.seek(start)
+                    for line in handle:
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            entries.append((_loads(line)["s"], offset))
+                        except (ValueError, KeyError):
+                            pass
+                        offset += len(line)
+            except FileNotFoundError:
+                continue
+            with self._index_lock:
+                if self._segment_numbers.get(name) != number:
+                    continue  # удалён по сроку хранения во время чтения
+                for session_id, position in entries:
+                    self._index_record(session_id, number, position)
+                self._indexed_bytes[number] = offset
+
+        present = set(names)
+        for name in [name for name in self._segment_numbers if name not in present]:
+            self._forget_segment(name)
+
+    def _segment_number(self, name: str) -> int:
+        with self._index_lock:
+            number = self._segment_numbers.get(name)
+            if number is None:
+                number = self._next_number
+                self._next_number += 1
+                self._segment_numbers[name] = number
+                self._segment_files[number] = name
+            return number
+
+    def _index_record(self, session_id: str, number: int, offset: int):
+        self._index.setdefault(session_id, []).append((number << _OFFSET_BITS) | offset)
+        self._segment_sessions.setdefault(number, set()).add(session_id)
+
+    # --- Фоновая запись ---
+
+    def _prepare(self):
+        """Восстанавливает индекс перед запуском записи."""
+        self._load_index()
+
+    def _open_segment(self):
+        self._sequence += 1
+        name = segment_name(self._sequence, self.writer)
+        self._file = open(os.path.join(self.directory, name), "ab")
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_SH)
+        self._file_number = self._segment_number(name)
+        self._segment_size = 0
+        self._segment_opened = time.monotonic()
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def _close_expired_segment(self):
+        """Закрывает свой сегмент, в который не писали дольше срока хранения, чтобы его удалил sweep."""
+        if self._file is not None and time.time() - os.fstat(self._file.fileno()).st_mtime > self.retention_seconds:
+            self._close_segment()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        if self._file is None:
+            self._open_segment()
+
+        entries = []
+        for record in batch:
+            if (self._segment_size >= self.segment_max_bytes
+                    or time.monotonic() - self._segment_opened >= self.segment_max_seconds):
+                self._file.write(b"".join(line for _, line in entries))
+                self._commit(entries)
+                entries = []
+                self._close_segment()
+                self._open_segment()
+
+            line = _dumps(record)
+            entries.append(((record["s"], self._file_number, self._segment_size), line))
+            self._segment_size += len(line)
+
+        self._file.write(b"".join(line for _, line in entries))
+        self._commit(entries)
+
+    def _commit(self, entries):
+        """Делает записи видимыми для чтения и добавляет их в индекс."""
+        self._file.flush()
+        with self._index_lock:
+            for (session_id, number, offset), _ in entries:
+                self._index_record(session_id, number, offset)
+            self._indexed_bytes[self._file_number] = self._segment_size
+
+    def _run(self):
+        stop = False
+        while not stop and not self._shutdown.is_set():
+            batch: List[Dict[str, Any]] = []
+            try:
+                item = self._queue.get(timeout=self.fsync_interval)
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+                while not stop:
+                    item = self._queue.get_nowait()
+                    if item is None:
+                        stop = True
+                    else:
+                        batch.append(item)
+            except queue.Empty:
+                pass
+
+            try:
+                if batch:
+                    self._write_batch(batch)
+
+                now = time.monotonic()
+                if self._file is not None and (stop or now - self._last_fsync >= self.fsync_interval):
+                    os.fsync(self._file.fileno())
+                    self._last_fsync = now
+                if time.time() - self._last_sweep >= 60:
+                    self._close_expired_segment()
+                    self.sweep()
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.error("Ошибка записи журнала переписки: %s", e)
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+
+        self._close_segment()
+
+
+def create_transcript_log() -> TranscriptLog:
+    """Журнал переписки по настройкам приложения."""
+    return TranscriptLog(
+        directory=settings.transcripts_dir,
+        segment_max_bytes=settings.transcript_segment_max_bytes,
+        segment_max_minutes=settings.transcript_segment_max_minutes,
+        retention_hours=settings.data_retention_hours,
+        fsync_interval=settings.transcript_fsync_interval_seconds,
+        max_queue_size=settings.transcript_queue_size,
+    )
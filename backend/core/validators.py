@@ -2,50 +2,171 @@
 Валидация данных для всех сценариев.
 """
 import re
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Optional
+
+
+# Скомпилированные шаблоны (компилируются один раз при импорте)
+_NON_DIGITS_RE = re.compile(r'\D')
+_AMOUNT_CHARS_RE = re.compile(r'[^\d,.]')
+_NAME_RE = re.compile(r'[a-zA-Zа-яА-ЯёЁ\s\-]+')
+_CONTROL_RE = re.compile(r'[\x00-\x1f\x7f]')
+
+# Сумма: "1 000 000", "1,000,000", "1.5 млн", "500к", "250 тыс. руб."
+_AMOUNT_RE = re.compile(
+    r"""\s*
+    (?P<int>\d{1,3}(?:(?P<sep>[\s '.,])\d{3})(?:(?P=sep)\d{3})*|\d+)
+    (?:[.,](?P<frac>\d+))?
+    \s*(?P<mult>к|k|тыс\.?|тысяч[а-я]*|т\.?|млн\.?|миллион[а-я]*|м|m|млрд\.?|миллиард[а-я]*)?
+    \s*(?:руб(?:\.|лей|ля|ль)?|р\.?|₽)?\s*""",
+    re.IGNORECASE | re.VERBOSE
+)
+
+_MULTIPLIERS = {
+    "к": 1_000, "k": 1_000, "т": 1_000, "тыс": 1_000, "тысяч": 1_000,
+    "м": 1_000_000, "m": 1_000_000, "млн": 1_000_000, "миллион": 1_000_000,
+    "млрд": 1_000_000_000, "миллиард": 1_000_000_000,
+}
+
+# Срок: "12", "12 мес.", "2 года", "5 лет"
+_TERM_RE = re.compile(
+    r'\s*(?P<value>\d+)\s*(?:(?P<months>мес[а-я]*\.?|м\.?)|(?P<years>год[а-я]*|лет|г\.?))?\s*',
+    re.IGNORECASE
+)
+
+
+# Максимальная длина ответов в свободной форме (залог, цель) и названия компании.
+# Собранные данные сессии должны помещаться в слот общего хранилища сессий
+# (SESSION_SHM_SLOT_BYTES): в худшем случае символ занимает 4 байта UTF-8
+TEXT_MAX_LENGTH = 300
+COMPANY_NAME_MAX_LENGTH = 150
+
+# Размер кэша нормализации телефонов (количество разных вводов)
+PHONE_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def _parse_phone(phone: str) -> Tuple[bool, str]:
+    """Разбирает российский номер: (True, номер в E.164) или (False, ошибка)."""
+    # Убираем все нецифровые символы
+    digits = phone if phone.isdecimal() else _NON_DIGITS_RE.sub('', phone)
+
+    # Проверяем длину (10-11 цифр)
+    if len(digits) not in (10, 11):
+        return False, "Номер должен содержать 10-11 цифр"
+
+    # Проверяем начало номера
+    first = digits[0]
+    if not (first == '7' or first == '8' or (len(digits) == 10 and first == '9')):
+        return False, "Номер должен начинаться с 7, 8 или 9"
+
+    return True, "+7" + digits[-10:]
+
+
+def normalize_phone(phone: str) -> Optional[str]:
+    """
+    Приводит номер к каноническому виду E.164 (+7XXXXXXXXXX).
+
+    "8 (912) 345-67-89", "+7 912 345 67 89" и "9123456789" дают один
+    ключ. Возвращает None для некорректного номера.
+    """
+    if not phone:
+        return None
+    is_valid, result = _parse_phone(phone)
+    return result if is_valid else None
+
+
+def _multiplier(suffix: Optional[str]) -> int:
+    """Возвращает множитель для суффикса суммы ("к", "млн" и т.п.)."""
+    if not suffix:
+        return 1
+
+    suffix = suffix.lower().rstrip('.')
+    if suffix in _MULTIPLIERS:
+        return _MULTIPLIERS[suffix]
+    for stem in ("тысяч", "миллиард", "миллион"):
+        if suffix.startswith(stem):
+            return _MULTIPLIERS[stem]
+    return 1
+
+
+def parse_amount(amount_str: str) -> Optional[int]:
+    """
+    Разбирает сумму в рублях без перехода через float.
+
+    Возвращает None, если строка не похожа на сумму.
+    """
+    if amount_str.isdecimal():
+        return int(amount_str)
+
+    # "1 000 000" - самый частый ввод после чистых цифр
+    compact = amount_str.replace(' ', '')
+    if compact.isdecimal():
+        return int(compact)
+
+    match = _AMOUNT_RE.fullmatch(amount_str)
+    if match is None:
+        return None
+
+    integer, sep, frac, suffix = match.group('int', 'sep', 'frac', 'mult')
+    multiplier = _multiplier(suffix)
+
+    if sep is not None:
+        # Одиночная точка/запятая перед тремя цифрами при множителе -
+        # это дробная часть: "1.500 млн" = 1 500 000
+        if multiplier > 1 and sep in '.,' and integer.count(sep) == 1 and frac is None:
+            integer, frac = integer.split(sep)
+        else:
+            integer = integer.replace(sep, '')
+
+    amount = int(integer) * multiplier
+    if frac:
+        amount += int(frac) * multiplier // 10 ** len(frac)
+    return amount
 
 
 class DataValidators:
     """Класс валидаторов для проверки введённых данных."""
 
+    # Поля заявки и их валидаторы (для пакетной проверки)
+    FIELD_VALIDATORS = {
+        "name": "validate_name",
+        "phone": "validate_phone",
+        "amount": "validate_amount",
+        "investment_amount": "validate_amount",
+        "term_months": "validate_term_months",
+        "company_name": "validate_company_name",
+        "collateral": "validate_text",
+        "purpose": "validate_text",
+        "investment_goal": "validate_text",
+    }
+
     @staticmethod
     def validate_phone(phone: str) -> Tuple[bool, str]:
-        """Валидация российского номера телефона."""
-        # Убираем все нецифровые символы
-        digits = re.sub(r'\D', '', phone)
-
-        # Проверяем длину (10-11 цифр)
-        if len(digits) not in [10, 11]:
-            return False, "Номер должен содержать 10-11 цифр"
-
-        # Проверяем начало номера
-        if not (digits.startswith('7') or digits.startswith('8') or
-                (len(digits) == 10 and digits.startswith('9'))):
-            return False, "Номер должен начинаться с 7, 8 или 9"
-
-        return True, digits[-10:]  # Возвращаем 10 цифр без кода страны
+        """Валидация российского номера телефона (возвращает номер в E.164)."""
+        return _parse_phone(phone)
 
     @staticmethod
     def validate_amount(amount_str: str, min_amount: int = 10000,
                         max_amount: int = 100000000) -> Tuple[bool, Optional[int]]:
         """Валидация суммы."""
-        try:
-            # Убираем пробелы и нецифровые символы, кроме точки/запятой
-            clean_str = re.sub(r'[^\d,.]', '', amount_str)
-            clean_str = clean_str.replace(',', '.')
-
-            amount = int(float(clean_str))
+        amount = parse_amount(amount_str)
 
-            if amount < min_amount:
-                return False, f"Минимальная сумма: {min_amount:,} руб."
+        if amount is None:
+            # Медленный путь для произвольного текста ("около 500000 рублей")
+            try:
+                clean_str = _AMOUNT_CHARS_RE.sub('', amount_str).replace(',', '.')
+                amount = int(float(clean_str))
+            except (ValueError, AttributeError):
+                return False, "Введите корректную сумму (только цифры)"
 
-            if amount > max_amount:
-                return False, f"Максимальная сумма: {max_amount:,} руб."
+        if amount < min_amount:
+            return False, f"Минимальная сумма: {min_amount:,} руб."
 
-            return True, amount
+        if amount > max_amount:
+            return False, f"Максимальная сумма: {max_amount:,} руб."
 
-        except (ValueError, AttributeError):
-            return False, "Введите корректную сумму (только цифры)"
+        return True, amount
 
     @staticmethod
     def validate_name(name: str) -> Tuple[bool, str]:
@@ -59,7 +180,7 @@ class DataValidators:
             return False, "Имя слишком длинное (макс. 100 символов)"
 
         # Проверяем на наличие только допустимых символов
-        if not re.match(r'^[a-zA-Zа-яА-ЯёЁ\s\-]+$', name):
+        if _NAME_RE.fullmatch(name) is None:
             return False, "Имя содержит недопустимые символы"
 
         return True, name
@@ -67,19 +188,23 @@ class DataValidators:
     @staticmethod
     def validate_term_months(term_str: str) -> Tuple[bool, Optional[int]]:
         """Валидация срока в месяцах."""
-        try:
+        if term_str.isdecimal():
             term = int(term_str)
+        else:
+            match = _TERM_RE.fullmatch(term_str)
+            if match is None:
+                return False, "Введите корректное число месяцев"
+            term = int(match.group('value'))
+            if match.group('years'):
+                term *= 12
 
-            if term < 1:
-                return False, "Срок должен быть не менее 1 месяца"
+        if term < 1:
+            return False, "Срок должен быть не менее 1 месяца"
 
-            if term > 120:
-                return False, "Максимальный срок: 120 месяцев (10 лет)"
+        if term > 120:
+            return False, "Максимальный срок: 120 месяцев (10 лет)"
 
-            return True, term
-
-        except ValueError:
-            return False, "Введите корректное число месяцев"
+        return True, term
 
     @staticmethod
     def validate_company_name(company_name: str) -> Tuple[bool, str]:
@@ -89,8 +214,11 @@ class DataValidators:
         if len(company_name) < 2:
             return False, "Название должно содержать минимум 2 символа"
 
+        if len(company_name) > COMPANY_NAME_MAX_LENGTH:
+            return False, f"Название слишком длинное (макс. {COMPANY_NAME_MAX_LENGTH} символов)"
+
         # Для ИП проверяем наличие префикса
-        if company_name.lower().startswith('ип '):
+        if company_name[:3].lower() == 'ип ':
             # Извлекаем ФИО после "ИП "
             fio = company_name[3:].strip()
             if len(fio.split()) < 2:
@@ -98,5 +226,53 @@ class DataValidators:
 
         return True, company_name
 
+    @staticmethod
+    def validate_text(text: str, max_length: int = TEXT_MAX_LENGTH) -> Tuple[bool, str]:
+        """Валидация ответа в свободной форме (переводы строк и управляющие символы убираются)."""
+        text = " ".join(_CONTROL_RE.sub(' ', text).split())
+
+        if len(text) > max_length:
+            return False, f"Слишком длинный ответ (макс. {max_length} символов), опишите короче"
+
+        return True, text
+
+    @classmethod
+    def get_field_validator(cls, field: str) -> Callable[[str], Tuple[bool, Any]]:
+        """Возвращает валидатор для поля заявки."""
+        if field not in cls.FIELD_VALIDATORS:
+            raise ValueError(f"Нет валидатора для поля: {field}")
+        return getattr(cls, cls.FIELD_VALIDATORS[field])
+
+    @classmethod
+    def validate_many(cls, columns: Dict[str, Iterable[str]]) -> Dict[str, List[Tuple[bool, Any]]]:
+        """
+        Пакетная валидация столбцов (для массового импорта заявок).
+
+        Args:
+            columns: Имя поля -> значения столбца
+
+        Returns:
+            Имя поля -> результаты (is_valid, значение или текст ошибки)
+            в порядке значений. Повторяющиеся значения проверяются один раз.
+        """
+        results: Dict[str, List[Tuple[bool, Any]]] = {}
+
+        for field, values in columns.items():
+            validator = cls.get_field_validator(field)
+            seen: Dict[str, Tuple[bool, Any]] = {}
+            column: List[Tuple[bool, Any]] = []
+            append = column.append
+
+            for value in values:
+                result = seen.get(value)
+                if result is None:
+                    result = validator(value if value is not None else "")
+                    seen[value] = result
+                append(result)
+
+            results[field] = column
+
+        return results
+
 
-validators = DataValidators()
\ No newline at end of file
+validators = DataValidators()
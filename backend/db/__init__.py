@@ -0,0 +1,3 @@
+"""
+Пакет хранения данных (SQLAlchemy + Alembic).
+"""
@@ -0,0 +1,177 @@
+"""
+Потоковая выгрузка заявок и журнала переписки в CSV и JSON Lines.
+
+Строки читаются серверным курсором порциями по chunk_size и сразу
+превращаются в байты, поэтому расход памяти не зависит от числа заявок.
+"""
+import csv
+import io
+import json
+import re
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from .models import Application
+from .repository import ApplicationFilter, ApplicationRepository
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+# Поддерживаемые форматы выгрузки
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+
+# Колонки выгрузки (в порядке столбцов CSV)
+EXPORT_COLUMNS = (
+    "id", "created_at", "user_type", "session_id", "phone", "name", "company_name",
+    "collateral", "purpose", "amount", "term_months", "duplicate_of",
+)
+
+# Поля записи журнала переписки и колонки CSV для них
+TRANSCRIPT_COLUMNS = (
+    ("s", "session_id"), ("t", "timestamp"), ("step", "step"),
+    ("in", "user_message"), ("out", "bot_message"),
+)
+
+# Строк в порции чтения из базы (и в одном куске ответа)
+DEFAULT_CHUNK_SIZE = 1000
+
+# Ячейка с такого символа открывается в табличном редакторе как формула
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Число (в том числе телефон +7...) формулой не выполнится и не экранируется
+_NUMBER = re.compile(r"[+-]?\d+(\.\d+)?")
+
+
+def csv_cell(value: Any) -> Any:
+    """Экранирует апострофом текст, который открылся бы как формула (CSV injection)."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) and not _NUMBER.fullmatch(value):
+        return "'" + value
+    return value
+
+
+def iter_application_chunks(repository: ApplicationRepository,
+                            filters: Optional[ApplicationFilter] = None,
+                            chunk_size: int = DEFAULT_CHUNK_SIZE,
+                            include_data: bool = False) -> Iterator[Sequence[Sequence[Any]]]:
+    """
+    Порции строк заявок от старых к новым (кортежи в порядке
+    EXPORT_COLUMNS, плюс data при include_data).
+    """
+    filters = filters or ApplicationFilter()
+    columns = [getattr(Application, name) for name in EXPORT_COLUMNS]
+    if include_data:
+        columns.append(Application.data)
+
+    query = (
+        select(*columns)
+        .where(*filters.conditions())
+        .order_by(Application.created_at, Application.id)
+        .execution_options(stream_results=True, yield_per=chunk_size)
+    )
+
+    with repository.session() as session:
+        yield from session.execute(query).partitions()
+
+
+def _csv_chunks(chunks: Iterable[Sequence[Sequence[Any]]], include_data: bool) -> Iterator[str]:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    created_at_index = EXPORT_COLUMNS.index("created_at")
+
+    writer.writerow(EXPORT_COLUMNS + (("data",) if include_data else ()))
+    for chunk in chunks:
+        rows = [[csv_cell(value) for value in row] for row in chunk]
+        for row in rows:
+            row[created_at_index] = row[created_at_index].isoformat()
+            if include_data:
+                row[-1] = csv_cell(json.dumps(row[-1], ensure_ascii=False))
+        writer.writerows(rows)
+
+        # Забираем порцию из буфера, не создавая новый StringIO
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+
+    yield output.getvalue()
+
+
+def _jsonl_chunks(chunks: Iterable[Sequence[Sequence[Any]]], include_data: bool) -> Iterator[str]:
+    keys = EXPORT_COLUMNS + (("data",) if include_data else ())
+
+    if orjson is not None:
+        for chunk in chunks:
+            yield "".join([orjson.dumps(dict(zip(keys, row))).decode() + "\n" for row in chunk])
+        return
+
+    created_at_index = EXPORT_COLUMNS.index("created_at")
+    for chunk in chunks:
+        lines = []
+        for row in chunk:
+            record = dict(zip(keys, row))
+            record["created_at"] = row[created_at_index].isoformat()
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        yield "".join(lines)
+
+
+def export_applications(repository: ApplicationRepository, output: str = "csv",
+                        filters: Optional[ApplicationFilter] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        include_data: bool = False) -> Iterator[bytes]:
+    """
+    Генератор выгрузки заявок в формате output (csv или jsonl).
+
+    Подходит как тело StreamingResponse и для записи в файл.
+    """
+    if output not in EXPORT_FORMATS:
+        raise ValueError(f"Неизвестный формат выгрузки: {output}")
+
+    chunks = iter_application_chunks(repository, filters, chunk_size, include_data)
+    encoded = _csv_chunks(chunks, include_data) if output == "csv" else _jsonl_chunks(chunks, include_data)
+    return (text.encode("utf-8") for text in encoded if text)
+
+
+def export_transcripts(log, output: str = "jsonl", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Генератор выгрузки журнала переписки (TranscriptLog).
+
+    JSON Lines отдаётся строками сегментов как есть, без разбора.
+    """
+    if output not in EXPORT_FORMATS:
+        raise ValueError(f"Неизвестный формат выгрузки: {output}")
+
+    return _export_transcripts(log, output, chunk_size)
+
+
+def _export_transcripts(log, output: str, chunk_size: int) -> Iterator[bytes]:
+    chunk: List[bytes] = []
+
+    if output == "jsonl":
+        for line in log.iter_lines():
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                yield b"".join(chunk)
+                chunk = []
+        if chunk:
+            yield b"".join(chunk)
+        return
+
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow([column for _, column in TRANSCRIPT_COLUMNS])
+    keys = [key for key, _ in TRANSCRIPT_COLUMNS]
+    rows = 0
+    for record in log.iter_records():
+        writer.writerow([csv_cell(record.get(key)) for key in keys])
+        rows += 1
+        if rows >= chunk_size:
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+            rows = 0
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
@@ -0,0 +1,88 @@
+"""
+Хранение счётчиков воронки диалога.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select, update
+
+from .models import FunnelCounter
+from .repository import ApplicationRepository
+from .session import get_engine
+
+
+def _to_datetime(bucket: int) -> datetime:
+    return datetime.fromtimestamp(bucket, timezone.utc).replace(tzinfo=None)
+
+
+def _to_bucket(value: datetime) -> int:
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+
+class FunnelStore:
+    """Счётчики воронки в таблице funnel_counters (в той же базе, что и заявки)."""
+
+    def __init__(self, repository: Optional[ApplicationRepository] = None):
+        if repository is None:
+            from .repository import application_repository
+            repository = application_repository
+        self.repository = repository
+
+    def save(self, deltas: Dict[Tuple[int, str, str], int]):
+        """Прибавляет приращения (интервал, шаг, событие) -> число к счётчикам."""
+        self.repository.wait_ready()
+        engine = get_engine(self.repository.url)
+        rows = [
+            {"bucket_start": _to_datetime(bucket), "step": step, "event": event, "count": count}
+            for (bucket, step, event), count in deltas.items()
+        ]
+
+        with engine.begin() as connection:
+            if engine.dialect.name in ("sqlite", "postgresql"):
+                if engine.dialect.name == "sqlite":
+                    from sqlalchemy.dialects.sqlite import insert
+                else:
+                    from sqlalchemy.dialects.postgresql import insert
+                statement = insert(FunnelCounter)
+                statement = statement.on_conflict_do_update(
+                    index_elements=["bucket_start", "step", "event"],
+                    set_={"count": FunnelCounter.count + statement.excluded["count"]},
+                )
+                connection.execute(statement, rows)
+                return
+
+            # Остальные СУБД: обновление, а для новых счётчиков - вставка
+            for row in rows:
+                result = connection.execute(
+                    update(FunnelCounter)
+                    .where(FunnelCounter.bucket_start == row["bucket_start"],
+                           FunnelCounter.step == row["step"],
+                           FunnelCounter.event == row["event"])
+                    .values(count=FunnelCounter.count + row["count"])
+                )
+                if result.rowcount == 0:
+                    connection.execute(FunnelCounter.__table__.insert(), row)
+
+    def load(self, since: float) -> Tuple[Dict[Tuple[str, str], int], Dict[Tuple[int, str, str], int]]:
+        """
+        Итоги за всё время и счётчики интервалов начиная с since.
+
+        Returns:
+            ({(шаг, событие): число}, {(интервал, шаг, событие): число})
+        """
+        with self.repository.session() as session:
+            totals = {
+                (step, event): int(count)
+                for step, event, count in session.execute(
+                    select(FunnelCounter.step, FunnelCounter.event, func.sum(FunnelCounter.count))
+                    .group_by(FunnelCounter.step, FunnelCounter.event)
+                )
+            }
+            buckets = {
+                (_to_bucket(bucket_start), step, event): count
+                for bucket_start, step, event, count in session.execute(
+                    select(FunnelCounter.bucket_start, FunnelCounter.step, FunnelCounter.event, FunnelCounter.count)
+                    .where(FunnelCounter.bucket_start >= _to_datetime(int(since)))
+                )
+            }
+        return totals, buckets
@@ -0,0 +1,233 @@
+"""
+Массовый импорт заявок партнёров из CSV.
+
+Файл читается порциями по chunk_size строк, поэтому расход памяти
+определяется размером порции, а не файла. Для каждой порции:
+- столбцы проверяются теми же валидаторами, что и ввод в чате
+  (DataValidators.validate_many, повторяющиеся значения - один раз);
+- повторы по нормализованному телефону отбрасываются: внутри порции и
+  среди сохранённых заявок (индекс телефона в базе; предыдущие порции
+  к этому моменту уже записаны);
+- заявки записываются одной транзакцией (bulk_insert);
+- уведомления уходят сводками по notify_batch_size заявок.
+"""
+import csv
+import itertools
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, IO, Iterator, List, Optional, Set, Tuple
+
+from backend.core.config import settings
+from backend.core.validators import DataValidators
+from .repository import ApplicationRepository, application_row
+
+logger = logging.getLogger(__name__)
+
+# Поля заявки по типу: (проверяемые валидаторами чата - обязательные, свободный текст)
+SCENARIO_FIELDS = {
+    "individual": (("name", "phone", "amount"), ("collateral", "purpose")),
+    "business": (("company_name", "phone", "amount"), ("collateral", "purpose")),
+    "investor": (("name", "phone", "amount", "term_months"), ("investment_goal",)),
+}
+VALIDATED_FIELDS = ("name", "company_name", "phone", "amount", "term_months")
+TEXT_FIELDS = ("collateral", "purpose", "investment_goal")
+
+# Заголовки столбцов (в нижнем регистре) -> поля заявки
+COLUMN_ALIASES = {
+    "тип": "user_type", "тип заявки": "user_type",
+    "имя": "name", "фио": "name",
+    "компания": "company_name", "название компании": "company_name",
+    "телефон": "phone",
+    "сумма": "amount", "investment_amount": "amount", "сумма для инвестирования": "amount",
+    "срок": "term_months", "срок, мес": "term_months",
+    "залог": "collateral", "обеспечение": "collateral",
+    "цель": "purpose", "цель займа": "purpose", "цель инвестирования": "investment_goal",
+}
+KNOWN_COLUMNS = frozenset(("user_type",) + VALIDATED_FIELDS + TEXT_FIELDS)
+
+# Значения столбца типа заявки
+USER_TYPES = {
+    "individual": "individual", "физлицо": "individual", "физическое лицо": "individual",
+    "business": "business", "бизнес": "business", "юл": "business", "ип": "business",
+    "investor": "investor", "инвестор": "investor",
+}
+
+Row = Tuple[int, List[str]]
+
+
+@dataclass
+class ImportReport:
+    """Итог импорта."""
+    rows: int = 0
+    imported: int = 0
+    invalid: int = 0
+    duplicates: int = 0
+    notified: int = 0
+    # (строка файла, поле, ошибка) - первые max_errors ошибок
+    errors: List[Tuple[int, str, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def read_chunks(stream: IO[str], chunk_size: int,
+                delimiter: Optional[str] = None) -> Tuple[Dict[str, int], Iterator[List[Row]]]:
+    """
+    Столбцы файла (поле заявки -> номер столбца) и порции строк
+    (номер строки файла, значения).
+
+    Разделитель (",", ";" или табуляция) определяется по заголовку,
+    если не задан.
+    """
+    header_line = stream.readline()
+    if delimiter is None:
+        delimiter = max((",", ";", "\t"), key=header_line.count)
+    reader = csv.reader(itertools.chain([header_line], stream), delimiter=delimiter)
+
+    columns: Dict[str, int] = {}
+    for index, name in enumerate(next(reader, [])):
+        name = name.strip().lower()
+        name = COLUMN_ALIASES.get(name, name)
+        if name in KNOWN_COLUMNS and name not in columns:
+            columns[name] = index
+
+    def chunks() -> Iterator[List[Row]]:
+        while True:
+            batch = [(reader.line_num, row) for row in itertools.islice(reader, chunk_size)]
+            if not batch:
+                return
+            # Пустые строки (в том числе ";;;" из Excel) пропускаются
+            chunk = [(line, row) for line, row in batch if any(cell.strip() for cell in row)]
+            if chunk:
+                yield chunk
+
+    return columns, chunks()
+
+
+class LeadImporter:
+    """
+    Импорт заявок из CSV в хранилище заявок.
+
+    notifications - очередь уведомлений с submit_batch (None - без
+    уведомлений); user_type - тип заявок, если в файле нет столбца типа.
+    """
+
+    def __init__(self, repository: ApplicationRepository, notifications=None,
+                 user_type: Optional[str] = None, source: str = "import",
+                 chunk_size: Optional[int] = None, notify_batch_size: Optional[int] = None,
+                 max_errors: int = 100):
+        if user_type is not None and user_type not in SCENARIO_FIELDS:
+            raise ValueError(f"Неизвестный тип заявок: {user_type}")
+        self.repository = repository
+        self.notifications = notifications
+        self.user_type = user_type
+        self.source = source
+        self.chunk_size = chunk_size or settings.import_chunk_size
+        self.notify_batch_size = notify_batch_size or settings.import_notify_batch_size
+        self.max_errors = max_errors
+
+    def run(self, stream: IO[str], delimiter: Optional[str] = None) -> ImportReport:
+        """Импортирует файл. ValueError - если в файле нет нужных столбцов."""
+        started = time.perf_counter()
+        report = ImportReport()
+
+        columns, chunks = read_chunks(stream, self.chunk_size, delimiter)
+        if "phone" not in columns:
+            raise ValueError("В файле нет столбца телефона (phone)")
+        if "user_type" not in columns and self.user_type is None:
+            raise ValueError("Укажите тип заявок: столбец user_type или параметр user_type")
+        if not self.repository.wait_ready():
+            raise RuntimeError("База данных недоступна")
+
+        batch_id = uuid.uuid4().hex[:8]
+        for chunk in chunks:
+            self._import_chunk(chunk, columns, batch_id, report)
+
+        report.elapsed = time.perf_counter() - started
+        logger.info("Импорт %s: строк %s, загружено %s, с ошибками %s, повторов %s, %.0f строк/с",
+                    self.source, report.rows, report.imported, report.invalid, report.duplicates,
+                    report.rows_per_second)
+        return report
+
+    def _import_chunk(self, chunk: List[Row], columns: Dict[str, int], batch_id: str, report: ImportReport):
+        report.rows += len(chunk)
+        values = {name: [row[index] if index < len(row) else "" for _, row in chunk]
+                  for name, index in columns.items()}
+        checked = DataValidators.validate_many({name: values[name] for name in VALIDATED_FIELDS if name in values})
+        user_types = values.get("user_type")
+
+        accepted: List[Tuple[int, str, Dict[str, Any]]] = []
+        phones: Set[str] = set()
+        for position, (line, _) in enumerate(chunk):
+            user_type = self.user_type
+            if user_types is not None and user_types[position].strip():
+                user_type = USER_TYPES.get(user_types[position].strip().lower())
+            if user_type is None:
+                self._reject(report, line, "user_type", "Неизвестный тип заявки")
+                continue
+
+            required, optional = SCENARIO_FIELDS[user_type]
+            data: Dict[str, Any] = {"user_type": user_type,
+                                    "service_type": "invest" if user_type == "investor" else "loan"}
+            error = None
+            for name in required:
+                column = values.get(name)
+                if column is None or not column[position].strip():
+                    error = (name, "Обязательное поле не заполнено")
+                    break
+                is_valid, result = checked[name][position]
+                if not is_valid:
+                    error = (name, result)
+                    break
+                data[name] = result
+            if error is not None:
+                self._reject(report, line, *error)
+                continue
+
+            for name in optional:
+                column = values.get(name)
+                if column is not None and column[position].strip():
+                    data[name] = column[position].strip()
+
+            if data["phone"] in phones:
+                report.duplicates += 1
+                continue
+            phones.add(data["phone"])
+            accepted.append((line, user_type, data))
+
+        existing = self.repository.existing_phones(phones) if phones else set()
+        created_at = datetime.utcnow()
+        rows = []
+        leads = []
+        for line, user_type, data in accepted:
+            if data["phone"] in existing:
+                report.duplicates += 1
+                continue
+            if user_type == "investor":
+                data["investment_amount"] = data.pop("amount")
+            data["session_id"] = f"import-{batch_id}-{line}"
+            data["source"] = self.source
+            rows.append(application_row(user_type, data, created_at))
+            leads.append((user_type, data))
+
+        # Порция записывается одной транзакцией до чтения следующей
+        self.repository.bulk_insert(rows)
+        first = report.imported + 1
+        report.imported += len(rows)
+
+        if self.notifications is not None:
+            for start in range(0, len(leads), self.notify_batch_size):
+                group = leads[start:start + self.notify_batch_size]
+                title = f"📥 Импорт {self.source}: заявки {first + start}-{first + start + len(group) - 1}"
+                if self.notifications.submit_batch(title, group):
+                    report.notified += len(group)
+
+    def _reject(self, report: ImportReport, line: int, name: str, message: str):
+        report.invalid += 1
+        if len(report.errors) < self.max_errors:
+            report.errors.append((line, name, message))
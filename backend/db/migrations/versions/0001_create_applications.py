@@ -0,0 +1,48 @@
+"""Таблица заявок
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'applications',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('user_type', sa.String(length=16), nullable=False),
+        sa.Column('session_id', sa.String(length=64), nullable=False),
+        sa.Column('phone', sa.String(length=16), nullable=True),
+        sa.Column('name', sa.String(length=200), nullable=True),
+        sa.Column('company_name', sa.String(length=300), nullable=True),
+        sa.Column('collateral', sa.Text(), nullable=True),
+        sa.Column('purpose', sa.Text(), nullable=True),
+        sa.Column('amount', sa.BigInteger(), nullable=True),
+        sa.Column('term_months', sa.Integer(), nullable=True),
+        sa.Column('duplicate_of', sa.String(length=64), nullable=True),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_applications_created_at', 'applications', ['created_at'])
+    op.create_index('ix_applications_user_type', 'applications', ['user_type'])
+    op.create_index('ix_applications_phone', 'applications', ['phone'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_applications_phone', table_name='applications')
+    op.drop_index('ix_applications_user_type', table_name='applications')
+    op.drop_index('ix_applications_created_at', table_name='applications')
+    op.drop_table('applications')
@@ -0,0 +1,35 @@
+"""Индексы для постраничного просмотра заявок
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Составные индексы покрывают сортировку (created_at, id) для курсора,
+    # одиночные индексы по created_at и user_type становятся лишними
+    op.create_index('ix_applications_created_at_id', 'applications', ['created_at', 'id'])
+    op.create_index('ix_applications_user_type_created_at_id', 'applications', ['user_type', 'created_at', 'id'])
+    op.create_index('ix_applications_amount', 'applications', ['amount'])
+    op.drop_index('ix_applications_created_at', table_name='applications')
+    op.drop_index('ix_applications_user_type', table_name='applications')
+
+
+def downgrade() -> None:
+    op.create_index('ix_applications_user_type', 'applications', ['user_type'])
+    op.create_index('ix_applications_created_at', 'applications', ['created_at'])
+    op.drop_index('ix_applications_amount', table_name='applications')
+    op.drop_index('ix_applications_user_type_created_at_id', table_name='applications')
+    op.drop_index('ix_applications_created_at_id', table_name='applications')
@@ -0,0 +1,35 @@
+"""Счётчики воронки диалога
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'funnel_counters',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('step', sa.String(length=64), nullable=False),
+        sa.Column('event', sa.String(length=16), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('bucket_start', 'step', 'event', name='uq_funnel_counters_bucket_step_event'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('funnel_counters')
@@ -0,0 +1,61 @@
+"""
+Таблицы базы данных.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, JSON, String, Text, UniqueConstraint
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+class Base(DeclarativeBase):
+    """Базовый класс моделей."""
+
+
+class Application(Base):
+    """Завершённая заявка из чат-виджета."""
+
+    __tablename__ = "applications"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    user_type: Mapped[str] = mapped_column(String(16), nullable=False)
+    session_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Телефон в E.164 (+7XXXXXXXXXX)
+    phone: Mapped[Optional[str]] = mapped_column(String(16))
+
+    name: Mapped[Optional[str]] = mapped_column(String(200))
+    company_name: Mapped[Optional[str]] = mapped_column(String(300))
+    collateral: Mapped[Optional[str]] = mapped_column(Text)
+    purpose: Mapped[Optional[str]] = mapped_column(Text)
+    amount: Mapped[Optional[int]] = mapped_column(BigInteger)
+    term_months: Mapped[Optional[int]] = mapped_column(Integer)
+    duplicate_of: Mapped[Optional[str]] = mapped_column(String(64))
+
+    # Все собранные данные как есть
+    data: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+    __table_args__ = (
+        Index("ix_applications_created_at_id", "created_at", "id"),
+        Index("ix_applications_user_type_created_at_id", "user_type", "created_at", "id"),
+        Index("ix_applications_phone", "phone"),
+        Index("ix_applications_amount", "amount"),
+    )
+
+
+class FunnelCounter(Base):
+    """Счётчик событий воронки диалога за интервал времени."""
+
+    __tablename__ = "funnel_counters"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Начало интервала (UTC)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    step: Mapped[str] = mapped_column(String(64), nullable=False)
+    # entered, advanced, error, restarted
+    event: Mapped[str] = mapped_column(String(16), nullable=False)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("bucket_start", "step", "event", name="uq_funnel_counters_bucket_step_event"),
+    )
@@ -0,0 +1,298 @@
+"""
+Репозиторий заявок с отложенной пакетной записью.
+"""
+import base64
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, select, text, tuple_
+
+from backend.core.background import BackgroundWriter
+from backend.core.config import settings
+from backend.core.validators import normalize_phone
+from .models import Application
+from .session import get_engine, get_sessionmaker, init_db
+
+logger = logging.getLogger(__name__)
+
+
+def application_row(user_type: str, data: Dict[str, Any],
+                    created_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Готовит строку таблицы applications из данных заявки."""
+    amount = data.get('amount', data.get('investment_amount'))
+    term_months = data.get('term_months')
+    collected = {key: value for key, value in data.items() if key not in ('session_id', 'duplicate_of')}
+
+    return {
+        'created_at': created_at or datetime.utcnow(),
+        'user_type': user_type,
+        'session_id': str(data.get('session_id') or 'unknown'),
+        'phone': normalize_phone(str(data.get('phone') or '')),
+        'name': data.get('name'),
+        'company_name': data.get('company_name'),
+        'collateral': data.get('collateral'),
+        'purpose': data.get('purpose') or data.get('investment_goal'),
+        'amount': amount if isinstance(amount, int) else None,
+        'term_months': term_months if isinstance(term_months, int) else None,
+        'duplicate_of': data.get('duplicate_of'),
+        'data': {key: value.value if hasattr(value, 'value') else value for key, value in collected.items()},
+    }
+
+
+@dataclass
+class ApplicationFilter:
+    """Фильтры выборки заявок."""
+    user_type: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    amount_min: Optional[int] = None
+    amount_max: Optional[int] = None
+
+    def conditions(self) -> list:
+        """Условия WHERE для SQLAlchemy."""
+        conditions = []
+        if self.user_type:
+            conditions.append(Application.user_type == self.user_type)
+        if self.created_from is not None:
+            conditions.append(Application.created_at >= self.created_from)
+        if self.created_to is not None:
+            conditions.append(Application.created_at < self.created_to)
+        if self.amount_min is not None:
+            conditions.append(Application.amount >= self.amount_min)
+        if self.amount_max is not None:
+            conditions.append(Application.amount <= self.amount_max)
+        return conditions
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.conditions()
+
+
+def encode_cursor(created_at: datetime, application_id: int) -> str:
+    """Кодирует позицию (created_at, id) в непрозрачный курсор."""
+    raw = f"{created_at.isoformat()}|{application_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Раскодирует курсор. ValueError для некорректного значения."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, application_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(application_id)
+    except Exception:
+        raise ValueError("Некорректный курсор")
+
+
+class ApplicationRepository(BackgroundWriter):
+    """
+    Хранилище заявок.
+
+    Запись идёт через очередь: вызов add() только кладёт строку в очередь,
+    фоновый поток собирает строки в пачки и вставляет их одной транзакцией.
+    Чат никогда не ждёт базу данных.
+    """
+
+    thread_name = "application-writer"
+
+    def __init__(self, url: Optional[str] = None, batch_size: int = 500,
+                 flush_interval: float = 1.0, max_queue_size: int = 10000):
+        super().__init__(max_queue_size)
+        self.url = url or settings.database_url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._schema_lock = threading.Lock()
+        self._ready = threading.Event()
+        self.dropped = 0
+        self.written = 0
+
+    # --- Запись ---
+
+    def add(self, user_type: str, data: Dict[str, Any]) -> bool:
+        """
+        Ставит заявку в очередь на запись. Не блокирует.
+
+        Returns:
+            bool: False, если очередь переполнена и заявка не сохранена
+        """
+        return self.enqueue(application_row(user_type, data))
+
+    def enqueue(self, row: Dict[str, Any]) -> bool:
+        """Ставит готовую строку в очередь на запись."""
+        if self._stopped:
+            logger.error("Репозиторий заявок остановлен, заявка не сохранена")
+            return False
+
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.error("Очередь записи заявок переполнена, заявка %s не сохранена", row.get('session_id'))
+            return False
+
+    def bulk_insert(self, rows: List[Dict[str, Any]]):
+        """Синхронно вставляет пачку строк одной транзакцией."""
+        if not rows:
+            return
+        with get_engine(self.url).begin() as connection:
+            connection.execute(insert(Application), rows)
+        self.written += len(rows)
+
+    # --- Чтение ---
+
+    def session(self):
+        """Сессия SQLAlchemy для чтения."""
+        self.wait_ready()
+        return get_sessionmaker(self.url)()
+
+    def wait_ready(self) -> bool:
+        """Гарантирует, что схема базы создана (миграции применяются один раз)."""
+        if self._ready.is_set():
+            return True
+
+        with self._schema_lock:
+            if not self._ready.is_set():
+                try:
+                    init_db(self.url)
+                except Exception as e:
+                    logger.error("Не удалось подготовить базу данных: %s", e, exc_info=True)
+                    return False
+                self._ready.set()
+        return True
+
+    def ping(self) -> bool:
+        """Проверка соединения с базой (SELECT 1)."""
+        if not self.wait_ready():
+            return False
+        with get_engine(self.url).connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+
+    def list_applications(self, filters: Optional[ApplicationFilter] = None, limit: int = 50,
+                          cursor: Optional[str] = None) -> Tuple[List[Application], Optional[str]]:
+        """
+        Страница заявок, от новых к старым.
+
+        Пагинация по курсору (created_at, id): следующая страница
+        начинается сразу после последней строки предыдущей, без OFFSET,
+        поэтому стоимость не растёт с номером страницы.
+
+        Returns:
+            (заявки, курсор следующей страницы или None)
+        """
+        filters = filters or ApplicationFilter()
+        query = select(Application).where(*filters.conditions())
+
+        if cursor:
+            created_at, application_id = decode_cursor(cursor)
+            query = query.where(tuple_(Application.created_at, Application.id) < (created_at, application_id))
+
+        query = query.order_by(Application.created_at.desc(), Application.id.desc()).limit(limit + 1)
+
+        with self.session() as session:
+            rows = list(session.scalars(query))
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
+
+    def existing_phones(self, phones: Iterable[str], batch_size: int = 500) -> Set[str]:
+        """
+        Телефоны из списка, по которым уже есть заявки.
+
+        Поиск по индексу ix_applications_phone, IN-списками не больше
+        batch_size значений (ограничение числа параметров SQLite).
+        """
+        phones = list(phones)
+        found: Set[str] = set()
+        with self.session() as session:
+            for start in range(0, len(phones), batch_size):
+                part = phones[start:start + batch_size]
+                found.update(session.scalars(select(Application.phone).where(Application.phone.in_(part))))
+        return found
+
+    def estimate_count(self, filters: Optional[ApplicationFilter] = None,
+                       cap: int = 10000) -> Dict[str, Any]:
+        """
+        Оценка количества заявок без полного сканирования таблицы.
+
+        PostgreSQL: оценка планировщика (EXPLAIN). Другие СУБД: точный
+        подсчёт до cap строк; выше - по диапазону id для выборки без фильтров.
+
+        Returns:
+            {"value": число, "exact": bool}
+        """
+        filters = filters or ApplicationFilter()
+        engine = get_engine(self.url)
+        query = select(Application.id).where(*filters.conditions())
+
+        with self.session() as session:
+            if engine.dialect.name == "postgresql":
+                compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+                plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+                return {"value": int(plan[0]["Plan"]["Plan Rows"]), "exact": False}
+
+            capped = session.scalar(select(func.count()).select_from(query.limit(cap + 1).subquery()))
+            if capped <= cap:
+                return {"value": capped, "exact": True}
+
+            if filters.is_empty:
+                low, high = session.execute(select(func.min(Application.id), func.max(Application.id))).one()
+                return {"value": high - low + 1, "exact": False}
+
+            return {"value": cap, "exact": False}
+
+    # --- Фоновая запись ---
+
+    def _run(self):
+        self.wait_ready()
+
+        stop = False
+        while not stop and not self._shutdown.is_set():
+            batch: List[Dict[str, Any]] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            if item is None:
+                self._queue.task_done()
+                break
+            batch.append(item)
+
+            # Добираем пачку без ожидания
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self.bulk_insert(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.error("Ошибка записи %s заявок в базу: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+# Глобальный репозиторий заявок
+application_repository = ApplicationRepository(
+    batch_size=settings.db_batch_size,
+    flush_interval=settings.db_flush_interval_seconds,
+    max_queue_size=settings.db_queue_size
+)
@@ -0,0 +1,78 @@
+"""
+Подключение к базе данных.
+"""
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.config import settings
+
+MIGRATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+# Alembic хранит контекст миграции в глобальном состоянии модуля,
+# поэтому миграции разных баз из разных потоков выполняются по очереди
+_migrations_lock = threading.Lock()
+
+
+def _prepare_sqlite(url: str):
+    """Создаёт каталог для файла SQLite."""
+    path = url.split("///", 1)[-1]
+    if path and path != ":memory:":
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """Возвращает движок для URL (по умолчанию - из настроек), один на процесс."""
+    url = url or settings.database_url
+
+    engine = _engines.get(url)
+    if engine is not None:
+        return engine
+
+    with _engines_lock:
+        if url not in _engines:
+            if url.startswith("sqlite"):
+                _prepare_sqlite(url)
+                engine = create_engine(url, connect_args={"check_same_thread": False})
+
+                @event.listens_for(engine, "connect")
+                def _set_sqlite_pragma(dbapi_connection, connection_record):
+                    # WAL: чтение не блокируется фоновой записью
+                    cursor = dbapi_connection.cursor()
+                    cursor.execute("PRAGMA journal_mode=WAL")
+                    cursor.execute("PRAGMA synchronous=NORMAL")
+                    cursor.close()
+            else:
+                engine = create_engine(url, pool_pre_ping=True)
+            _engines[url] = engine
+        return _engines[url]
+
+
+def get_sessionmaker(url: Optional[str] = None) -> sessionmaker:
+    """Фабрика сессий SQLAlchemy для URL."""
+    return sessionmaker(bind=get_engine(url), expire_on_commit=False)
+
+
+def init_db(url: Optional[str] = None):
+    """Применяет миграции Alembic до последней версии."""
+    from alembic import command
+    from alembic.config import Config
+
+    url = url or settings.database_url
+    if url.startswith("sqlite"):
+        _prepare_sqlite(url)
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_PATH)
+    config.set_main_option("sqlalchemy.url", url)
+    with _migrations_lock:
+        command.upgrade(config, "head")
@@ -1,10 +1,23 @@
 """
 Пакет интеграций для отправки уведомлений.
+
+Классы загружаются при первом обращении: импорт пакета не тянет
+requests и smtplib.
 """
+import importlib
 
 # Экспортируем только классы, а не экземпляры
-from .telegram_sender import TelegramSender
-from .email_sender import EmailSender
-from .notification_service import NotificationService
+_EXPORTS = {
+    "TelegramSender": ".telegram_sender",
+    "EmailSender": ".email_sender",
+    "NotificationService": ".notification_service",
+    "NotificationQueue": ".notification_queue",
+}
+
+__all__ = list(_EXPORTS)
+
 
-# Не создаем экземпляры здесь!
\ No newline at end of file
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,11 +2,10 @@
 Резервная отправка заявок на email.
 """
 import logging
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Any, Optional
+
+if TYPE_CHECKING:
+    from email.mime.multipart import MIMEMultipart
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +14,7 @@ class EmailSender:
     """Класс для отправки уведомлений на email."""
 
     def __init__(self):
-        # Импортируем здесь, чтобы избежать циклических импортов
-        from backend.config import get_settings
+        from backend.core.config import get_settings
         settings = get_settings()
 
         self.enabled = settings.email_enabled
@@ -47,11 +45,13 @@ class EmailSender:
             return False
 
         try:
+            from email.mime.multipart import MIMEMultipart
+            from email.mime.text import MIMEText
             from backend.core.application_formatter import ApplicationFormatter
 
             # Форматируем сообщение
             subject = f"Заявка от {user_type} - BBKinvest"
-            plain_text = ApplicationFormatter.format_application(user_type, application_data)
+            plain_text = ApplicationFormatter.format_application(user_type, application_data, "plain")
 
             # Создаем email
             msg = MIMEMultipart('alternative')
@@ -72,9 +72,35 @@ class EmailSender:
             return self._send_email(msg)
 
         except Exception as e:
-            logger.error(f"Ошибка при создании email: {str(e)}", exc_info=True)
+            logger.error("Ошибка при создании email: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return False
+
+    def warm_up(self) -> bool:
+        """
+        Загружает модули SMTP и MIME заранее.
+
+        Соединение с SMTP не держится открытым: письма - резервный канал,
+        и простаивающее соединение сервер всё равно закроет.
+        """
+        if not self.enabled:
+            return False
+
+        import smtplib  # noqa: F401
+        from email.mime.multipart import MIMEMultipart  # noqa: F401
+        from email.mime.text import MIMEText  # noqa: F401
+        return True
+
+    def ping(self, timeout: float = 5.0) -> bool:
+        """Проверка SMTP-сервера командой NOOP (письмо не отправляется)."""
+        if not self.enabled:
             return False
 
+        import smtplib
+
+        with smtplib.SMTP(self.host, self.port, timeout=timeout) as server:
+            code, _ = server.noop()
+        return code == 250
+
     def send_test_email(self) -> bool:
         """Отправляет тестовое письмо."""
         if not self.enabled:
@@ -82,6 +108,9 @@ class EmailSender:
             return False
 
         try:
+            from email.mime.multipart import MIMEMultipart
+            from email.mime.text import MIMEText
+
             msg = MIMEMultipart('alternative')
             msg['Subject'] = "Тестовое письмо от ИИ-консультанта BBKinvest"
             msg['From'] = self.from_addr
@@ -93,109 +122,27 @@ class EmailSender:
 
             return self._send_email(msg)
         except Exception as e:
-            logger.error(f"Ошибка отправки тестового письма: {str(e)}")
+            logger.error("Ошибка отправки тестового письма: %s", e)
             return False
 
-    def _send_email(self, msg: MIMEMultipart) -> bool:
+    def _send_email(self, msg: "MIMEMultipart") -> bool:
         """Отправляет email через SMTP."""
         try:
+            import smtplib
+
             with smtplib.SMTP(self.host, self.port) as server:
                 server.starttls()
                 server.login(self.user, self.password)
                 server.send_message(msg)
 
-            logger.info(f"Email успешно отправлен на {self.to_addr}")
+            logger.info("Email успешно отправлен на %s", self.to_addr)
             return True
         except Exception as e:
-            logger.error(f"Ошибка отправки email: {str(e)}")
+            logger.error("Ошибка отправки email: %s", e)
             return False
 
     def _create_html_email(self, user_type: str, data: Dict[str, Any]) -> str:
         """Создает HTML версию письма."""
-        colors = {
-            'individual': "#4CAF50",
-            'business': "#2196F3",
-            'investor': "#9C27B0"
-        }
-
-        type_names = {
-            'individual': "Физическое лицо",
-            'business': "Бизнес",
-            'investor': "Инвестор"
-        }
-
-        color = colors.get(user_type, "#607D8B")
-
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 5px; }}
-                .header {{ background-color: {color}; color: white; padding: 15px; border-radius: 5px 5px 0 0; text-align: center; }}
-                .content {{ padding: 20px; }}
-                .field {{ margin-bottom: 10px; }}
-                .label {{ font-weight: bold; color: #555; }}
-                .value {{ margin-left: 10px; }}
-                .footer {{ margin-top: 20px; padding-top: 10px; border-top: 1px solid #ddd; font-size: 12px; color: #777; text-align: center; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h2>🆕 Новая заявка: {type_names[user_type]}</h2>
-                    <p>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-                </div>
-                <div class="content">
-        """
-
-        # Добавляем поля в зависимости от типа
-        if user_type == 'individual':
-            fields = [
-                ("👤 Имя", data.get('name')),
-                ("🏠 Залог", data.get('collateral')),
-                ("💰 Сумма", f"{data.get('amount', 0):,} руб."),
-                ("🎯 Цель займа", data.get('purpose')),
-                ("📞 Телефон", data.get('phone'))
-            ]
-        elif user_type == 'business':
-            fields = [
-                ("🏛️ Компания", data.get('company_name')),
-                ("📝 Тип", "Заемщик (бизнес)"),
-                ("💰 Сумма", f"{data.get('amount', 0):,} руб."),
-                ("🔒 Обеспечение", data.get('collateral')),
-                ("🎯 Цель займа", data.get('purpose')),
-                ("📞 Телефон", data.get('phone'))
-            ]
-        elif user_type == 'investor':
-            fields = [
-                ("👤 Имя", data.get('name')),
-                ("📝 Тип", "Инвестор"),
-                ("💰 Сумма для инвестирования", f"{data.get('investment_amount', 0):,} руб."),
-                ("⏱️ Горизонт инвестирования", f"{data.get('term_months', 0)} месяцев"),
-                ("🎯 Цель", data.get('investment_goal')),
-                ("📞 Телефон", data.get('phone'))
-            ]
-
-        for label, value in fields:
-            html += f"""
-                    <div class="field">
-                        <span class="label">{label}:</span>
-                        <span class="value">{value}</span>
-                    </div>
-            """
-
-        html += f"""
-                </div>
-                <div class="footer">
-                    <p>Это автоматическое уведомление от ИИ-консультанта BBKinvest</p>
-                    <p>ID сессии: {data.get('session_id', 'Не указано')}</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        from backend.core.application_formatter import ApplicationFormatter
 
-        return html
\ No newline at end of file
+        return ApplicationFormatter.format_application(user_type, data, "email_html")
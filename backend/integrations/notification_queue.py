@@ -0,0 +1,125 @@
+"""
+Очередь отправки уведомлений о заявках.
+
+Отправка в Telegram и на email идёт в фоновом потоке, поэтому ответ
+пользователю не ждёт внешних API. При остановке приложения очередь
+дописывается с ограничением по времени.
+"""
+import logging
+import queue
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.core.background import BackgroundWriter
+from backend.core.logging_config import log_context
+
+logger = logging.getLogger(__name__)
+
+Notification = Tuple[str, Dict[str, Any]]
+
+
+@dataclass
+class NotificationBatch:
+    """Пачка заявок, отправляемая сводкой (массовый импорт)."""
+    title: str
+    applications: List[Notification]
+
+
+class NotificationQueue(BackgroundWriter):
+    """
+    Фоновая отправка заявок через NotificationService.
+
+    Сервис передаётся функцией, чтобы подмена сервиса (в тестах,
+    при перенастройке) действовала и на уже созданную очередь.
+    """
+
+    thread_name = "notification-sender"
+
+    def __init__(self, service: Callable[[], Any], max_queue_size: int = 1000):
+        super().__init__(max_queue_size)
+        self._service = service
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, user_type: str, application_data: Dict[str, Any]) -> bool:
+        """Ставит заявку в очередь на отправку. Не блокирует."""
+        if self._stopped:
+            self.dropped += 1
+            logger.error("Очередь уведомлений остановлена, заявка сессии %s не отправлена",
+                         application_data.get('session_id'))
+            return False
+
+        self.start()
+        try:
+            self._queue.put_nowait((user_type, application_data))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.error("Очередь уведомлений переполнена, заявка сессии %s не отправлена",
+                         application_data.get('session_id'))
+            return False
+
+    def submit_batch(self, title: str, applications: List[Notification],
+                     timeout: Optional[float] = None) -> bool:
+        """
+        Ставит пачку заявок в очередь одним элементом.
+
+        В отличие от submit ждёт места в очереди до timeout секунд
+        (None - без ограничения): массовый импорт замедляется до скорости
+        отправки, а не теряет уведомления.
+        """
+        if self._stopped:
+            self.dropped += len(applications)
+            logger.error("Очередь уведомлений остановлена, пачка не отправлена: %s", title)
+            return False
+
+        self.start()
+        try:
+            self._queue.put(NotificationBatch(title, applications), timeout=timeout)
+            return True
+        except queue.Full:
+            self.dropped += len(applications)
+            logger.error("Очередь уведомлений переполнена, пачка не отправлена: %s", title)
+            return False
+
+    def _run(self):
+        while not self._shutdown.is_set():
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            if isinstance(item, NotificationBatch):
+                self._send_batch(item)
+                continue
+
+            user_type, application_data = item
+            session_id = application_data.get('session_id')
+            try:
+                with log_context(session_id=session_id):
+                    sent = self._service().send_application_notification(user_type, application_data)
+                if sent:
+                    self.sent += 1
+                    logger.info("Уведомление о заявке отправлено. Session: %s", session_id)
+                else:
+                    self.failed += 1
+                    logger.error("Не удалось отправить уведомление о заявке. Session: %s", session_id)
+            except Exception as e:
+                self.failed += 1
+                logger.error("Ошибка при отправке уведомления: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def _send_batch(self, batch: NotificationBatch):
+        count = len(batch.applications)
+        try:
+            if self._service().send_batch_notification(batch.title, batch.applications):
+                self.sent += count
+            else:
+                self.failed += count
+        except Exception as e:
+            self.failed += count
+            logger.error("Ошибка при отправке пачки уведомлений: %s", e)
+        finally:
+            self._queue.task_done()
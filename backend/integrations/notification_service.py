@@ -1,8 +1,9 @@
 """
 Общий сервис для отправки уведомлений.
 """
+import html
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -46,7 +47,7 @@ class NotificationService:
                 )
 
                 if telegram_success:
-                    logger.info(f"Заявка успешно отправлена в Telegram")
+                    logger.info("Заявка успешно отправлена в Telegram")
                     success = True
                     self._log_notification("telegram", user_type, application_data, True)
                 else:
@@ -54,7 +55,7 @@ class NotificationService:
                     self._log_notification("telegram", user_type, application_data, False)
             except Exception as e:
                 errors.append(f"Telegram ошибка: {str(e)}")
-                logger.error(f"Ошибка отправки в Telegram: {str(e)}")
+                logger.error("Ошибка отправки в Telegram: %s", e)
                 self._log_notification("telegram", user_type, application_data, False)
 
         # Если Telegram не сработал, пробуем Email (если доступен)
@@ -65,7 +66,7 @@ class NotificationService:
                 )
 
                 if email_success:
-                    logger.info(f"Заявка успешно отправлена на Email")
+                    logger.info("Заявка успешно отправлена на Email")
                     success = True
                     self._log_notification("email", user_type, application_data, True)
                 else:
@@ -73,17 +74,75 @@ class NotificationService:
                     self._log_notification("email", user_type, application_data, False)
             except Exception as e:
                 errors.append(f"Email ошибка: {str(e)}")
-                logger.error(f"Ошибка отправки на Email: {str(e)}")
+                logger.error("Ошибка отправки на Email: %s", e)
                 self._log_notification("email", user_type, application_data, False)
 
         # Логируем итог
         if success:
-            logger.info(f"Уведомление о заявке отправлено. Тип: {user_type}")
+            logger.info("Уведомление о заявке отправлено. Тип: %s", user_type)
         else:
-            logger.error(f"Не удалось отправить уведомление. Ошибки: {'; '.join(errors)}")
+            logger.error("Не удалось отправить уведомление. Ошибки: %s", '; '.join(errors))
 
         return success
 
+    def send_batch_notification(self, title: str, applications: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """
+        Отправляет пачку заявок сводкой (массовый импорт).
+
+        В Telegram - заявки в компактном виде, по нескольку в сообщении
+        (в пределах длины сообщения Bot API). Заявки из сообщений, которые
+        Telegram не принял, отправляются отдельными письмами на Email.
+
+        Returns:
+            bool: True если все заявки пачки отправлены
+        """
+        unsent = list(range(len(applications)))
+
+        if self.telegram_sender and self.telegram_sender.enabled:
+            from backend.core.application_formatter import ApplicationFormatter
+
+            try:
+                entries = ApplicationFormatter.format_batch(applications, "compact")
+                limit = getattr(self.telegram_sender, 'MAX_MESSAGE_LENGTH', 4096)
+                delivered = set()
+                for message, numbers in _split_messages(title, entries, limit):
+                    if not self.telegram_sender.send_text(message):
+                        break
+                    delivered.update(numbers)
+                unsent = [number for number in unsent if number not in delivered]
+            except Exception as e:
+                logger.error("Ошибка отправки пачки заявок в Telegram: %s", e)
+
+        if unsent and self.email_sender and self.email_sender.enabled:
+            remaining = []
+            for number in unsent:
+                user_type, application_data = applications[number]
+                try:
+                    if self.email_sender.send_application(user_type, application_data):
+                        continue
+                except Exception as e:
+                    logger.error("Ошибка отправки на Email: %s", e)
+                remaining.append(number)
+            unsent = remaining
+
+        if not unsent:
+            logger.info("Пачка заявок отправлена: %s (%s)", title, len(applications))
+        else:
+            logger.error("Не удалось отправить пачку заявок: %s (%s из %s)", title, len(unsent), len(applications))
+        return not unsent
+
+    def warm_up(self) -> Dict[str, bool]:
+        """Готовит каналы к первой отправке (соединения, модули). Без тестовых сообщений."""
+        results = {}
+        for channel, sender in (('telegram', self.telegram_sender), ('email', self.email_sender)):
+            if sender is not None and sender.enabled and hasattr(sender, 'warm_up'):
+                try:
+                    results[channel] = sender.warm_up()
+                except Exception as e:
+                    logger.error("Ошибка подготовки канала %s: %s", channel, e)
+                    results[channel] = False
+        return results
+
     def test_connections(self) -> Dict[str, bool]:
         """Тестирует соединения с Telegram и Email."""
         results = {
@@ -97,11 +156,11 @@ class NotificationService:
                 telegram_info = self.telegram_sender.get_bot_info()
                 if telegram_info and telegram_info.get('ok'):
                     results['telegram'] = True
-                    logger.info(f"Telegram подключен")
+                    logger.info("Telegram подключен")
                 else:
                     logger.error("Telegram: Не удалось получить информацию о боте")
             except Exception as e:
-                logger.error(f"Telegram тест не пройден: {str(e)}")
+                logger.error("Telegram тест не пройден: %s", e)
 
         # Тест Email (если доступен)
         if self.email_sender and self.email_sender.enabled:
@@ -112,7 +171,7 @@ class NotificationService:
                 else:
                     logger.error("Email: Не удалось отправить тестовое письмо")
             except Exception as e:
-                logger.error(f"Email тест не пройден: {str(e)}")
+                logger.error("Email тест не пройден: %s", e)
         else:
             logger.info("Email отключен в настройках")
 
@@ -152,4 +211,35 @@ class NotificationService:
             'success': success,
             'failed': total - success,
             'last_10': self.notification_history[-10:] if total > 10 else self.notification_history
-        }
\ No newline at end of file
+        }
+
+def _split_messages(title: str, entries: List[str], limit: int) -> List[Tuple[str, List[int]]]:
+    """
+    Разбивает заявки на сообщения HTML не длиннее limit (заявка не делится,
+    кроме слишком длинной). Возвращает сообщения и номера заявок в каждом.
+
+    Текст экранируется после обрезки, чтобы не разрезать сущность вроде &amp;.
+    """
+    title = html.escape(title)
+    available = limit - len(title) - 2
+    messages = []
+    current, numbers = title, []
+    for number, entry in enumerate(entries):
+        escaped = html.escape(entry)
+        if len(escaped) > available:
+            parts, size = [], 1  # место под "…"
+            for char in entry:
+                char = html.escape(char)
+                if size + len(char) > available:
+                    break
+                parts.append(char)
+                size += len(char)
+            escaped = "".join(parts) + "…"
+        if numbers and len(current) + 2 + len(escaped) > limit:
+            messages.append((current, numbers))
+            current, numbers = title, []
+        current += "\n\n" + escaped
+        numbers.append(number)
+    if numbers or not messages:
+        messages.append((current, numbers))
+    return messages
@@ -2,7 +2,6 @@
 Отправка заявок в Telegram через Bot API.
 """
 import logging
-import requests
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -11,11 +10,16 @@ logger = logging.getLogger(__name__)
 class TelegramSender:
     """Класс для отправки уведомлений в Telegram."""
 
-    def __init__(self, bot_token: str, chat_id: str, enabled: bool = True):
+    API_URL = "https://api.telegram.org"
+    # Ограничение Bot API на длину текста сообщения
+    MAX_MESSAGE_LENGTH = 4096
+
+    def __init__(self, bot_token: str, chat_id: str, enabled: bool = True, api_url: str = API_URL):
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.enabled = enabled
-        self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self.base_url = f"{api_url.rstrip('/')}/bot{self.bot_token}"
+        self._http = None
 
         if not self.enabled:
             logger.warning("Отправка в Telegram отключена в настройках")
@@ -46,17 +50,30 @@ class TelegramSender:
             response = self._send_message(message)
 
             if response and response.get('ok'):
-                logger.info(f"Заявка успешно отправлена в Telegram. Chat ID: {self.chat_id}")
+                logger.info("Заявка успешно отправлена в Telegram. Chat ID: %s", self.chat_id)
                 return True
             else:
                 error_msg = response.get('description', 'Неизвестная ошибка') if response else 'Нет ответа от Telegram API'
-                logger.error(f"Ошибка отправки в Telegram: {error_msg}")
+                logger.error("Ошибка отправки в Telegram: %s", error_msg)
                 return False
 
         except Exception as e:
-            logger.error(f"Ошибка при отправке в Telegram: {str(e)}", exc_info=True)
+            logger.error("Ошибка при отправке в Telegram: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return False
 
+    def send_text(self, text: str) -> bool:
+        """Отправляет готовый текст (HTML), например сводку по пачке заявок."""
+        if not self.enabled:
+            logger.warning("Telegram отключен, пропускаем отправку")
+            return False
+
+        response = self._send_message(text)
+        if response and response.get('ok'):
+            return True
+        error_msg = response.get('description', 'Неизвестная ошибка') if response else 'Нет ответа от Telegram API'
+        logger.error("Ошибка отправки в Telegram: %s", error_msg)
+        return False
+
     def send_test_message(self, text: str = "Тестовое сообщение от ИИ-консультанта BBKinvest") -> bool:
         """Отправляет тестовое сообщение для проверки подключения."""
         if not self.enabled:
@@ -70,11 +87,36 @@ class TelegramSender:
                 return True
             return False
         except Exception as e:
-            logger.error(f"Ошибка отправки тестового сообщения: {str(e)}")
+            logger.error("Ошибка отправки тестового сообщения: %s", e)
             return False
 
+    @property
+    def http(self):
+        """
+        HTTP-сессия с пулом соединений к Bot API.
+
+        requests загружается при первой отправке, а не при старте приложения.
+        """
+        if self._http is None:
+            import requests
+            self._http = requests.Session()
+        return self._http
+
+    def ping(self) -> bool:
+        """Проверка доступности Bot API и токена (getMe)."""
+        if not self.enabled or not self.bot_token:
+            return False
+        info = self.get_bot_info()
+        return bool(info and info.get('ok'))
+
+    def warm_up(self) -> bool:
+        """Открывает соединение с Bot API заранее."""
+        return self.ping()
+
     def _send_message(self, text: str) -> Optional[Dict[str, Any]]:
         """Отправляет сообщение через Telegram Bot API."""
+        import requests
+
         url = f"{self.base_url}/sendMessage"
 
         payload = {
@@ -85,14 +127,14 @@ class TelegramSender:
         }
 
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self.http.post(url, json=payload, timeout=10)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            logger.error(f"Ошибка запроса к Telegram API: {str(e)}")
+            logger.error("Ошибка запроса к Telegram API: %s", e)
             return None
         except ValueError as e:
-            logger.error(f"Ошибка парсинга ответа от Telegram: {str(e)}")
+            logger.error("Ошибка парсинга ответа от Telegram: %s", e)
             return None
 
     def get_bot_info(self) -> Optional[Dict[str, Any]]:
@@ -102,9 +144,9 @@ class TelegramSender:
 
         url = f"{self.base_url}/getMe"
         try:
-            response = requests.get(url, timeout=5)
+            response = self.http.get(url, timeout=5)
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            logger.error(f"Ошибка получения информации о боте: {str(e)}")
+            logger.error("Ошибка получения информации о боте: %s", e)
             return None
\ No newline at end of file
@@ -5,38 +5,42 @@ import os
 import sys
 import logging
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # Добавляем путь к проекту для корректных импортов
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Импортируем API endpoints
 from backend.api.endpoints import router as chat_router
+from backend.api.admin import router as admin_router
+from backend.api.lifespan import lifespan, readiness_status
+from backend.api.middleware import BypassMiddleware, TraceMiddleware, WidgetCORSMiddleware
+from backend.core.config import settings
+from backend.core.logging_config import setup_logging
 
 # Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="BBKinvest AI Consultant API",
     description="API для ИИ-консультанта сайта BBKinvest",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
-# Настройка CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # В продакшене заменить на конкретные домены
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS только для виджета; список доменов - в настройке CORS_ORIGINS
+app.add_middleware(WidgetCORSMiddleware, allow_origins=settings.cors_origins, max_age=settings.cors_max_age)
+
+# Трассировка запросов с X-Trace (TRACE_ENABLED)
+app.add_middleware(TraceMiddleware)
+
+# Пробы и метрики минуют middleware (добавляется последним - внешний слой)
+app.add_middleware(BypassMiddleware, router=app.router)
 
 # Подключаем маршруты
 app.include_router(chat_router)
+app.include_router(admin_router)
 
 @app.get("/")
 async def root():
@@ -48,15 +52,32 @@ async def root():
         "endpoints": {
             "chat": "/api/v1/chat (POST)",
             "quick_start": "/api/v1/chat/quick-start (POST)",
-            "health": "/health (GET)"
+            "admin_applications": "/api/v1/admin/applications (GET)",
+            "admin_export": "/api/v1/admin/export/applications (GET)",
+            "admin_funnel": "/api/v1/admin/funnel (GET)",
+            "admin_transcript": "/api/v1/admin/transcripts/{session_id} (GET)",
+            "admin_export_transcripts": "/api/v1/admin/export/transcripts (GET)",
+            "health": "/health (GET)",
+            "ready": "/ready (GET)"
         }
     }
 
 @app.get("/health")
 async def health_check():
-    """Эндпоинт для проверки здоровья сервиса."""
+    """Проверка, что процесс жив (liveness): без обращений к внешним сервисам."""
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Готовность принимать трафик (readiness).
+
+    Результаты проверок берутся из кэша, который обновляется в фоне.
+    """
+    ready, checks = readiness_status()
+    return JSONResponse({"status": "ready" if ready else "not_ready", "checks": checks},
+                        status_code=200 if ready else 503)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -12,7 +12,8 @@ def create_telegram_sender() -> TelegramSender:
     return TelegramSender(
         bot_token=settings.telegram_bot_token,
         chat_id=settings.telegram_chat_id,
-        enabled=settings.telegram_enabled
+        enabled=settings.telegram_enabled,
+        api_url=settings.telegram_api_url,
     )
 
 
@@ -0,0 +1,97 @@
+"""
+Бенчмарк пропускной способности /api/v1/chat через локальный ASGI-клиент.
+
+Запуск:
+    python -m tests.benchmarks.bench_chat_api --dialogs 200
+"""
+import argparse
+import logging
+import sys
+import os
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.api.endpoints import ChatResponse
+from backend.api.responses import ChatJSONResponse
+from backend.core.config import settings
+from backend.core.dialog_manager import dialog_manager
+from backend.integrations.notification_service import NotificationService
+
+# Полный диалог физического лица (9 запросов)
+DIALOG = [
+    "", "Займ", "Физическое лицо", "Иван Иванов", "Toyota Camry, 2020 год",
+    "1000000", "развитие бизнеса", "89123456789", "Да, отправить заявку",
+]
+
+
+def bench_requests(client: TestClient, dialogs: int) -> float:
+    """Прогоняет полные диалоги и возвращает число запросов в секунду."""
+    requests_count = 0
+    started = time.perf_counter()
+
+    for _ in range(dialogs):
+        session_id = None
+        for message in DIALOG:
+            response = client.post("/api/v1/chat", json={"session_id": session_id, "message": message})
+            session_id = response.json()["session_id"]
+            requests_count += 1
+
+    elapsed = time.perf_counter() - started
+    return requests_count / elapsed
+
+
+def bench_serialization(iterations: int) -> dict:
+    """Сравнивает сериализацию ответа: стандартный JSONResponse и быстрый путь."""
+    result = dialog_manager.process_user_message("", "")
+    model = ChatResponse(**result)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        JSONResponse(ChatResponse(**result).model_dump())
+    baseline = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        ChatJSONResponse(ChatResponse(**result))
+    fast = time.perf_counter() - started
+
+    return {
+        "json_response_us": baseline / iterations * 1e6,
+        "fast_response_us": fast / iterations * 1e6,
+        "payload_bytes": len(ChatJSONResponse(model).body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк /api/v1/chat")
+    parser.add_argument("--dialogs", type=int, default=200, help="Количество полных диалогов")
+    parser.add_argument("--iterations", type=int, default=20000, help="Итераций сериализации")
+    args = parser.parse_args()
+
+    # Логи httpx на каждый запрос искажают замер
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # Уведомления без каналов доставки: бенчмарк не должен ходить в сеть
+    dialog_manager._notification_service = NotificationService()
+
+    # Все запросы идут с одного адреса, лимиты частоты исказили бы замер
+    settings.rate_limit_enabled = False
+
+    client = TestClient(app)
+    rps = bench_requests(client, args.dialogs)
+    serialization = bench_serialization(args.iterations)
+
+    print(f"Запросов в секунду: {rps:.0f} ({args.dialogs} диалогов по {len(DIALOG)} шагов)")
+    print(f"JSONResponse: {serialization['json_response_us']:.2f} мкс/ответ")
+    print(f"ChatJSONResponse: {serialization['fast_response_us']:.2f} мкс/ответ")
+    print(f"Размер ответа: {serialization['payload_bytes']} байт")
+
+
+if __name__ == "__main__":
+    main()
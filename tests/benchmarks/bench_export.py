@@ -0,0 +1,73 @@
+"""
+Бенчмарк потоковой выгрузки заявок.
+
+Запуск:
+    python -m tests.benchmarks.bench_export --rows 200000
+"""
+import argparse
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.db.export import export_applications
+from backend.db.repository import ApplicationRepository, application_row
+
+
+def fill(repository: ApplicationRepository, rows: int, batch: int = 10000):
+    """Заполняет базу синтетическими заявками."""
+    start = datetime(2024, 1, 1)
+    for offset in range(0, rows, batch):
+        repository.bulk_insert([
+            application_row('individual', {
+                'name': 'Иван Петров', 'collateral': 'квартира', 'amount': 1_000_000 + i,
+                'purpose': 'развитие бизнеса', 'phone': f'8912{i % 10_000_000:07d}', 'session_id': f's{i}',
+            }, created_at=start + timedelta(seconds=i))
+            for i in range(offset, min(offset + batch, rows))
+        ])
+
+
+def bench(repository: ApplicationRepository, output: str, include_data: bool):
+    """Возвращает (секунды, МБ/с, пик памяти Python в МБ)."""
+    started = time.perf_counter()
+    size = 0
+    for chunk in export_applications(repository, output, include_data=include_data):
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+
+    # Память меряем отдельным проходом: tracemalloc сильно замедляет выгрузку
+    tracemalloc.start()
+    for _ in export_applications(repository, output, include_data=include_data):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size / elapsed / 1e6, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк выгрузки заявок")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        repository = ApplicationRepository(url=f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        repository.wait_ready()
+        fill(repository, args.rows)
+
+        for output in ("csv", "jsonl"):
+            for include_data in (False, True):
+                elapsed, throughput, peak = bench(repository, output, include_data)
+                label = f"{output}{' +data' if include_data else ''}"
+                print(f"{label:12} {args.rows / elapsed:10,.0f} строк/с  {throughput:6.1f} МБ/с  "
+                      f"пик памяти {peak:5.1f} МБ")
+
+        repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Бенчмарк базы знаний: построение, загрузка готового индекса и поиск.
+
+Запуск:
+    python -m tests.benchmarks.bench_faq --queries 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.core.config import settings
+from backend.core.knowledge_base import build_index, faq_files, fingerprint, load_index, save_index
+
+QUERIES = [
+    "Какие документы нужны для займа?",
+    "можно ли ездить на машине в залоге?",
+    "какой процент по кредиту?",
+    "сколько рассматривают заявку?",
+    "какая доходность инвестиций",
+    "можно погасить досрочно?",
+    "где вы находитесь?",
+    "погода завтра?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs-dir", default=settings.faq_docs_dir)
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build_index(args.docs_dir)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "faq_index.json")
+        save_index(index, path, fingerprint(faq_files(args.docs_dir), args.docs_dir))
+        started = time.perf_counter()
+        load_index(args.docs_dir, path)
+        load_ms = (time.perf_counter() - started) * 1000
+
+    print(f"Вопросов: {len(index)}, основ: {len(index.postings)}")
+    print(f"Построение: {build_ms:.2f} мс, загрузка с диска: {load_ms:.2f} мс")
+
+    timings = []
+    for number in range(args.queries):
+        query = QUERIES[number % len(QUERIES)]
+        started = time.perf_counter()
+        index.answer(query)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    print(f"Поиск, мкс: медиана {statistics.median(timings) * 1e6:.1f}, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.1f}, макс {timings[-1] * 1e6:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Бенчмарк отрисовки заявок по типам пользователей и форматам.
+
+Запуск:
+    python -m tests.benchmarks.bench_formatter
+"""
+import argparse
+import sys
+import os
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.core.application_templates import application_templates, OUTPUT_FORMATS
+
+SAMPLES = {
+    'individual': {
+        'name': 'Иван Иванов', 'collateral': 'Toyota Camry, 2020 год', 'amount': 1500000,
+        'purpose': 'развитие бизнеса', 'phone': '+79123456789', 'session_id': 'bench-individual',
+    },
+    'business': {
+        'company_name': 'ООО «ТехноПром»', 'amount': 5000000, 'collateral': 'Станки, 2023 г.',
+        'purpose': 'закупка оборудования', 'phone': '+79223456789', 'session_id': 'bench-business',
+    },
+    'investor': {
+        'name': 'Екатерина', 'investment_amount': 3000000, 'term_months': 12,
+        'investment_goal': 'пассивный доход', 'phone': '+79323456789', 'session_id': 'bench-investor',
+    },
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк шаблонов заявок")
+    parser.add_argument("--number", type=int, default=50000, help="Отрисовок на пару (тип, формат)")
+    parser.add_argument("--batch", type=int, default=1000, help="Размер пачки для render_batch")
+    args = parser.parse_args()
+
+    application_templates.compile_all()
+
+    for user_type, data in SAMPLES.items():
+        for output in OUTPUT_FORMATS:
+            started = time.perf_counter()
+            for _ in range(args.number):
+                application_templates.render(user_type, data, output)
+            elapsed = (time.perf_counter() - started) / args.number * 1e6
+            print(f"{user_type:11} {output:11} {elapsed:6.2f} мкс")
+
+    batch = [(user_type, data) for user_type, data in SAMPLES.items()] * (args.batch // 3)
+    started = time.perf_counter()
+    application_templates.render_batch(batch)
+    elapsed = time.perf_counter() - started
+    print(f"render_batch: {len(batch) / elapsed:.0f} заявок/с ({len(batch)} заявок)")
+
+
+if __name__ == "__main__":
+    main()
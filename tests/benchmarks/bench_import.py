@@ -0,0 +1,104 @@
+"""
+Время импорта точек входа (холодный старт воркера).
+
+Каждый модуль импортируется в отдельном процессе с -X importtime;
+в отчёте медиана по повторам и самые медленные собственные импорты.
+
+Запуск:
+    python -m tests.benchmarks.bench_import --repeat 7
+    python -m tests.benchmarks.bench_import --module backend.main --top 20 --json import.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+ENTRY_POINTS = [
+    "backend.main",
+    "backend.cli",
+    "backend.core.config",
+    "backend.core.dialog_manager",
+    "backend.integrations",
+    "backend.utils.telegram_helper",
+]
+
+
+def run_importtime(code: str) -> Tuple[float, List[Tuple[int, int, str]]]:
+    """Выполняет код с -X importtime: (время процесса в мс, [(собственное мкс, суммарное мкс, модуль)])."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    wall = (time.perf_counter() - started) * 1000
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return wall, rows
+
+
+def import_profile(module: str, startup: Set[str]) -> Tuple[float, float, List[Tuple[int, int, str]]]:
+    """
+    Импортирует модуль в новом процессе.
+
+    Время импорта - сумма импортов верхнего уровня, кроме запуска
+    интерпретатора (startup), то есть вместе с родительскими пакетами.
+
+    Returns:
+        (время процесса в мс, время импорта в мс, [(собственное мкс, суммарное мкс, модуль)])
+    """
+    wall, rows = run_importtime(f"import {module}")
+    total = sum(cumulative for _, cumulative, name in rows
+                if not name.startswith("  ") and name.strip() not in startup)
+    return wall, total / 1000, rows
+
+
+def profile(module: str, repeat: int, startup: Set[str]) -> Dict[str, object]:
+    walls, totals, rows = [], [], []
+    for _ in range(repeat):
+        wall, total, rows = import_profile(module, startup)
+        walls.append(wall)
+        totals.append(total)
+    return {
+        "module": module,
+        "process_ms": round(statistics.median(walls), 1),
+        "import_ms": round(statistics.median(totals), 1),
+        "slowest": sorted((row for row in rows if row[2].strip() not in startup), reverse=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время импорта точек входа")
+    parser.add_argument("--module", action="append", help="Модуль (по умолчанию - все точки входа)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="Показать N самых медленных импортов")
+    parser.add_argument("--json", help="Записать результат в JSON-файл")
+    args = parser.parse_args()
+
+    startup = {name.strip() for _, _, name in run_importtime("pass")[1]}
+    results = [profile(module, args.repeat, startup) for module in args.module or ENTRY_POINTS]
+
+    print(f"{'module':34} {'import_ms':>10} {'process_ms':>11}")
+    for result in results:
+        print(f"{result['module']:34} {result['import_ms']:10.1f} {result['process_ms']:11.1f}")
+        for self_us, cumulative_us, name in result["slowest"][:args.top]:
+            print(f"    {self_us / 1000:8.1f} {cumulative_us / 1000:8.1f}  {name.strip()}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump([{key: value for key, value in result.items() if key != "slowest"} for result in results],
+                      file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Бенчмарк классификатора намерений против прежних проверок подстрок.
+
+Запуск:
+    python -m tests.benchmarks.bench_intent
+"""
+import argparse
+import json
+import sys
+import os
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.core.intent_classifier import service_classifier, borrower_classifier
+
+PHRASES_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'intent_phrases.json')
+
+
+def substring_service(text: str):
+    """Прежняя логика ScenarioManager для выбора услуги."""
+    text = text.lower()
+    if "займ" in text or "кредит" in text:
+        return "loan"
+    elif "инвест" in text:
+        return "invest"
+    return None
+
+
+def substring_borrower(text: str):
+    """Прежняя логика ScenarioManager для выбора типа заемщика."""
+    text = text.lower()
+    if "физ" in text or "лич" in text:
+        return "individual"
+    elif "биз" in text or "юр" in text or "ип" in text:
+        return "business"
+    return None
+
+
+def measure(func, phrases, rounds: int) -> float:
+    """Возвращает среднее время одного вызова в микросекундах."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in phrases:
+            func(text)
+    return (time.perf_counter() - started) / (rounds * len(phrases)) * 1e6
+
+
+def accuracy(func, labelled) -> float:
+    return sum(1 for text, expected in labelled if func(text) == expected) / len(labelled)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк классификатора намерений")
+    parser.add_argument("--rounds", type=int, default=2000, help="Проходов по набору фраз")
+    args = parser.parse_args()
+
+    with open(PHRASES_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+
+    cases = [
+        ("service", data["service"], lambda t: service_classifier.classify(t).intent, substring_service),
+        ("borrower", data["borrower"], lambda t: borrower_classifier.classify(t).intent, substring_borrower),
+    ]
+
+    for name, labelled, classifier, substring in cases:
+        phrases = [text for text, _ in labelled]
+        print(f"{name}: {len(phrases)} фраз")
+        print(f"  автомат:   {measure(classifier, phrases, args.rounds):.2f} мкс/фраза, "
+              f"точность {accuracy(classifier, labelled):.1%}")
+        print(f"  подстроки: {measure(substring, phrases, args.rounds):.2f} мкс/фраза, "
+              f"точность {accuracy(substring, labelled):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Бенчмарк массового импорта заявок из CSV.
+
+Генерирует файл партнёра (часть строк с ошибками и повторами телефонов),
+импортирует его в SQLite во временном каталоге и сравнивает скорость
+(строк в секунду) и пиковый расход памяти (tracemalloc) с целевыми.
+Память замеряется отдельным прогоном: она не должна расти с размером файла.
+
+Запуск:
+    python -m tests.benchmarks.bench_lead_import --rows 100000
+    python -m tests.benchmarks.bench_lead_import --rows 200000 --min-rows-per-second 10000 --max-memory-mb 32
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.db.lead_import import LeadImporter
+from backend.db.repository import ApplicationRepository
+
+HEADER = ["user_type", "name", "company_name", "phone", "amount", "term_months", "collateral", "purpose"]
+NAMES = ["Иван Петров", "Анна Смирнова", "Олег", "Мария Иванова", "Сергей Кузнецов"]
+AMOUNTS = ["500000", "1 000 000", "1.5 млн", "750к", "2000000 руб."]
+
+
+class CountingNotifications:
+    """Очередь уведомлений без отправки: считает сводки."""
+
+    def __init__(self):
+        self.batches = 0
+
+    def submit_batch(self, title, applications, timeout=None):
+        self.batches += 1
+        return True
+
+
+def generate(path: str, rows: int, seed: int = 1):
+    """CSV: ~5% строк с ошибками, ~5% повторов телефона."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADER)
+        for number in range(rows):
+            # Повтор - телефон одной из прежних строк в другой записи
+            n = rng.randrange(number) if number and rng.random() < 0.05 else number
+            phone = f"8 (9{n // 10**7 % 100:02d}) {n // 10**4 % 1000:03d}-{n // 100 % 100:02d}-{n % 100:02d}"
+            kind = rng.choice(("individual", "individual", "business", "investor"))
+            amount = rng.choice(AMOUNTS) if rng.random() > 0.02 else "много"
+            writer.writerow([
+                kind,
+                rng.choice(NAMES),
+                "ООО Ромашка" if kind == "business" else "",
+                phone,
+                amount,
+                str(rng.randint(1, 130)) if kind == "investor" else "",
+                "Toyota Camry, 2020 год",
+                "развитие бизнеса",
+            ])
+
+
+def run_import(path: str, database: str, chunk_size: int, trace_memory: bool):
+    repository = ApplicationRepository(url=f"sqlite:///{database}")
+    notifications = CountingNotifications()
+    importer = LeadImporter(repository, notifications, source="bench", chunk_size=chunk_size)
+
+    if trace_memory:
+        tracemalloc.start()
+    with open(path, encoding="utf-8", newline="") as file:
+        report = importer.run(file)
+    peak = 0
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return report, notifications.batches, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк массового импорта заявок")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--min-rows-per-second", type=float, default=10000)
+    parser.add_argument("--max-memory-mb", type=float, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "leads.csv")
+        started = time.perf_counter()
+        generate(path, args.rows)
+        print(f"Файл: {args.rows} строк, {os.path.getsize(path) / 2**20:.1f} МБ "
+              f"(подготовка {time.perf_counter() - started:.1f} с)")
+
+        report, batches, _ = run_import(path, os.path.join(directory, "speed.db"), args.chunk_size, False)
+        print(f"Загружено {report.imported}, с ошибками {report.invalid}, повторов {report.duplicates}, "
+              f"сводок уведомлений {batches}")
+        print(f"Скорость: {report.rows_per_second:.0f} строк/с ({report.elapsed:.2f} с)")
+
+        _, _, peak = run_import(path, os.path.join(directory, "memory.db"), args.chunk_size, True)
+        print(f"Пик памяти: {peak / 2**20:.1f} МБ")
+
+    failed = []
+    if report.rows_per_second < args.min_rows_per_second:
+        failed.append(f"скорость ниже {args.min_rows_per_second:.0f} строк/с")
+    if peak > args.max_memory_mb * 2**20:
+        failed.append(f"память выше {args.max_memory_mb:.0f} МБ")
+    if failed:
+        print("Цель не достигнута: " + ", ".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Бенчмарк накладных расходов middleware на запрос.
+
+Сравнивает прежнюю схему (CORSMiddleware с "*" и credentials на всех
+маршрутах) с текущим приложением. Запросы подаются прямо в ASGI-
+приложение, без HTTP-клиента, поэтому в замер входят только
+middleware, маршрутизация и обработчик.
+
+Запуск:
+    python -m tests.benchmarks.bench_middleware --requests 20000
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import os
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from backend.api.endpoints import router as chat_router
+from backend.api.admin import router as admin_router
+from backend.main import app, health_check
+
+ORIGIN = b"https://bbkinvest.ru"
+
+REQUESTS = {
+    "health": ("GET", "/health", []),
+    "preflight": ("OPTIONS", "/api/v1/chat", [
+        (b"access-control-request-method", b"POST"),
+        (b"access-control-request-headers", b"content-type"),
+    ]),
+    "chat_state": ("GET", "/api/v1/chat/state/missing", []),
+}
+
+
+def legacy_app() -> FastAPI:
+    """Приложение со схемой middleware до изменения."""
+    legacy = FastAPI()
+    legacy.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    legacy.include_router(chat_router)
+    legacy.include_router(admin_router)
+    legacy.get("/health")(health_check)
+    return legacy
+
+
+async def measure(asgi_app, method: str, path: str, headers, count: int) -> float:
+    """Среднее время запроса в микросекундах."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "server": ("testserver", 80), "client": ("127.0.0.1", 5000),
+        "headers": [(b"host", b"testserver"), (b"origin", ORIGIN)] + headers,
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(min(count, 1000)):
+        await asgi_app(dict(scope), receive, send)
+
+    started = time.perf_counter()
+    for _ in range(count):
+        await asgi_app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Накладные расходы middleware")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    apps = {"before": legacy_app(), "after": app}
+
+    print(f"{'request':12} {'before_us':>10} {'after_us':>10}")
+    for name, (method, path, headers) in REQUESTS.items():
+        results = [asyncio.run(measure(apps[key], method, path, headers, args.requests)) for key in ("before", "after")]
+        print(f"{name:12} {results[0]:10.1f} {results[1]:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Бенчмарк хранилищ сессий.
+
+Сравнивает словарь в памяти процесса (memory), файл в разделяемой
+памяти (shared) и таблицу SQLite в режиме WAL. Отдельной SQLite-
+реализации хранилища в приложении нет, здесь - минимальная эталонная
+с тем же интерфейсом (ключ - session_id, значение - JSON сессии).
+
+Однопроцессный замер: создание, чтение и обновление сессий. Замер
+воркеров: несколько процессов читают и обновляют общие сессии, как
+воркеры uvicorn (для memory неприменим - сессии не видны другим процессам).
+
+Запуск:
+    python -m tests.benchmarks.bench_sessions --sessions 10000 --ops 50000 --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.core.models import DialogState
+from backend.core.session_store import SessionStore
+from backend.core.shared_session_store import SharedSessionStore
+
+UPDATE = {
+    "current_step": "individual_ask_phone",
+    "collected_data": {"user_type": "individual", "service_type": "loan", "name": "Иван Иванов",
+                       "collateral": "Toyota Camry, 2020 год", "amount": 1_000_000,
+                       "purpose": "развитие бизнеса"},
+}
+
+
+class SqliteSessionStore:
+    """Эталон для сравнения: сессии в таблице SQLite (WAL, synchronous=NORMAL)."""
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path, isolation_level=None, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT, updated REAL)")
+
+    def create_session(self) -> str:
+        session_id = str(uuid.uuid4())
+        state = DialogState(session_id=session_id, current_step="welcome", collected_data={})
+        self.db.execute("INSERT INTO sessions VALUES (?, ?, ?)",
+                        (session_id, state.model_dump_json(), time.time()))
+        return session_id
+
+    def get_session(self, session_id: str) -> Optional[DialogState]:
+        row = self.db.execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return DialogState.model_validate_json(row[0]) if row else None
+
+    def update_session(self, session_id: str, updates: dict):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            state = self.get_session(session_id)
+            if state is not None:
+                for key, value in updates.items():
+                    setattr(state, key, value)
+                self.db.execute("UPDATE sessions SET data = ?, updated = ? WHERE id = ?",
+                                (state.model_dump_json(), time.time(), session_id))
+        finally:
+            self.db.execute("COMMIT")
+
+    def close(self):
+        self.db.close()
+
+
+def open_store(backend: str, path: str, slots: int):
+    if backend == "memory":
+        return SessionStore()
+    if backend == "shared":
+        return SharedSessionStore(path=path, slots=slots)
+    return SqliteSessionStore(path)
+
+
+def _rate(count: int, elapsed: float) -> float:
+    return count / elapsed if elapsed else 0.0
+
+
+def bench_single(backend: str, path: str, sessions: int, ops: int, slots: int) -> Dict[str, float]:
+    """Операций в секунду в одном процессе."""
+    store = open_store(backend, path, slots)
+    started = time.perf_counter()
+    ids = [store.create_session() for _ in range(sessions)]
+    create = _rate(sessions, time.perf_counter() - started)
+
+    sample = random.Random(1).choices(ids, k=ops)
+    started = time.perf_counter()
+    for session_id in sample:
+        store.get_session(session_id)
+    get = _rate(ops, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for session_id in sample:
+        store.update_session(session_id, UPDATE)
+    update = _rate(ops, time.perf_counter() - started)
+
+    if hasattr(store, "close"):
+        store.close()
+    return {"create": create, "get": get, "update": update}
+
+
+def _worker(backend: str, path: str, slots: int, ids: List[str], ops: int, seed: int, results):
+    store = open_store(backend, path, slots)
+    sample = random.Random(seed).choices(ids, k=ops)
+    started = time.perf_counter()
+    for session_id in sample:
+        # Шаг диалога: чтение сессии и запись обновлённой
+        store.get_session(session_id)
+        store.update_session(session_id, UPDATE)
+    results.put(time.perf_counter() - started)
+    store.close()
+
+
+def bench_workers(backend: str, path: str, sessions: int, ops: int, workers: int, slots: int) -> float:
+    """Шагов диалога (чтение + запись) в секунду на всех воркерах."""
+    store = open_store(backend, path, slots)
+    ids = [store.create_session() for _ in range(sessions)]
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(backend, path, slots, ids, ops, seed, results))
+                 for seed in range(workers)]
+    for process in processes:
+        process.start()
+    elapsed = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    store.close()
+    return _rate(ops * workers, max(elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк хранилищ сессий")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--ops", type=int, default=50000, help="Операций на замер (и на каждого воркера)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", choices=("memory", "shared", "sqlite"), action="append",
+                        help="Только указанные хранилища (можно несколько раз)")
+    parser.add_argument("--json", action="store_true", help="Вывести результат в JSON")
+    args = parser.parse_args()
+
+    backends = args.backend or ["memory", "shared", "sqlite"]
+    slots = max(1024, args.sessions * 2)
+    report = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in backends:
+            path = os.path.join(directory, backend)
+            result = bench_single(backend, path + "-single", args.sessions, args.ops, slots)
+            if backend != "memory" and args.workers > 1:
+                result[f"step_x{args.workers}"] = bench_workers(backend, path + "-workers", args.sessions,
+                                                                args.ops, args.workers, slots)
+            report[backend] = result
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    columns = ["create", "get", "update", f"step_x{args.workers}"]
+    print(f"{'операций/с':10}" + "".join(f"{column:>14}" for column in columns))
+    for backend, result in report.items():
+        cells = "".join(f"{result[column]:>14,.0f}" if column in result else f"{'-':>14}" for column in columns)
+        print(f"{backend:10}{cells}")
+
+
+if __name__ == "__main__":
+    main()
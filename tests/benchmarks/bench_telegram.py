@@ -0,0 +1,77 @@
+"""
+Бенчмарк доставки заявок в Telegram через локальную заглушку Bot API.
+
+Запуск:
+    python -m tests.benchmarks.bench_telegram --messages 500 --concurrency 8
+    python -m tests.benchmarks.bench_telegram --latency 0.05 --error-rate 0.05 --rate-limit 0.02
+"""
+import argparse
+import logging
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.integrations.telegram_sender import TelegramSender
+from tests.fake_telegram_api import FakeTelegramAPI, FakeTelegramConfig
+
+APPLICATION = {
+    'name': 'Иван Иванов', 'collateral': 'Toyota Camry, 2020 год', 'amount': 1_000_000,
+    'purpose': 'развитие бизнеса', 'phone': '+79123456789', 'session_id': 'bench',
+}
+
+
+def run(sender: TelegramSender, messages: int, concurrency: int):
+    """Отправляет заявки; возвращает (задержки, число успешных, время)."""
+    def send(_):
+        started = time.perf_counter()
+        ok = sender.send_application('individual', APPLICATION)
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, range(messages)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    return latencies, sum(ok for _, ok in results), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк доставки в Telegram")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка заглушки, секунды")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Ошибки доставки логируются на каждую заявку и искажают замер
+    logging.disable(logging.CRITICAL)
+
+    config = FakeTelegramConfig(latency=args.latency, error_rate=args.error_rate,
+                                rate_limit=args.rate_limit, seed=args.seed)
+    with FakeTelegramAPI(config) as api:
+        sender = TelegramSender("1:bench", "42", api_url=api.url)
+        latencies, delivered, elapsed = run(sender, args.messages, args.concurrency)
+        stats = api.stats
+
+    def percentile(q):
+        return latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+
+    print(f"messages             {args.messages}")
+    print(f"delivered            {delivered}")
+    print(f"server_errors        {stats.errors}")
+    print(f"rate_limited         {stats.rate_limited}")
+    print(f"messages_per_second  {args.messages / elapsed:.1f}")
+    print(f"p50_ms               {percentile(0.50):.3f}")
+    print(f"p95_ms               {percentile(0.95):.3f}")
+    print(f"p99_ms               {percentile(0.99):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Микробенчмарки валидаторов DataValidators.
+
+Запуск:
+    python -m tests.benchmarks.bench_validators
+"""
+import argparse
+import sys
+import os
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.core.validators import validators
+
+# Типичные вводы для каждого валидатора
+CASES = {
+    "validate_phone": ["89123456789", "+7 (912) 345-67-89", "9123456789", "123"],
+    "validate_amount": ["1000000", "1 000 000", "1.5 млн", "500к", "около 500000 рублей", "abc"],
+    "validate_name": ["Иван", "Анна-Мария Петрова", "R2D2"],
+    "validate_term_months": ["12", "18 мес.", "2 года", "abc"],
+    "validate_company_name": ["ООО «ТехноПром»", "ИП Иванов Игорь", "ИП Иванов"],
+}
+
+
+def measure(func, value, number: int) -> float:
+    """Возвращает среднее время вызова в наносекундах."""
+    started = time.perf_counter()
+    for _ in range(number):
+        func(value)
+    return (time.perf_counter() - started) / number * 1e9
+
+
+def bench_validate_many(rows: int) -> float:
+    """Возвращает строк в секунду для пакетной проверки всех полей."""
+    columns = {
+        "name": [f"Иван{'а' * (i % 5)}" for i in range(rows)],
+        "phone": [f"8912{i % 10_000_000:07d}" for i in range(rows)],
+        "amount": [f"{(i % 900 + 100)} 000" for i in range(rows)],
+        "term_months": [str(i % 120 + 1) for i in range(rows)],
+        "company_name": ["ООО Ромашка"] * rows,
+    }
+
+    started = time.perf_counter()
+    validators.validate_many(columns)
+    return rows / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Микробенчмарки валидаторов")
+    parser.add_argument("--number", type=int, default=100000, help="Вызовов на один ввод")
+    parser.add_argument("--rows", type=int, default=100000, help="Строк для validate_many")
+    args = parser.parse_args()
+
+    for name, values in CASES.items():
+        func = getattr(validators, name)
+        print(name)
+        for value in values:
+            print(f"  {value!r:28} {measure(func, value, args.number):8.0f} нс")
+
+    print(f"validate_many: {bench_validate_many(args.rows):.0f} строк/с ({args.rows} строк)")
+
+
+if __name__ == "__main__":
+    main()
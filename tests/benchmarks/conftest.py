@@ -0,0 +1,23 @@
+"""
+Настройки набора pytest-benchmark.
+
+Бенчмарки не входят в обычный прогон тестов и запускаются только
+с --benchmark-only (см. tests/benchmarks/run.py).
+"""
+import pytest
+
+
+def pytest_collection_modifyitems(config, items):
+    try:
+        benchmark_only = config.getoption("benchmark_only")
+    except ValueError:
+        # pytest-benchmark не установлен
+        benchmark_only = False
+
+    if benchmark_only:
+        return
+
+    skip = pytest.mark.skip(reason="бенчмарк: запуск через python -m tests.benchmarks.run")
+    for item in items:
+        if "benchmark" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
@@ -0,0 +1,148 @@
+"""
+Генератор реалистичных диалогов по описанию сценариев.
+
+Шаги и поля берутся из ScenarioManager, поэтому новые шаги сценариев
+попадают в нагрузку автоматически (достаточно добавить значения поля
+в FIELD_VALUES). Для каждого сообщения известен ожидаемый шаг ответа,
+так что прогон заодно проверяет корректность переходов.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.scenario_manager import DialogStep, ScenarioManager
+
+# Корректные и некорректные значения полей заявки
+FIELD_VALUES: Dict[str, Tuple[List[str], List[str]]] = {
+    "name": (["Иван", "Анна-Мария Петрова", "Олег Сидоров"], ["R2D2", "И"]),
+    "collateral": (["Kia Sportage, 2021 год", "Квартира 54 м², Москва", "Склад 300 м²"], []),
+    "amount": (["1000000", "1 500 000", "2.5 млн", "750к", "3000000"], ["abc", "100", "999999999999"]),
+    "investment_amount": (["5000000", "1 000 000", "10 млн"], ["много", "500"]),
+    "purpose": (["развитие бизнеса", "личные нужды", "ремонт"], []),
+    "phone": (["89123456789", "+7 (912) 345-67-89", "9031234567"], ["123", "555-12", "12345678901234"]),
+    "company_name": (["ООО «ТехноПром»", "ИП Иванов Игорь", "АО Ромашка"], ["И", "ИП Иванов"]),
+    "term_months": (["12", "18 мес.", "2 года", "36"], ["abc", "0", "200"]),
+    "investment_goal": (["пассивный доход", "сохранение капитала", "диверсификация"], []),
+}
+
+# Ответы на шагах выбора: намерение -> варианты ввода
+SERVICE_INPUTS = {
+    "loan": ["Займ", "хочу кредит", "нужен заем под залог"],
+    "invest": ["Инвестировать", "хочу вложить деньги"],
+}
+BORROWER_INPUTS = {
+    "individual": ["Физическое лицо", "для себя", "физлицо"],
+    "business": ["Бизнес", "на компанию", "ООО"],
+}
+UNCLEAR_INPUTS = ["не знаю", "привет", "?"]
+
+CONFIRM_YES = "Да, отправить заявку"
+CONFIRM_NO = "Нет, исправить"
+
+# Шаги сценария (без подтверждения) и шаг подтверждения по типу пользователя
+SCENARIOS: Dict[str, Tuple[list, DialogStep]] = {
+    confirm.value.split("_", 1)[0]: (steps, confirm)
+    for confirm, steps in ScenarioManager.CONFIRM_STEPS.items()
+}
+
+
+@dataclass
+class Turn:
+    """Одно сообщение пользователя и ожидаемый шаг ответа."""
+    message: str
+    expected_step: str
+    restart: bool = False  # action=restart: диалог начинается заново
+
+
+@dataclass
+class Dialog:
+    """Сгенерированный диалог."""
+    scenario: str
+    turns: List[Turn] = field(default_factory=list)
+    completed: bool = False
+    abandoned: bool = False
+
+
+@dataclass
+class DialogMix:
+    """Вероятности отклонений от идеального прохождения."""
+    scenario_weights: Dict[str, float] = field(
+        default_factory=lambda: {"individual": 0.5, "business": 0.3, "investor": 0.2})
+    invalid_input: float = 0.15   # ошибка ввода перед корректным значением
+    unclear_choice: float = 0.1   # непонятный ответ на шаге выбора
+    fix_at_confirm: float = 0.1   # "Нет, исправить" на подтверждении
+    restart: float = 0.03         # перезапуск диалога после выбора услуги
+    abandon: float = 0.05         # пользователь уходит на каждом шаге с этой вероятностью
+
+
+class DialogGenerator:
+    """Генератор диалогов с воспроизводимым seed."""
+
+    # Ограничение на число повторов "Нет, исправить" в одном диалоге
+    MAX_FIXES = 3
+
+    def __init__(self, mix: Optional[DialogMix] = None, seed: Optional[int] = None):
+        self.mix = mix or DialogMix()
+        self.random = random.Random(seed)
+
+    def _chance(self, probability: float) -> bool:
+        return self.random.random() < probability
+
+    def _choice_turns(self, dialog: Dialog, step: DialogStep, inputs: List[str], next_step: DialogStep):
+        if self._chance(self.mix.unclear_choice):
+            dialog.turns.append(Turn(self.random.choice(UNCLEAR_INPUTS), step.value))
+        dialog.turns.append(Turn(self.random.choice(inputs), next_step.value))
+
+    def _field_turns(self, dialog: Dialog, steps: list, confirm: DialogStep) -> bool:
+        """Шаги ввода данных. Возвращает False, если пользователь ушёл."""
+        for index, (step, field_name, validator) in enumerate(steps):
+            if self._chance(self.mix.abandon):
+                dialog.abandoned = True
+                return False
+
+            valid, invalid = FIELD_VALUES[field_name]
+            if validator is not None and invalid and self._chance(self.mix.invalid_input):
+                dialog.turns.append(Turn(self.random.choice(invalid), step.value))
+
+            next_step = steps[index + 1][0] if index + 1 < len(steps) else confirm
+            dialog.turns.append(Turn(self.random.choice(valid), next_step.value))
+        return True
+
+    def generate(self) -> Dialog:
+        """Один диалог от приветствия до заявки (или ухода пользователя)."""
+        scenarios = list(self.mix.scenario_weights)
+        scenario = self.random.choices(scenarios, weights=[self.mix.scenario_weights[s] for s in scenarios])[0]
+        dialog = Dialog(scenario)
+
+        # Перезапуск: начало диалога, которое бросили и начали заново
+        if self._chance(self.mix.restart):
+            dialog.turns.append(Turn("", DialogStep.ASK_LOAN_OR_INVEST.value))
+            dialog.turns.append(Turn(self.random.choice(SERVICE_INPUTS["loan"]),
+                                     DialogStep.ASK_INDIVIDUAL_OR_BUSINESS.value))
+            dialog.turns.append(Turn("", DialogStep.ASK_LOAN_OR_INVEST.value, restart=True))
+        else:
+            dialog.turns.append(Turn("", DialogStep.ASK_LOAN_OR_INVEST.value))
+
+        steps, confirm = SCENARIOS[scenario]
+        if scenario == "investor":
+            self._choice_turns(dialog, DialogStep.ASK_LOAN_OR_INVEST, SERVICE_INPUTS["invest"], steps[0][0])
+        else:
+            self._choice_turns(dialog, DialogStep.ASK_LOAN_OR_INVEST, SERVICE_INPUTS["loan"],
+                               DialogStep.ASK_INDIVIDUAL_OR_BUSINESS)
+            self._choice_turns(dialog, DialogStep.ASK_INDIVIDUAL_OR_BUSINESS, BORROWER_INPUTS[scenario], steps[0][0])
+
+        fixes = 0
+        while True:
+            if not self._field_turns(dialog, steps, confirm):
+                return dialog
+            if fixes >= self.MAX_FIXES or not self._chance(self.mix.fix_at_confirm):
+                break
+            dialog.turns.append(Turn(CONFIRM_NO, steps[0][0].value))
+            fixes += 1
+
+        dialog.turns.append(Turn(CONFIRM_YES, DialogStep.COMPLETED.value))
+        dialog.completed = True
+        return dialog
+
+    def generate_many(self, count: int) -> List[Dialog]:
+        return [self.generate() for _ in range(count)]
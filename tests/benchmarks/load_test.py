@@ -0,0 +1,239 @@
+"""
+Нагрузочный прогон сгенерированных диалогов.
+
+Диалоги из DialogGenerator отправляются в DialogStateManager напрямую
+или в HTTP API (локальный ASGI-клиент либо работающий сервер) с заданным
+числом параллельных пользователей. Каналы уведомлений заменены локальными
+заглушками; хранилища пишутся во временный каталог.
+
+Запуск:
+    python -m tests.benchmarks.load_test --dialogs 2000 --concurrency 8
+    python -m tests.benchmarks.load_test --driver http --dialogs 500
+    python -m tests.benchmarks.load_test --driver http --url http://localhost:8000
+"""
+import argparse
+import logging
+import resource
+import sys
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.core.config import settings
+from backend.core.dialog_manager import DialogStateManager, dialog_manager
+from backend.core.funnel import FunnelRecorder
+from backend.core.session_store import session_store
+from backend.core.transcripts import TranscriptLog
+from backend.db.funnel import FunnelStore
+from backend.db.repository import ApplicationRepository
+from backend.integrations.notification_service import NotificationService
+from tests.benchmarks.dialog_generator import Dialog, DialogGenerator, DialogMix
+
+
+class FakeSender:
+    """Заглушка канала доставки (Telegram или email): запоминает только счётчик."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def send_application(self, user_type: str, application_data: Dict[str, Any]) -> bool:
+        with self._lock:
+            self.sent += 1
+        return True
+
+
+class InProcessDriver:
+    """Сообщения напрямую в DialogStateManager."""
+
+    def __init__(self, manager: DialogStateManager):
+        self.manager = manager
+
+    def send(self, session_id: Optional[str], message: str, restart: bool = False) -> Tuple[str, str]:
+        if restart and session_id:
+            session_id = self.manager.reset_dialog(session_id)
+        result = self.manager.process_user_message(session_id or "", message)
+        return result["session_id"], result["step"]
+
+
+class HttpDriver:
+    """Сообщения через POST /api/v1/chat."""
+
+    def __init__(self, url: Optional[str] = None):
+        if url:
+            import httpx
+            self.client = httpx.Client(base_url=url, timeout=30)
+        else:
+            from fastapi.testclient import TestClient
+            from backend.main import app
+            self.client = TestClient(app)
+
+    def send(self, session_id: Optional[str], message: str, restart: bool = False) -> Tuple[str, str]:
+        payload = {"session_id": session_id, "message": message}
+        if restart:
+            payload["action"] = "restart"
+        response = self.client.post("/api/v1/chat", json=payload)
+        response.raise_for_status()
+        body = response.json()
+        return body["session_id"], body["step"]
+
+
+@dataclass
+class LoadReport:
+    """Итоги прогона."""
+    dialogs: int = 0
+    requests: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    mismatches: int = 0
+    failures: int = 0
+    completed: int = 0
+    abandoned: int = 0
+    notifications: int = 0
+    sessions_left: int = 0
+    rss_growth_mb: float = 0.0
+
+    def percentile(self, q: float) -> float:
+        """Перцентиль задержки в миллисекундах."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)] * 1000
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "dialogs": self.dialogs,
+            "requests": self.requests,
+            "requests_per_second": round(self.throughput, 1),
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "mismatches": self.mismatches,
+            "failures": self.failures,
+            "completed": self.completed,
+            "abandoned": self.abandoned,
+            "notifications": self.notifications,
+            "sessions_left": self.sessions_left,
+            "rss_growth_mb": round(self.rss_growth_mb, 1),
+        }
+
+
+def _rss_mb() -> float:
+    """Пиковый размер процесса в МБ (Linux: ru_maxrss в КБ)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+_report_lock = threading.Lock()
+
+
+def run_dialog(driver, dialog: Dialog, report: LoadReport):
+    """Проигрывает диалог и сверяет шаги ответов с ожидаемыми."""
+    session_id = None
+    latencies = []
+    mismatches = 0
+    failed = False
+
+    try:
+        for turn in dialog.turns:
+            started = time.perf_counter()
+            session_id, step = driver.send(session_id, turn.message, turn.restart)
+            latencies.append(time.perf_counter() - started)
+            if step != turn.expected_step:
+                mismatches += 1
+    except Exception:
+        failed = True
+
+    with _report_lock:
+        report.latencies.extend(latencies)
+        report.requests += len(latencies)
+        report.mismatches += mismatches
+        report.failures += failed
+
+
+def run_load(driver, dialogs: List[Dialog], concurrency: int = 1) -> LoadReport:
+    """Прогоняет диалоги с заданным числом параллельных пользователей."""
+    report = LoadReport(dialogs=len(dialogs))
+    report.completed = sum(dialog.completed for dialog in dialogs)
+    report.abandoned = sum(dialog.abandoned for dialog in dialogs)
+    sessions_before = len(session_store)
+    rss_before = _rss_mb()
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for dialog in dialogs:
+            run_dialog(driver, dialog, report)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda dialog: run_dialog(driver, dialog, report), dialogs))
+    report.elapsed = time.perf_counter() - started
+
+    report.sessions_left = len(session_store) - sessions_before
+    report.rss_growth_mb = _rss_mb() - rss_before
+    return report
+
+
+def isolate(manager: DialogStateManager, directory: str) -> FakeSender:
+    """
+    Подключает к менеджеру заглушки уведомлений и хранилища во временном каталоге.
+
+    Returns:
+        Заглушка Telegram (в ней счётчик отправленных заявок)
+    """
+    telegram = FakeSender()
+    manager._notification_service = NotificationService(telegram_sender=telegram, email_sender=FakeSender())
+
+    repository = ApplicationRepository(url=f"sqlite:///{os.path.join(directory, 'load.db')}")
+    manager._application_repository = repository
+    manager._funnel_recorder = FunnelRecorder(store=FunnelStore(repository))
+    manager._transcript_log = TranscriptLog(directory=os.path.join(directory, "transcripts"))
+    return telegram
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон диалогов")
+    parser.add_argument("--driver", choices=("inprocess", "http"), default="inprocess")
+    parser.add_argument("--url", help="Адрес работающего сервера (по умолчанию - локальный ASGI-клиент)")
+    parser.add_argument("--dialogs", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--invalid", type=float, default=DialogMix.invalid_input, help="Доля ошибок ввода")
+    parser.add_argument("--abandon", type=float, default=DialogMix.abandon, help="Вероятность ухода на шаге")
+    args = parser.parse_args()
+
+    # Логи на каждый запрос и заявку искажают замер
+    logging.disable(logging.INFO)
+
+    mix = DialogMix(invalid_input=args.invalid, abandon=args.abandon)
+    dialogs = DialogGenerator(mix, seed=args.seed).generate_many(args.dialogs)
+
+    with tempfile.TemporaryDirectory() as directory:
+        telegram = None
+        if not args.url:
+            telegram = isolate(dialog_manager, directory)
+            # Локальный клиент шлёт все запросы с одного адреса
+            settings.rate_limit_enabled = False
+
+        driver = InProcessDriver(dialog_manager) if args.driver == "inprocess" else HttpDriver(args.url)
+        report = run_load(driver, dialogs, args.concurrency)
+        if telegram is not None:
+            dialog_manager.close()
+            report.notifications = telegram.sent
+
+    for key, value in report.summary().items():
+        print(f"{key:22} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Запуск набора pytest-benchmark и сравнение с сохранённым результатом.
+
+Примеры:
+    python -m tests.benchmarks.run --save baseline
+    python -m tests.benchmarks.run --compare baseline --threshold 15
+    python -m tests.benchmarks.run --json results.json -k validators
+
+Результаты сохраняются в JSON в tests/benchmarks/results. В режиме
+сравнения прогон завершается с ошибкой, если медиана любого бенчмарка
+выросла больше чем на threshold процентов.
+"""
+import argparse
+import os
+import sys
+
+import pytest
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, "results")
+
+
+def build_args(args) -> list:
+    pytest_args = [
+        os.path.join(BENCHMARKS_DIR, "test_hot_paths.py"),
+        "-p", "no:cacheprovider",
+        "--benchmark-only",
+        f"--benchmark-storage=file://{RESULTS_DIR}",
+        "--benchmark-columns=min,median,mean,stddev,ops,rounds",
+        "--benchmark-sort=name",
+    ]
+    if args.save:
+        pytest_args.append(f"--benchmark-save={args.save}")
+    if args.compare is not None:
+        pytest_args.append(f"--benchmark-compare={args.compare}" if args.compare else "--benchmark-compare")
+        pytest_args.append(f"--benchmark-compare-fail=median:{args.threshold}%")
+    if args.json:
+        pytest_args.append(f"--benchmark-json={args.json}")
+    if args.k:
+        pytest_args += ["-k", args.k]
+    return pytest_args
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей")
+    parser.add_argument("--save", help="Сохранить результат под именем")
+    parser.add_argument("--compare", nargs="?", const="",
+                        help="Сравнить с сохранённым результатом (по умолчанию - с последним)")
+    parser.add_argument("--threshold", type=int, default=10,
+                        help="Допустимый рост медианы при сравнении, %% (1-99)")
+    parser.add_argument("--json", help="Записать результат в JSON-файл")
+    parser.add_argument("-k", help="Выбрать бенчмарки по выражению pytest -k")
+    args = parser.parse_args()
+    if not 1 <= args.threshold <= 99:
+        parser.error("--threshold: допустимо от 1 до 99 процентов")
+
+    return pytest.main(build_args(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
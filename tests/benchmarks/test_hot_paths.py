@@ -0,0 +1,178 @@
+"""
+Бенчмарки горячих путей (pytest-benchmark).
+
+Запуск и сравнение с сохранённым результатом - tests/benchmarks/run.py.
+Размеры хранилища сессий задаются BENCHMARK_SESSIONS
+(по умолчанию "10000,100000"; полный набор - "10000,100000,1000000").
+"""
+import sys
+import os
+import logging
+import subprocess
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import pytest
+
+from backend.core.application_formatter import ApplicationFormatter
+from backend.core.models import UserType
+from backend.core.scenario_manager import DialogStep, scenario_manager
+from backend.core.session_store import SessionStore
+from backend.core.validators import DataValidators
+from tests.benchmarks.dialog_generator import FIELD_VALUES, SCENARIOS
+
+SESSION_COUNTS = [int(count) for count in os.environ.get("BENCHMARK_SESSIONS", "10000,100000").split(",")]
+
+APPLICATIONS = {
+    "individual": {
+        "name": "Иван Иванов", "collateral": "Toyota Camry, 2020 год", "amount": 1_000_000,
+        "purpose": "развитие бизнеса", "phone": "+79123456789", "session_id": "bench",
+    },
+    "business": {
+        "company_name": "ООО «ТехноПром»", "amount": 5_000_000, "collateral": "Станки",
+        "purpose": "развитие производства", "phone": "+79123456789", "session_id": "bench",
+    },
+    "investor": {
+        "name": "Анна", "investment_amount": 3_000_000, "term_months": 12,
+        "investment_goal": "пассивный доход", "phone": "+79123456789", "session_id": "bench",
+    },
+}
+
+
+def _step_cases():
+    """(шаг, ввод, данные сессии) для каждого шага диалога."""
+    cases = [
+        (DialogStep.WELCOME, "", {}),
+        (DialogStep.ASK_LOAN_OR_INVEST, "хочу взять займ", {}),
+        (DialogStep.ASK_INDIVIDUAL_OR_BUSINESS, "Физическое лицо", {}),
+    ]
+    for user_type, (steps, confirm) in SCENARIOS.items():
+        data = dict(APPLICATIONS[user_type], user_type=UserType(user_type))
+        for step, field, _ in steps:
+            cases.append((step, FIELD_VALUES[field][0][0], data))
+        cases.append((confirm, "Да, отправить", data))
+    return cases
+
+
+STEP_CASES = _step_cases()
+
+
+@pytest.mark.parametrize("step, user_input, data", STEP_CASES, ids=[case[0].value for case in STEP_CASES])
+def test_get_next_step(benchmark, step, user_input, data):
+    next_step, _ = benchmark(scenario_manager.get_next_step, step, user_input, dict(data))
+    assert next_step != DialogStep.ERROR
+
+
+VALIDATOR_CASES = [
+    ("validate_phone", "+7 (912) 345-67-89"),
+    ("validate_amount", "1 500 000"),
+    ("validate_amount", "2.5 млн"),
+    ("validate_name", "Анна-Мария Петрова"),
+    ("validate_term_months", "18 мес."),
+    ("validate_company_name", "ИП Иванов Игорь"),
+]
+
+
+@pytest.mark.parametrize("method, value", VALIDATOR_CASES, ids=[f"{m}-{v}" for m, v in VALIDATOR_CASES])
+def test_validators(benchmark, method, value):
+    is_valid, _ = benchmark(getattr(DataValidators, method), value)
+    assert is_valid
+
+
+@pytest.mark.parametrize("user_type", list(APPLICATIONS))
+def test_format_application(benchmark, user_type):
+    assert benchmark(ApplicationFormatter.format_application, user_type, APPLICATIONS[user_type])
+
+
+@pytest.mark.parametrize("user_type", list(APPLICATIONS))
+def test_create_html_email(benchmark, user_type):
+    from backend.integrations.email_sender import EmailSender
+
+    sender = EmailSender()
+    assert "<html>" in benchmark(sender._create_html_email, user_type, APPLICATIONS[user_type])
+
+
+@pytest.fixture(scope="module", params=SESSION_COUNTS, ids=lambda count: f"{count}_sessions")
+def filled_store(request):
+    """Хранилище с заданным числом сессий (заполняется один раз на модуль)."""
+    store = SessionStore()
+    for _ in range(request.param):
+        store.create_session()
+    return store
+
+
+def test_session_create(benchmark, filled_store):
+    created = []
+
+    def create():
+        created.append(filled_store.create_session())
+
+    benchmark(create)
+    for session_id in created:
+        filled_store.delete_session(session_id)
+
+
+def test_session_get(benchmark, filled_store):
+    session_id = next(iter(filled_store.sessions))
+    assert benchmark(filled_store.get_session, session_id) is not None
+
+
+def test_session_update(benchmark, filled_store):
+    session_id = next(iter(filled_store.sessions))
+    benchmark(filled_store.update_session, session_id,
+              {"current_step": "individual_ask_amount", "collected_data": {"name": "Иван"}})
+
+
+def test_session_cleanup(benchmark, filled_store):
+    benchmark.pedantic(filled_store.cleanup_expired, rounds=5, iterations=1)
+
+
+@pytest.fixture(scope="module")
+def chat_client(tmp_path_factory):
+    """ASGI-клиент с заглушками уведомлений и хранилищами во временном каталоге."""
+    from fastapi.testclient import TestClient
+    from backend.core.config import settings
+    from backend.core.dialog_manager import dialog_manager
+    from backend.main import app
+    from tests.benchmarks.load_test import isolate
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    isolate(dialog_manager, str(tmp_path_factory.mktemp("chat")))
+    # Все запросы идут с одного адреса
+    enabled, settings.rate_limit_enabled = settings.rate_limit_enabled, False
+    yield TestClient(app)
+    settings.rate_limit_enabled = enabled
+    dialog_manager.close(timeout=10)
+
+
+DIALOG = [
+    "", "Займ", "Физическое лицо", "Иван Иванов", "Toyota Camry, 2020 год",
+    "1000000", "развитие бизнеса", "89123456789", "Да, отправить заявку",
+]
+
+
+def test_chat_round_trip(benchmark, chat_client):
+    """Один запрос /api/v1/chat (начало диалога)."""
+    response = benchmark(chat_client.post, "/api/v1/chat", json={"message": ""})
+    assert response.status_code == 200
+
+
+def test_chat_full_dialog(benchmark, chat_client):
+    """Полный диалог физического лица: 9 запросов /api/v1/chat."""
+
+    def dialog():
+        session_id = None
+        for message in DIALOG:
+            session_id = chat_client.post("/api/v1/chat", json={"session_id": session_id,
+                                                                "message": message}).json()["session_id"]
+
+    benchmark(dialog)
+
+
+@pytest.mark.parametrize("module", ["backend.main", "backend.core.config", "backend.integrations"])
+def test_cold_import(benchmark, module):
+    """Импорт точки входа в новом процессе (подробный отчёт - bench_import.py)."""
+    root = os.path.join(os.path.dirname(__file__), '..', '..')
+    benchmark.pedantic(subprocess.run, args=([sys.executable, "-c", f"import {module}"],),
+                       kwargs={"cwd": root, "check": True}, rounds=5, iterations=1)
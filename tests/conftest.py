@@ -0,0 +1,41 @@
+"""
+Общие фикстуры тестов.
+"""
+import sys
+import os
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from backend.core.config import get_settings, settings
+from backend.db.repository import application_repository
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_data(tmp_path_factory):
+    """
+    База заявок, журнал переписки и индекс базы знаний - во временном
+    каталоге: тесты не трогают рабочие данные в ./database.
+    """
+    directory = tmp_path_factory.mktemp("data")
+    values = {
+        "database_url": f"sqlite:///{directory / 'bbk_ai.db'}",
+        "transcripts_dir": str(directory / "transcripts"),
+        "faq_index_path": str(directory / "faq_index.json"),
+    }
+
+    patch = pytest.MonkeyPatch()
+    for name, value in values.items():
+        patch.setenv(name.upper(), value)
+    get_settings.cache_clear()
+    # Модули держат ссылку на объект settings, созданный при импорте
+    for name, value in values.items():
+        patch.setattr(settings, name, value)
+    patch.setattr(application_repository, "url", values["database_url"])
+
+    yield directory
+
+    patch.undo()
+    get_settings.cache_clear()
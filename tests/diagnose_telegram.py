@@ -19,6 +19,7 @@ load_dotenv()
 
 TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org').rstrip('/')
 
 if TOKEN:
     print(f"✅ TELEGRAM_BOT_TOKEN: {TOKEN[:10]}... (длина: {len(TOKEN)})")
@@ -46,7 +47,7 @@ if TOKEN:
 # 4. Проверка бота через API getMe
 print("\n4. Проверка бота через API getMe...")
 if TOKEN:
-    url = f'https://api.telegram.org/bot{TOKEN}/getMe'
+    url = f'{API_URL}/bot{TOKEN}/getMe'
     try:
         response = requests.get(url, timeout=10)
         if response.status_code == 200:
@@ -76,7 +77,7 @@ if TOKEN:
 # 5. Проверка канала через getUpdates
 print("\n5. Проверка обновлений (getUpdates)...")
 if TOKEN:
-    url = f'https://api.telegram.org/bot{TOKEN}/getUpdates'
+    url = f'{API_URL}/bot{TOKEN}/getUpdates'
     try:
         response = requests.get(url, timeout=10)
         if response.status_code == 200:
@@ -105,7 +106,7 @@ if TOKEN:
 # 6. Попытка отправки с отладкой
 print("\n6. Попытка отправки сообщения...")
 if TOKEN and CHAT_ID:
-    url = f'https://api.telegram.org/bot{TOKEN}/sendMessage'
+    url = f'{API_URL}/bot{TOKEN}/sendMessage'
 
     # Пробуем разные форматы chat_id
     chat_ids_to_try = [CHAT_ID]
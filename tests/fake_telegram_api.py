@@ -0,0 +1,232 @@
+"""
+Локальная заглушка Telegram Bot API для интеграционных и нагрузочных тестов.
+
+Реализует getMe и sendMessage с настраиваемой задержкой, долей ошибок
+и ответами 429 (Too Many Requests). Отправленные сообщения сохраняются
+в памяти. Чтобы приложение отправляло заявки сюда, укажите адрес в
+настройке TELEGRAM_API_URL.
+
+Запуск:
+    python -m tests.fake_telegram_api --port 8081 --latency 0.05 --error-rate 0.1 --rate-limit 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+@dataclass
+class FakeTelegramConfig:
+    """Поведение заглушки. Вероятности от 0 до 1."""
+    token: Optional[str] = None     # None - принимается любой токен
+    latency: float = 0.0            # задержка ответа, секунды
+    jitter: float = 0.0             # случайная добавка к задержке, секунды
+    error_rate: float = 0.0         # доля ответов 500
+    rate_limit: float = 0.0         # доля ответов 429
+    retry_after: int = 1            # retry_after в ответах 429, секунды
+    seed: Optional[int] = None
+
+
+@dataclass
+class FakeTelegramStats:
+    """Счётчики запросов по исходам."""
+    requests: int = 0
+    sent: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class FakeTelegramAPI:
+    """
+    HTTP-сервер с подмножеством Telegram Bot API в фоновом потоке.
+
+    Пример:
+        with FakeTelegramAPI(FakeTelegramConfig(rate_limit=0.1)) as api:
+            sender = TelegramSender("123:abc", "42", api_url=api.url)
+    """
+
+    BOT = {"id": 1000000001, "is_bot": True, "first_name": "BBKinvest Test", "username": "bbk_fake_bot"}
+
+    def __init__(self, config: Optional[FakeTelegramConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeTelegramConfig()
+        self.stats = FakeTelegramStats()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._message_id = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Адрес для настройки TELEGRAM_API_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTelegramAPI":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="fake-telegram", daemon=True)
+            self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Обслуживает запросы в текущем потоке (до KeyboardInterrupt)."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeTelegramAPI":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # --- Обработка запросов ---
+
+    def handle(self, path: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Ответ на вызов метода: (HTTP-статус, тело ответа)."""
+        token, _, method = path.lstrip("/").partition("/")
+        if not token.startswith("bot") or not method:
+            return 404, _error(404, "Not Found")
+
+        with self._lock:
+            self.stats.requests += 1
+            roll = self._random.random()
+            delay = self.config.latency + self._random.random() * self.config.jitter
+
+        if delay:
+            time.sleep(delay)
+
+        if self.config.token is not None and token[3:] != self.config.token:
+            return 401, _error(401, "Unauthorized")
+
+        if roll < self.config.rate_limit:
+            with self._lock:
+                self.stats.rate_limited += 1
+            retry_after = self.config.retry_after
+            body = _error(429, f"Too Many Requests: retry after {retry_after}")
+            body["parameters"] = {"retry_after": retry_after}
+            return 429, body
+
+        if roll < self.config.rate_limit + self.config.error_rate:
+            with self._lock:
+                self.stats.errors += 1
+            return 500, _error(500, "Internal Server Error")
+
+        if method == "getMe":
+            return 200, {"ok": True, "result": dict(self.BOT)}
+        if method == "sendMessage":
+            return self._send_message(params)
+        return 404, _error(404, "Not Found: method not found")
+
+    def _send_message(self, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        chat_id, text = params.get("chat_id"), params.get("text")
+        if not chat_id:
+            return 400, _error(400, "Bad Request: chat not found")
+        if not text:
+            return 400, _error(400, "Bad Request: message text is empty")
+
+        with self._lock:
+            self._message_id += 1
+            message = {
+                "message_id": self._message_id,
+                "from": dict(self.BOT),
+                "chat": {"id": chat_id, "type": "private"},
+                "date": int(time.time()),
+                "text": text,
+            }
+            self.stats.sent += 1
+            self.stats.messages.append(message)
+        return 200, {"ok": True, "result": message}
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._respond()
+
+            def do_POST(self):
+                self._respond()
+
+            def _respond(self):
+                parts = urlsplit(self.path)
+                params: Dict[str, Any] = dict(parse_qsl(parts.query))
+                params.update(self._read_body())
+
+                status, body = api.handle(parts.path, params)
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if status == 429:
+                    self.send_header("Retry-After", str(body["parameters"]["retry_after"]))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_body(self) -> Dict[str, Any]:
+                length = int(self.headers.get("Content-Length") or 0)
+                if not length:
+                    return {}
+                raw = self.rfile.read(length)
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    try:
+                        return json.loads(raw)
+                    except ValueError:
+                        return {}
+                return dict(parse_qsl(raw.decode("utf-8")))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _error(code: int, description: str) -> Dict[str, Any]:
+    return {"ok": False, "error_code": code, "description": description}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заглушка Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--token", help="Принимать только этот токен бота")
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа, секунды")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке, секунды")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Доля ответов 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = FakeTelegramConfig(token=args.token, latency=args.latency, jitter=args.jitter,
+                                error_rate=args.error_rate, rate_limit=args.rate_limit,
+                                retry_after=args.retry_after, seed=args.seed)
+    api = FakeTelegramAPI(config, args.host, args.port)
+    print(f"Заглушка Telegram Bot API: {api.url} (TELEGRAM_API_URL={api.url})")
+    api.serve_forever()
+
+    stats = api.stats
+    print(f"Запросов: {stats.requests}, отправлено: {stats.sent}, ошибок: {stats.errors}, 429: {stats.rate_limited}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Тесты админ-API заявок.
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.admin import get_repository
+from backend.core.config import settings
+from backend.db.repository import ApplicationRepository, application_row
+from backend.main import app
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = ApplicationRepository(url=f"sqlite:///{tmp_path / 'admin.db'}")
+    assert repository.wait_ready()
+
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(25):
+        user_type = 'investor' if i % 5 == 0 else 'individual'
+        data = {'name': 'Иван', 'phone': f'8912{i:07d}', 'session_id': f's{i}'}
+        data['investment_amount' if user_type == 'investor' else 'amount'] = 100_000 * (i + 1)
+        # Каждые две заявки с одинаковым временем - проверка сортировки по id
+        rows.append(application_row(user_type, data, created_at=start + timedelta(minutes=i // 2)))
+    repository.bulk_insert(rows)
+
+    yield repository
+    repository.close(timeout=5)
+
+
+@pytest.fixture
+def client(repository, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", TOKEN)
+    app.dependency_overrides[get_repository] = lambda: repository
+    yield TestClient(app, headers={"X-Admin-Token": TOKEN})
+    app.dependency_overrides.clear()
+
+
+def test_cursor_walks_all_rows(client):
+    """Курсор проходит по всем заявкам без пропусков и повторов."""
+    session_ids = []
+    cursor = None
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/v1/admin/applications", params=params).json()
+        session_ids += [item["session_id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(session_ids) == 25
+    assert len(set(session_ids)) == 25
+    assert session_ids[0] == 's24'
+    assert body["count_estimate"] == {"value": 25, "exact": True}
+
+
+def test_filters(client):
+    """Фильтры по типу и сумме."""
+    body = client.get("/api/v1/admin/applications", params={"user_type": "investor"}).json()
+    assert [item["session_id"] for item in body["items"]] == ['s20', 's15', 's10', 's5', 's0']
+    assert body["count_estimate"]["value"] == 5
+
+    body = client.get("/api/v1/admin/applications",
+                      params={"amount_min": 1_000_000, "amount_max": 1_500_000}).json()
+    assert {item["amount"] for item in body["items"]} == {100_000 * i for i in range(10, 16)}
+
+    body = client.get("/api/v1/admin/applications",
+                      params={"created_from": "2024-01-01T00:10:00"}).json()
+    assert len(body["items"]) == 5
+
+
+def test_invalid_cursor(client):
+    response = client.get("/api/v1/admin/applications", params={"cursor": "не-курсор"})
+    assert response.status_code == 400
+
+
+def test_requires_token(client, monkeypatch):
+    """Без правильного токена доступ запрещён."""
+    assert client.get("/api/v1/admin/applications", headers={"X-Admin-Token": "wrong"}).status_code == 401
+
+    monkeypatch.setattr(settings, "admin_token", "")
+    assert client.get("/api/v1/admin/applications").status_code == 403
@@ -0,0 +1,60 @@
+"""
+Тесты быстрой сериализации ответов /api/v1/chat.
+"""
+import json
+import sys
+import os
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.api.endpoints import ChatResponse
+from backend.api.responses import ChatJSONResponse
+from backend.core.scenario_manager import scenario_manager, DialogStep
+
+
+def _decode(model: ChatResponse) -> dict:
+    return json.loads(ChatJSONResponse(model).body)
+
+
+def test_static_step_matches_model_dump():
+    """Предсериализованный ответ совпадает с обычной сериализацией модели."""
+    model = ChatResponse(
+        message=scenario_manager.get_message(DialogStep.ASK_LOAN_OR_INVEST),
+        options=scenario_manager.get_options(DialogStep.ASK_LOAN_OR_INVEST),
+        session_id="session-1",
+        step=DialogStep.ASK_LOAN_OR_INVEST.value,
+    )
+    assert _decode(model) == model.model_dump()
+
+
+def test_dynamic_message_matches_model_dump():
+    """Сообщения с ошибкой и шаблонные сообщения сериализуются без кэша."""
+    model = ChatResponse(
+        message='❌ Ошибка "кавычки"\n\nВведите номер телефона для связи:',
+        options=[],
+        session_id="session-2",
+        step=DialogStep.INDIVIDUAL_ASK_PHONE.value,
+        completed=True,
+    )
+    assert _decode(model) == model.model_dump()
+
+
+def test_chat_endpoint_returns_json():
+    """Эндпоинт отдаёт корректный JSON через быстрый путь."""
+    client = TestClient(app)
+
+    response = client.post("/api/v1/chat", json={"message": ""})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+
+    data = response.json()
+    assert data["step"] == DialogStep.ASK_LOAN_OR_INVEST.value
+    assert data["options"] == ["Займ", "Инвестировать"]
+    assert data["completed"] is False
+
+    response = client.post("/api/v1/chat", json={"session_id": data["session_id"], "message": "Займ"})
+    assert response.json()["step"] == DialogStep.ASK_INDIVIDUAL_OR_BUSINESS.value
@@ -0,0 +1,62 @@
+"""
+Тесты репозитория заявок.
+"""
+import sys
+import os
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import func, inspect, select
+
+from backend.db.models import Application
+from backend.db.repository import ApplicationRepository, application_row
+from backend.db.session import get_engine
+
+
+def make_repository(tmp_path, **kwargs) -> ApplicationRepository:
+    return ApplicationRepository(url=f"sqlite:///{tmp_path / 'test.db'}", **kwargs)
+
+
+def test_migration_creates_indexes(tmp_path):
+    """Миграция создаёт таблицу и индексы."""
+    repository = make_repository(tmp_path)
+    assert repository.wait_ready()
+
+    indexes = {index['name'] for index in inspect(get_engine(repository.url)).get_indexes('applications')}
+    assert {'ix_applications_created_at_id', 'ix_applications_user_type_created_at_id',
+            'ix_applications_phone', 'ix_applications_amount'} <= indexes
+    repository.close(timeout=5)
+
+
+def test_write_behind_batches(tmp_path):
+    """Заявки из очереди записываются пачками и не теряются."""
+    repository = make_repository(tmp_path, batch_size=50, flush_interval=0.05)
+
+    for i in range(120):
+        assert repository.add('individual', {
+            'name': 'Иван', 'amount': 1_000_000 + i, 'phone': f'8912{i:07d}', 'session_id': f's{i}',
+        })
+
+    assert repository.flush(timeout=10)
+
+    with repository.session() as session:
+        assert session.scalar(select(func.count()).select_from(Application)) == 120
+        first = session.scalars(select(Application).where(Application.session_id == 's0')).one()
+
+    assert first.phone == '+79120000000'
+    assert first.amount == 1_000_000
+    assert first.data['name'] == 'Иван'
+    assert repository.close(timeout=5)
+
+
+def test_application_row_maps_investor_fields():
+    """Поля инвестора раскладываются по общим колонкам."""
+    row = application_row('investor', {
+        'name': 'Анна', 'investment_amount': 3_000_000, 'term_months': 12,
+        'investment_goal': 'пассивный доход', 'phone': '+79123456789', 'session_id': 'inv',
+    })
+    assert row['amount'] == 3_000_000
+    assert row['term_months'] == 12
+    assert row['purpose'] == 'пассивный доход'
+    assert 'session_id' not in row['data']
@@ -0,0 +1,82 @@
+"""
+Тесты компилируемых шаблонов заявок.
+"""
+import sys
+import os
+
+import pytest
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.core.application_formatter import ApplicationFormatter
+from backend.core.application_templates import ApplicationTemplates, TimestampClock, OUTPUT_FORMATS
+
+INDIVIDUAL = {
+    'name': 'Иван <script>',
+    'collateral': 'Kia & Hyundai',
+    'amount': 1500000,
+    'purpose': 'ремонт',
+    'phone': '+79123456789',
+    'session_id': 'session-1',
+}
+
+
+def test_telegram_format_escapes_html():
+    """Значения экранируются для parse_mode: HTML."""
+    text = ApplicationFormatter.format_application('individual', INDIVIDUAL)
+    assert 'Иван &lt;script&gt;' in text
+    assert 'Kia &amp; Hyundai' in text
+    assert '💰 Сумма: 1,500,000 руб.' in text
+    assert text.endswith('🔗 ID сессии: session-1')
+
+
+def test_plain_and_compact_formats_are_not_escaped():
+    """Текст письма и компактный формат не содержат HTML-сущностей."""
+    plain = ApplicationFormatter.format_application('individual', INDIVIDUAL, 'plain')
+    assert 'Иван <script>' in plain
+
+    compact = ApplicationFormatter.create_compact_format('individual', INDIVIDUAL)
+    assert compact.splitlines() == [
+        'Имя: Иван <script>',
+        'Залог: Kia & Hyundai',
+        'Сумма: 1500000',
+        'Цель займа: ремонт',
+        'Телефон: +79123456789',
+    ]
+
+
+def test_email_html_escapes_values():
+    """HTML письма экранирует данные пользователя."""
+    html = ApplicationFormatter.format_application('individual', INDIVIDUAL, 'email_html')
+    assert '<script>' not in html
+    assert 'Иван &lt;script&gt;' in html
+
+
+def test_duplicate_flag_is_rendered():
+    """Пометка повторной заявки попадает в Telegram-формат."""
+    data = dict(INDIVIDUAL, duplicate_of='session-0')
+    text = ApplicationFormatter.format_application('individual', data)
+    assert text.startswith('⚠️ ПОВТОРНАЯ ЗАЯВКА (предыдущая сессия: session-0)')
+
+
+def test_batch_uses_shared_timestamp():
+    """Пачка заявок рендерится с одной отметкой времени."""
+    applications = [('individual', INDIVIDUAL), ('investor', {'name': 'Анна', 'term_months': 12})]
+    rendered = ApplicationFormatter.format_batch(applications)
+
+    assert len(rendered) == 2
+    assert rendered[0].splitlines()[1] == rendered[1].splitlines()[1]
+    assert '12 месяцев' in rendered[1]
+
+
+def test_all_renderers_compile():
+    """Все пары (тип, формат) компилируются, неизвестные отклоняются."""
+    templates = ApplicationTemplates(clock=TimestampClock())
+    templates.compile_all()
+    assert len(templates._renderers) == 3 * len(OUTPUT_FORMATS)
+
+    with pytest.raises(ValueError):
+        templates.render('unknown', {})
+    with pytest.raises(ValueError):
+        templates.render('individual', {}, 'markdown')
@@ -0,0 +1,125 @@
+"""
+Тесты потоковой выгрузки заявок.
+"""
+import sys
+import os
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import cli
+from backend.api.admin import get_repository
+from backend.core.config import settings
+from backend.db.export import export_applications
+from backend.db.repository import ApplicationFilter, ApplicationRepository, application_row
+from backend.main import app
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = ApplicationRepository(url=f"sqlite:///{tmp_path / 'export.db'}")
+    assert repository.wait_ready()
+
+    start = datetime(2024, 1, 1)
+    repository.bulk_insert([
+        application_row('business' if i % 2 else 'individual', {
+            'name': 'Иван, "Петров"', 'company_name': 'ООО Ромашка', 'amount': 1_000_000 + i,
+            'phone': f'8912{i:07d}', 'session_id': f's{i}', 'purpose': 'строка\nс переносом',
+        }, created_at=start + timedelta(minutes=i))
+        for i in range(30)
+    ])
+
+    yield repository
+    repository.close(timeout=5)
+
+
+def read_export(chunks) -> str:
+    return b"".join(chunks).decode("utf-8")
+
+
+def test_csv_export(repository):
+    """CSV с заголовком, от старых к новым, с экранированием."""
+    rows = list(csv.DictReader(io.StringIO(read_export(
+        export_applications(repository, "csv", chunk_size=7)))))
+
+    assert len(rows) == 30
+    assert [row['session_id'] for row in rows[:3]] == ['s0', 's1', 's2']
+    assert rows[0]['name'] == 'Иван, "Петров"'
+    assert rows[0]['purpose'] == 'строка\nс переносом'
+    assert rows[0]['phone'] == '+79120000000'
+    assert rows[0]['created_at'] == '2024-01-01T00:00:00'
+
+
+def test_csv_export_escapes_formulas(tmp_path):
+    """Текст, который табличный редактор выполнил бы как формулу, экранируется."""
+    repository = ApplicationRepository(url=f"sqlite:///{tmp_path / 'formulas.db'}")
+    assert repository.wait_ready()
+    repository.bulk_insert([application_row('business', {
+        'name': '=HYPERLINK("http://evil","x")', 'company_name': '@SUM(A1)', 'purpose': '-1+cmd|calc',
+        'collateral': '\tтекст', 'phone': '+79120000000', 'session_id': 'f0', 'amount': 5_000_000,
+    }, created_at=datetime(2024, 1, 1))])
+    try:
+        row = next(csv.DictReader(io.StringIO(read_export(export_applications(repository, "csv")))))
+    finally:
+        repository.close(timeout=5)
+
+    assert row['name'] == '\'=HYPERLINK("http://evil","x")'
+    assert row['company_name'] == "'@SUM(A1)"
+    assert row['purpose'] == "'-1+cmd|calc"
+    assert row['collateral'] == "'\tтекст"
+    assert row['phone'] == '+79120000000'
+    assert row['amount'] == '5000000'
+
+
+def test_jsonl_export_with_data_and_filter(repository):
+    """JSON Lines с данными диалога и фильтром по типу."""
+    lines = read_export(export_applications(
+        repository, "jsonl", ApplicationFilter(user_type='business'), chunk_size=4, include_data=True
+    )).splitlines()
+
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 15
+    assert all(record['user_type'] == 'business' for record in records)
+    assert records[0]['amount'] == 1_000_001
+    assert records[0]['data']['company_name'] == 'ООО Ромашка'
+    assert records[0]['created_at'].startswith('2024-01-01T00:01:00')
+
+
+def test_unknown_format(repository):
+    with pytest.raises(ValueError):
+        export_applications(repository, "xml")
+
+
+def test_export_endpoint(repository, monkeypatch):
+    """Эндпоинт отдаёт выгрузку потоком как вложение."""
+    monkeypatch.setattr(settings, "admin_token", TOKEN)
+    app.dependency_overrides[get_repository] = lambda: repository
+    try:
+        client = TestClient(app, headers={"X-Admin-Token": TOKEN})
+        response = client.get("/api/v1/admin/export/applications",
+                              params={"format": "jsonl", "created_from": "2024-01-01T00:20:00"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "attachment" in response.headers["content-disposition"]
+    assert len(response.text.splitlines()) == 10
+
+
+def test_cli_export(repository, tmp_path):
+    output = tmp_path / "leads.csv"
+    assert cli.main(["export", "--format", "csv", "--output", str(output),
+                     "--database-url", repository.url, "--user-type", "individual"]) == 0
+
+    with open(output, encoding="utf-8", newline="") as file:
+        assert len(list(csv.DictReader(file))) == 15
@@ -0,0 +1,91 @@
+"""
+Тесты отправки в Telegram через локальную заглушку Bot API.
+"""
+import sys
+import os
+
+import pytest
+import requests
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.integrations.telegram_sender import TelegramSender
+from tests.fake_telegram_api import FakeTelegramAPI, FakeTelegramConfig
+
+APPLICATION = {
+    'name': 'Иван Иванов',
+    'collateral': 'Toyota Camry 2020',
+    'amount': 1000000,
+    'purpose': 'развитие бизнеса',
+    'phone': '89123456789',
+    'session_id': 'fake_api_session',
+}
+
+
+@pytest.fixture
+def fake_api():
+    with FakeTelegramAPI(FakeTelegramConfig(token="123:abc", seed=1)) as api:
+        yield api
+
+
+def test_send_application(fake_api):
+    """Заявка доходит до заглушки в формате HTML."""
+    sender = TelegramSender("123:abc", "42", api_url=fake_api.url)
+
+    assert sender.send_application('individual', APPLICATION) is True
+    assert fake_api.stats.sent == 1
+    message = fake_api.stats.messages[0]
+    assert message['chat']['id'] == "42"
+    assert 'Иван Иванов' in message['text']
+
+
+def test_get_bot_info(fake_api):
+    sender = TelegramSender("123:abc", "42", api_url=fake_api.url + "/")
+
+    info = sender.get_bot_info()
+    assert info['ok'] is True
+    assert info['result']['is_bot'] is True
+
+
+def test_wrong_token(fake_api):
+    sender = TelegramSender("999:wrong", "42", api_url=fake_api.url)
+
+    assert sender.send_test_message() is False
+    assert fake_api.stats.sent == 0
+
+
+def test_rate_limit():
+    """Ответ 429 с retry_after, отправка считается неудачной."""
+    with FakeTelegramAPI(FakeTelegramConfig(rate_limit=1.0, retry_after=7)) as api:
+        response = requests.post(f"{api.url}/bot1:x/sendMessage", json={'chat_id': 1, 'text': 'hi'})
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '7'
+        assert response.json()['parameters']['retry_after'] == 7
+
+        sender = TelegramSender("1:x", "42", api_url=api.url)
+        assert sender.send_application('individual', APPLICATION) is False
+        assert api.stats.rate_limited == 2
+        assert api.stats.sent == 0
+
+
+def test_error_rate_is_reproducible():
+    """Доля ошибок задаётся вероятностью, seed делает прогон повторяемым."""
+    outcomes = []
+    for _ in range(2):
+        with FakeTelegramAPI(FakeTelegramConfig(error_rate=0.5, seed=7)) as api:
+            sender = TelegramSender("1:x", "42", api_url=api.url)
+            outcomes.append([sender.send_test_message() for _ in range(20)])
+            assert api.stats.errors + api.stats.sent == 20
+
+    assert outcomes[0] == outcomes[1]
+    assert 0 < outcomes[0].count(True) < 20
+
+
+def test_form_encoded_request(fake_api):
+    """Диагностические скрипты отправляют форму, а не JSON."""
+    response = requests.post(f"{fake_api.url}/bot123:abc/sendMessage", data={'chat_id': '42', 'text': 'тест'})
+    assert response.json()['result']['text'] == 'тест'
+
+    response = requests.post(f"{fake_api.url}/bot123:abc/sendMessage", data={'chat_id': '42'})
+    assert response.status_code == 400
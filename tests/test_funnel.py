@@ -0,0 +1,111 @@
+"""
+Тесты воронки диалога.
+"""
+import sys
+import os
+from unittest.mock import Mock
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+
+from backend.api.admin import get_funnel_recorder
+from backend.core.config import settings
+from backend.core.dialog_manager import DialogStateManager
+from backend.core.funnel import ADVANCED, ENTERED, ERROR, FunnelRecorder
+from backend.db.funnel import FunnelStore
+from backend.db.repository import ApplicationRepository
+from backend.main import app
+
+
+def step_row(report, scenario, step):
+    return next(row for row in report["scenarios"][scenario] if row["step"] == step)
+
+
+def test_dialog_updates_funnel():
+    """Прохождение сценария увеличивает счётчики шагов и ошибок."""
+    manager = DialogStateManager()
+    manager._notification_service = Mock()
+    manager._application_repository = Mock()
+    manager._funnel_recorder = FunnelRecorder()
+
+    session_id = manager.process_user_message("", "")["session_id"]
+    for message in ["Займ", "Физическое лицо", "Иван", "Kia Sportage, 2021",
+                    "сто рублей", "1000000", "личные нужды", "89123456789", "Да"]:
+        session_id = manager.process_user_message(session_id, message)["session_id"]
+
+    # Вторая сессия бросает диалог на выборе услуги
+    manager.process_user_message("", "")
+
+    report = manager.funnel_recorder.report()
+    assert step_row(report, "common", "welcome")["entered"] == 2
+    assert step_row(report, "common", "ask_loan_or_invest")["dropped"] == 1
+
+    amount = step_row(report, "individual", "individual_ask_amount")
+    assert amount["entered"] == 1
+    assert amount["errors"] == 1
+    assert amount["advanced"] == 1
+    assert amount["conversion"] == 1.0
+    assert report["completed"] == 1
+
+
+def test_restarts_are_events_and_conversion_is_capped():
+    """Повторный проход шагов увеличивает счётчики, но доля не превышает 1."""
+    recorder = FunnelRecorder()
+    recorder.record("individual_ask_name", ENTERED)
+    recorder.transition("individual_ask_name", "individual_ask_collateral")
+    # Заполнение заново с шага залога (или сессия, начатая до окна отчёта)
+    recorder.transition("individual_confirm", "individual_ask_collateral", restarted=True)
+
+    report = recorder.report()
+    collateral = step_row(report, "individual", "individual_ask_collateral")
+    assert collateral["entered"] == 2
+    assert collateral["conversion"] == 1.0
+    assert step_row(report, "individual", "individual_confirm")["restarted"] == 1
+
+
+def test_report_window():
+    """Отчёт за последние часы учитывает только свежие интервалы."""
+    recorder = FunnelRecorder(bucket_minutes=60, memory_hours=24)
+    recorder.record("welcome", ENTERED, now=0)
+    recorder.record("welcome", ENTERED, now=10 * 3600)
+    recorder.record("welcome", ENTERED, now=30 * 3600)
+
+    assert recorder.counters(now=30 * 3600)[("welcome", ENTERED)] == 3
+    assert recorder.counters(hours=1, now=30 * 3600)[("welcome", ENTERED)] == 1
+    assert recorder.counters(hours=24, now=30 * 3600)[("welcome", ENTERED)] == 2
+    # Интервалы старше memory_hours вытеснены из памяти, итоги - нет
+    assert recorder.counters(hours=48, now=30 * 3600)[("welcome", ENTERED)] == 2
+
+
+def test_counters_survive_restart(tmp_path):
+    """Приращения дописываются в базу и загружаются новым экземпляром."""
+    store = FunnelStore(ApplicationRepository(url=f"sqlite:///{tmp_path / 'funnel.db'}"))
+
+    recorder = FunnelRecorder(store=store)
+    recorder.transition("welcome", "ask_loan_or_invest", now=3600)
+    recorder.record("ask_loan_or_invest", ERROR, now=3600)
+    assert recorder.flush()
+    recorder.record("ask_loan_or_invest", ERROR, now=3700)
+    recorder.close()
+
+    restored = FunnelRecorder(store=store).counters()
+    assert restored[("welcome", ADVANCED)] == 1
+    assert restored[("ask_loan_or_invest", ENTERED)] == 1
+    assert restored[("ask_loan_or_invest", ERROR)] == 2
+
+
+def test_funnel_endpoint(monkeypatch):
+    recorder = FunnelRecorder()
+    recorder.record("welcome", ENTERED)
+    monkeypatch.setattr(settings, "admin_token", "token")
+    app.dependency_overrides[get_funnel_recorder] = lambda: recorder
+    try:
+        client = TestClient(app, headers={"X-Admin-Token": "token"})
+        body = client.get("/api/v1/admin/funnel", params={"hours": 1}).json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert body["hours"] == 1
+    assert step_row(body, "common", "welcome")["entered"] == 1
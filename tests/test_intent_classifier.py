@@ -0,0 +1,75 @@
+"""
+Тесты классификатора намерений.
+"""
+import json
+import sys
+import os
+
+import pytest
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.core.intent_classifier import (
+    IntentClassifier, Keyword, normalize_text, service_classifier, borrower_classifier
+)
+from backend.core.scenario_manager import scenario_manager, DialogStep
+
+PHRASES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'intent_phrases.json')
+
+with open(PHRASES_PATH, encoding='utf-8') as f:
+    PHRASES = json.load(f)
+
+# Минимальная допустимая точность на наборе фраз
+MIN_ACCURACY = 0.95
+
+
+@pytest.mark.parametrize("name, classifier", [
+    ("service", service_classifier),
+    ("borrower", borrower_classifier),
+])
+def test_accuracy_on_widget_phrases(name, classifier):
+    """Точность на фразах из виджета не ниже порога."""
+    phrases = PHRASES[name]
+    misses = [(text, expected, classifier.classify(text).intent)
+              for text, expected in phrases
+              if classifier.classify(text).intent != expected]
+
+    accuracy = 1 - len(misses) / len(phrases)
+    assert accuracy >= MIN_ACCURACY, misses
+
+
+def test_buttons_are_always_recognized():
+    """Тексты кнопок распознаются без ошибок."""
+    assert service_classifier.classify("Займ").intent == "loan"
+    assert service_classifier.classify("Инвестировать").intent == "invest"
+    assert borrower_classifier.classify("Физическое лицо").intent == "individual"
+    assert borrower_classifier.classify("Бизнес").intent == "business"
+
+
+def test_whole_word_keyword_does_not_match_inside_words():
+    """"ип" срабатывает только отдельным словом."""
+    assert borrower_classifier.classify("Типография").intent is None
+    assert borrower_classifier.classify("ИП Иванов").intent == "business"
+
+
+def test_normalization():
+    """Нормализация сводит регистр, ё/й, пунктуацию и транслит."""
+    assert normalize_text("  Заём!!  ") == " заем "
+    assert normalize_text("Займ") == " заим "
+    assert normalize_text("zaim") == " заим "
+
+
+def test_tie_gives_no_intent():
+    """При равном счёте намерение не выбирается."""
+    classifier = IntentClassifier([Keyword("альфа", "a"), Keyword("бета", "b")])
+    match = classifier.classify("альфа бета")
+    assert match.intent is None
+    assert match.scores == {"a": 1.0, "b": 1.0}
+
+
+def test_unrecognized_choice_keeps_step():
+    """Нераспознанный ответ оставляет пользователя на том же шаге."""
+    next_step, updates = scenario_manager.get_next_step(DialogStep.ASK_LOAN_OR_INVEST, "привет", {})
+    assert next_step == DialogStep.ASK_LOAN_OR_INVEST
+    assert "выберите" in updates["error"]
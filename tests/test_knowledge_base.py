@@ -0,0 +1,178 @@
+"""
+Тесты базы знаний: основы слов, поиск BM25, файл индекса и ответы в диалоге.
+"""
+import sys
+import os
+import json
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from backend.core.config import settings
+from backend.core.knowledge_base import (FaqIndex, faq_files, fingerprint, is_question, load_index,
+                                         parse_faq, stem, tokenize)
+
+DOCS_DIR = os.path.join(os.path.dirname(__file__), '..', 'docs', 'faq')
+
+FAQ = """# Займы
+
+Вводный текст раздела не индексируется.
+
+## Какие документы нужны?
+Паспорт и документы на залог.
+
+## Можно ли погасить займ досрочно?
+Да, досрочное погашение возможно.
+
+## Какая доходность инвестиций?
+Зависит от суммы и срока.
+"""
+
+
+def test_stem_and_tokenize():
+    assert stem("заима") == stem("заимов") == stem("заим")
+    assert tokenize("Кредит") == tokenize("займы") == tokenize("заём")
+    assert tokenize("инвестиции") == tokenize("инвестор") == tokenize("вложения")
+    assert tokenize("Какие документы нужны?") == ["документ", "нужн"]
+    assert tokenize("kak ostavit zayavku") == tokenize("оставить заявку")
+
+
+def test_is_question():
+    assert is_question("Это бесплатно?")
+    assert is_question("сколько стоит оформление")
+    assert is_question("а сколько ждать")
+    assert not is_question("Иван Петров")
+    assert not is_question("Займ")
+    assert not is_question("Есть машина")
+    assert not is_question("Автомобиль, можно в залог")
+    assert is_question("можно ли досрочно")
+    assert not is_question("")
+
+
+def test_parse_and_search():
+    entries = parse_faq(FAQ, "loans.md")
+    assert [entry.question for entry in entries] == [
+        "Какие документы нужны?", "Можно ли погасить займ досрочно?", "Какая доходность инвестиций?"]
+    assert entries[0].answer == "Паспорт и документы на залог."
+
+    index = FaqIndex.build(entries)
+    assert index.answer("какие нужны документы для займа").entry is entries[0]
+    assert index.answer("можно погасить кредит досрочно?").entry is entries[1]
+    assert index.answer("доходность какая?").entry is entries[2]
+    assert index.answer("погода завтра?") is None
+    assert index.search("") == []
+    assert FaqIndex.build([]).answer("документы") is None
+
+
+def test_index_file_rebuilt_when_docs_change(tmp_path):
+    docs = tmp_path / "faq"
+    docs.mkdir()
+    (docs / "loans.md").write_text(FAQ, encoding="utf-8")
+    path = str(tmp_path / "index" / "faq.json")
+
+    index = load_index(str(docs), path)
+    assert len(index) == 3
+    with open(path, encoding="utf-8") as file:
+        saved = json.load(file)
+
+    # Готовый файл читается без перестроения
+    loaded = load_index(str(docs), path)
+    assert loaded.entries == index.entries
+    assert loaded.postings.keys() == index.postings.keys()
+
+    (docs / "general.md").write_text("## Это бесплатно?\nДа, консультация бесплатна.\n", encoding="utf-8")
+    updated = load_index(str(docs), path)
+    assert len(updated) == 4
+    assert updated.answer("бесплатно?").entry.source == "general.md"
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file)["fingerprint"] != saved["fingerprint"]
+
+    # Повреждённый файл заменяется новым индексом
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("{")
+    assert len(load_index(str(docs), path)) == 4
+
+
+def test_fingerprint_uses_relative_path(tmp_path):
+    """Перенос файла в другой подкаталог с тем же именем меняет отпечаток."""
+    docs = tmp_path / "docs"
+    (docs / "loans").mkdir(parents=True)
+    (docs / "business").mkdir()
+    source = docs / "loans" / "terms.md"
+    source.write_text(FAQ, encoding="utf-8")
+    before = fingerprint(faq_files(str(docs)), str(docs))
+
+    stat = os.stat(source)
+    moved = docs / "business" / "terms.md"
+    os.rename(source, moved)
+    os.utime(moved, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert fingerprint(faq_files(str(docs)), str(docs)) != before
+
+
+def test_project_faq_answers():
+    index = FaqIndex.build(
+        entry for name in sorted(os.listdir(DOCS_DIR))
+        for entry in parse_faq(open(os.path.join(DOCS_DIR, name), encoding="utf-8").read(), name))
+    assert index.answer("Какие документы нужны?").entry.source == "loans.md"
+    assert index.answer("на какой срок можно вложить деньги?").entry.source == "investments.md"
+
+
+@pytest.fixture
+def manager(monkeypatch, tmp_path):
+    from backend.core.dialog_manager import DialogStateManager
+
+    monkeypatch.setattr(settings, "database_enabled", False)
+    monkeypatch.setattr(settings, "transcripts_enabled", False)
+    monkeypatch.setattr(settings, "funnel_enabled", False)
+    monkeypatch.setattr(settings, "faq_docs_dir", DOCS_DIR)
+    monkeypatch.setattr(settings, "faq_index_path", str(tmp_path / "faq.json"))
+    return DialogStateManager()
+
+
+def test_question_mid_dialog_keeps_step(manager):
+    session_id = manager.process_user_message("", "")["session_id"]
+    manager.process_user_message(session_id, "Займ")
+    manager.process_user_message(session_id, "Физическое лицо")
+
+    response = manager.process_user_message(session_id, "Какие документы нужны?")
+    assert response["step"] == "individual_ask_name"
+    assert response["message"].startswith("Физическому лицу - паспорт")
+    assert manager.get_dialog_state(session_id).collected_data.get("name") is None
+
+    response = manager.process_user_message(session_id, "Иван")
+    assert response["step"] == "individual_ask_collateral"
+    assert manager.get_dialog_state(session_id).collected_data["name"] == "Иван"
+
+
+def test_statement_on_free_text_step_is_answer(manager):
+    session_id = manager.process_user_message("", "")["session_id"]
+    for message in ("Займ", "Физическое лицо", "Иван"):
+        manager.process_user_message(session_id, message)
+
+    # Ответ со словами "есть", "можно" - не вопрос, шаг сценария продолжается
+    response = manager.process_user_message(session_id, "Есть машина")
+    assert response["step"] == "individual_ask_amount"
+    assert manager.get_dialog_state(session_id).collected_data["collateral"] == "Есть машина"
+
+
+def test_choice_wins_over_question(manager):
+    session_id = manager.process_user_message("", "")["session_id"]
+
+    # Подходящий вариант ответа - переход по сценарию, а не ответ базы знаний
+    assert manager.process_user_message(session_id, "Можно займ?")["step"] == "ask_individual_or_business"
+
+    # Вопрос, который не выбирает вариант, получает ответ, шаг сохраняется
+    response = manager.process_user_message(session_id, "Это бесплатно?")
+    assert response["step"] == "ask_individual_or_business"
+    assert response["options"] == ["Физическое лицо", "Бизнес"]
+    assert "бесплатн" in response["message"]
+
+
+def test_faq_disabled(manager, monkeypatch):
+    monkeypatch.setattr(settings, "faq_enabled", False)
+    session_id = manager.process_user_message("", "")["session_id"]
+    response = manager.process_user_message(session_id, "Это бесплатно?")
+    assert response["message"].startswith("❌")
+    assert manager._faq_index is None
@@ -0,0 +1,84 @@
+"""
+Тесты нормализации телефонов и дедупликации заявок.
+"""
+import sys
+import os
+from unittest.mock import Mock, patch
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.core.validators import normalize_phone, validators, PHONE_CACHE_SIZE, _parse_phone
+from backend.core.lead_index import RecentApplicationIndex, lead_index
+from backend.core.dialog_manager import DialogStateManager
+
+
+def test_normalize_phone_to_e164():
+    """Разные записи одного номера дают один ключ."""
+    variants = ["89123456789", "+7 (912) 345-67-89", "7 912 345 67 89", "9123456789", "8-912-345-67-89"]
+    assert {normalize_phone(v) for v in variants} == {"+79123456789"}
+    assert normalize_phone("123") is None
+    assert normalize_phone("") is None
+    assert validators.validate_phone("8 912 345 67 89") == (True, "+79123456789")
+
+
+def test_normalize_phone_cache_is_bounded():
+    """Кэш нормализации ограничен по размеру."""
+    assert _parse_phone.cache_info().maxsize == PHONE_CACHE_SIZE
+
+
+def test_index_detects_duplicate_within_window():
+    """Повтор в пределах окна находится, за пределами - нет."""
+    index = RecentApplicationIndex(window_minutes=10, max_size=100)
+
+    assert index.check_and_add("+79123456789", "s1", "individual", now=1000) is None
+    duplicate = index.check_and_add("+79123456789", "s2", "individual", now=1100)
+    assert duplicate.session_id == "s1"
+
+    assert index.check_and_add("+79123456789", "s3", "business", now=1100 + 601) is None
+
+
+def test_index_is_bounded():
+    """При переполнении вытесняются самые старые телефоны."""
+    index = RecentApplicationIndex(window_minutes=10, max_size=2)
+    for i in range(3):
+        index.check_and_add(f"+7900000000{i}", f"s{i}", "individual", now=1000 + i)
+
+    assert len(index) == 2
+    assert index.find("+79000000000", now=1003) is None
+    assert index.find("+79000000002", now=1003) is not None
+
+
+def test_duplicate_application_is_flagged():
+    """Повторная заявка помечается при политике flag."""
+    lead_index.clear()
+    manager = DialogStateManager()
+    manager._notification_service = Mock()
+    manager._application_repository = Mock()
+
+    manager._send_application_notification("individual", {"phone": "+79991112233"}, "first")
+    manager._send_application_notification("individual", {"phone": "8 999 111-22-33"}, "second")
+    manager.notification_queue.flush(timeout=5)
+
+    calls = manager._notification_service.send_application_notification.call_args_list
+    assert "duplicate_of" not in calls[0].args[1]
+    assert calls[1].args[1]["duplicate_of"] == "first"
+
+
+def test_duplicate_application_is_suppressed():
+    """При политике suppress повтор не отправляется."""
+    lead_index.clear()
+    manager = DialogStateManager()
+    manager._notification_service = Mock()
+    manager._application_repository = Mock()
+
+    with patch("backend.core.dialog_manager.settings.duplicate_policy", "suppress"):
+        manager._send_application_notification("business", {"phone": "+79991112244"}, "first")
+        manager._send_application_notification("business", {"phone": "+79991112244"}, "second")
+    manager.notification_queue.flush(timeout=5)
+
+    assert manager._notification_service.send_application_notification.call_count == 1
+    # Повтор всё равно сохраняется в базе с пометкой
+    saved = manager._application_repository.add.call_args_list
+    assert len(saved) == 2
+    assert saved[1].args[1]["duplicate_of"] == "first"
@@ -0,0 +1,208 @@
+"""
+Тесты массового импорта заявок из CSV.
+"""
+import sys
+import os
+import io
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from sqlalchemy import select
+
+from backend import cli
+from backend.db.lead_import import LeadImporter, read_chunks
+from backend.db.models import Application
+from backend.db.repository import ApplicationRepository, application_row
+from backend.integrations.notification_queue import NotificationQueue
+from backend.integrations.notification_service import NotificationService
+
+LEADS = """Тип;Имя;Телефон;Сумма;Залог;Цель;Компания;Срок
+физлицо;Иван Петров;8 (912) 345-67-89;1.5 млн;Kia Rio 2020;ремонт;;
+физлицо;Петр;+7 912 345 67 89;500к;;;;
+бизнес;;89001112233;2 000 000;станки;развитие;ООО Ромашка;
+инвестор;Анна;9005554433;300000;;;;2 года
+инвестор;Анна;9005554434;300000;;;;200
+;;;;;;;
+кто;Олег;9005554435;300000;;;;
+физлицо;Ольга;12345;300000;;;;
+"""
+
+
+class RecordingNotifications:
+    def __init__(self):
+        self.batches = []
+
+    def submit_batch(self, title, applications, timeout=None):
+        self.batches.append((title, applications))
+        return True
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = ApplicationRepository(url=f"sqlite:///{tmp_path / 'leads.db'}")
+    assert repository.wait_ready()
+    yield repository
+    repository.close(timeout=5)
+
+
+def stored(repository):
+    with repository.session() as session:
+        return list(session.scalars(select(Application).order_by(Application.id)))
+
+
+def test_read_chunks_detects_delimiter_and_skips_blank_rows():
+    columns, chunks = read_chunks(io.StringIO(LEADS), chunk_size=3)
+    assert columns["phone"] == 2 and columns["user_type"] == 0 and columns["term_months"] == 7
+    chunks = list(chunks)
+    assert [len(chunk) for chunk in chunks] == [3, 2, 2]
+    assert [line for line, _ in chunks[-1]] == [8, 9]
+
+
+def test_import_validates_dedupes_and_writes(repository):
+    notifications = RecordingNotifications()
+    importer = LeadImporter(repository, notifications, source="partner", chunk_size=3, notify_batch_size=2)
+    report = importer.run(io.StringIO(LEADS))
+
+    assert (report.rows, report.imported, report.invalid, report.duplicates) == (7, 3, 3, 1)
+    assert report.errors == [
+        (6, "term_months", "Максимальный срок: 120 месяцев (10 лет)"),
+        (8, "user_type", "Неизвестный тип заявки"),
+        (9, "phone", "Номер должен содержать 10-11 цифр"),
+    ]
+
+    rows = stored(repository)
+    assert [(row.user_type, row.phone, row.amount) for row in rows] == [
+        ("individual", "+79123456789", 1_500_000),
+        ("business", "+79001112233", 2_000_000),
+        ("investor", "+79005554433", 300_000),
+    ]
+    assert rows[0].name == "Иван Петров" and rows[0].collateral == "Kia Rio 2020"
+    assert rows[1].company_name == "ООО Ромашка"
+    assert rows[2].term_months == 24 and rows[2].data["investment_amount"] == 300_000
+    assert all(row.session_id.startswith("import-") and row.data["source"] == "partner" for row in rows)
+
+    # Сводки по каждой порции, не больше notify_batch_size заявок
+    assert report.notified == 3
+    assert [len(applications) for _, applications in notifications.batches] == [2, 1]
+    assert [title for title, _ in notifications.batches] == [
+        "📥 Импорт partner: заявки 1-2", "📥 Импорт partner: заявки 3-3"]
+
+
+def test_repeated_import_skips_known_phones(repository):
+    repository.bulk_insert([application_row("individual", {"name": "Чат", "phone": "89123456789",
+                                                            "session_id": "chat"})])
+    report = LeadImporter(repository).run(io.StringIO(LEADS))
+    assert report.imported == 2
+    assert report.duplicates == 2
+
+    report = LeadImporter(repository).run(io.StringIO(LEADS))
+    assert report.imported == 0
+    assert report.duplicates == 4
+
+
+def test_default_user_type_and_missing_columns(repository):
+    text = "name,phone,amount\nИван,89123456789,100000\n"
+    assert LeadImporter(repository, user_type="individual").run(io.StringIO(text)).imported == 1
+
+    with pytest.raises(ValueError):
+        LeadImporter(repository).run(io.StringIO(text))
+    with pytest.raises(ValueError):
+        LeadImporter(repository, user_type="individual").run(io.StringIO("name,amount\nИван,100000\n"))
+
+    # Обязательного столбца нет - строки отклоняются
+    report = LeadImporter(repository, user_type="business").run(io.StringIO("phone,amount\n89001234567,100000\n"))
+    assert report.invalid == 1
+    assert report.errors == [(2, "company_name", "Обязательное поле не заполнено")]
+
+
+def test_batch_notification_splits_messages():
+    class Telegram:
+        enabled = True
+        MAX_MESSAGE_LENGTH = 600
+
+        def __init__(self):
+            self.messages = []
+
+        def send_text(self, text):
+            self.messages.append(text)
+            return True
+
+    telegram = Telegram()
+    service = NotificationService(telegram_sender=telegram)
+    applications = [("individual", {"name": f"Имя <{i}>", "phone": "+79123456789", "amount": 100000,
+                                    "collateral": "Kia", "purpose": "ремонт"}) for i in range(10)]
+
+    queue = NotificationQueue(lambda: service)
+    assert queue.submit_batch("Импорт", applications)
+    assert queue.close(timeout=5)
+    assert queue.sent == 10
+
+    assert len(telegram.messages) > 1
+    assert all(len(message) <= 600 and message.startswith("Импорт") for message in telegram.messages)
+    assert sum(message.count("Телефон") for message in telegram.messages) == 10
+    assert "Имя &lt;0&gt;" in telegram.messages[0]
+
+
+def test_batch_notification_emails_only_unsent_messages():
+    class Telegram:
+        enabled = True
+        MAX_MESSAGE_LENGTH = 600
+
+        def __init__(self):
+            self.messages = []
+
+        def send_text(self, text):
+            if self.messages:
+                return False
+            self.messages.append(text)
+            return True
+
+    class Email:
+        enabled = True
+
+        def __init__(self):
+            self.names = []
+
+        def send_application(self, user_type, data):
+            self.names.append(data["name"])
+            return True
+
+    telegram, email = Telegram(), Email()
+    service = NotificationService(telegram_sender=telegram, email_sender=email)
+    applications = [("individual", {"name": f"Имя {i}", "phone": "+79123456789", "amount": 100000,
+                                    "collateral": "Kia", "purpose": "ремонт"}) for i in range(10)]
+    assert service.send_batch_notification("Импорт", applications)
+
+    # Заявки из доставленного сообщения повторно не отправляются
+    delivered = telegram.messages[0].count("Телефон")
+    assert 0 < delivered < 10
+    assert email.names == [f"Имя {i}" for i in range(delivered, 10)]
+
+
+def test_split_messages_truncates_before_escaping():
+    from backend.integrations.notification_service import _split_messages
+
+    messages = _split_messages("A & B", ["короткая", "&" * 500, "<b>"], 100)
+    assert [numbers for _, numbers in messages] == [[0], [1], [2]]
+    for message, _ in messages:
+        assert len(message) <= 100 and message.startswith("A &amp; B\n\n")
+    # Обрезка не разрезает сущность &amp;
+    body = messages[1][0].split("\n\n", 1)[1]
+    assert body.endswith("&amp;…") and body[:-1].replace("&amp;", "") == ""
+    assert messages[2][0].endswith("&lt;b&gt;")
+
+
+def test_cli_import(tmp_path, capsys):
+    path = tmp_path / "leads.csv"
+    path.write_text(LEADS, encoding="utf-8-sig")
+    url = f"sqlite:///{tmp_path / 'cli.db'}"
+
+    assert cli.main(["import-leads", str(path), "--no-notify", "--database-url", url]) == 1
+    captured = capsys.readouterr()
+    assert "загружено: 3" in captured.out
+    assert "строка 8, user_type" in captured.err
+
+    assert cli.main(["import-leads", str(path), "--no-notify", "--database-url", url,
+                     "--delimiter", ","]) == 2
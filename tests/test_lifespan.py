@@ -0,0 +1,159 @@
+"""
+Тесты запуска и остановки приложения: подготовка, очередь уведомлений,
+дописывание очередей при остановке.
+"""
+import sys
+import os
+import logging
+import threading
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api import lifespan as lifespan_module
+from backend.api.lifespan import app_state
+from backend.core.dialog_manager import DialogStateManager
+from backend.core.readiness import ReadinessChecker
+from backend.integrations.notification_queue import NotificationQueue
+from backend.main import app
+from tests.benchmarks.load_test import isolate
+
+DIALOG = ["", "Займ", "Физическое лицо", "Иван Иванов", "Toyota Camry, 2020 год",
+          "1000000", "развитие бизнеса", "89123456789", "Да, отправить заявку"]
+
+
+class SlowService:
+    """NotificationService, отправка которого занимает delay секунд."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+
+    def send_application_notification(self, user_type, application_data):
+        time.sleep(self.delay)
+        self.sent.append(application_data['session_id'])
+        return True
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Приложение с отдельным менеджером диалогов; состояние процесса восстанавливается."""
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    manager = DialogStateManager()
+    telegram = isolate(manager, str(tmp_path))
+    monkeypatch.setattr(lifespan_module, "dialog_manager", manager)
+    monkeypatch.setattr("backend.api.endpoints.dialog_manager", manager)
+    monkeypatch.setattr(lifespan_module, "readiness", ReadinessChecker({}))
+    monkeypatch.setattr(app_state, "accepting", True)
+    monkeypatch.setattr(app_state, "ready", False)
+    yield manager, telegram
+    manager.close(timeout=5)
+
+
+def test_notification_queue_sends_in_background():
+    service = SlowService()
+    notifications = NotificationQueue(lambda: service)
+
+    assert notifications.submit("individual", {"session_id": "a"})
+    assert notifications.submit("individual", {"session_id": "b"})
+    assert notifications.close(timeout=5)
+
+    assert service.sent == ["a", "b"]
+    assert notifications.sent == 2
+    # После остановки заявки не принимаются
+    assert not notifications.submit("individual", {"session_id": "c"})
+    assert notifications.dropped == 1
+
+
+def test_notification_queue_close_deadline():
+    service = SlowService(delay=0.2)
+    notifications = NotificationQueue(lambda: service)
+    for index in range(10):
+        notifications.submit("individual", {"session_id": str(index)})
+
+    started = time.monotonic()
+    assert not notifications.close(timeout=0.3)
+    assert time.monotonic() - started < 1.5
+    assert 0 < len(service.sent) < 10
+
+
+def test_close_with_full_queue_keeps_deadline(tmp_path):
+    from backend.core.transcripts import TranscriptLog
+
+    release = threading.Event()
+
+    class Blocked:
+        def send_application_notification(self, user_type, application_data):
+            release.wait(5)
+            return True
+
+    notifications = NotificationQueue(Blocked, max_queue_size=2)
+    for index in range(3):
+        notifications.submit("individual", {"session_id": str(index)})
+    transcripts = TranscriptLog(str(tmp_path / "transcripts"), max_queue_size=1)
+    assert transcripts.append("s", "welcome", "", "")
+
+    # Очередь заполнена, поток занят: остановка не ждёт места в очереди
+    started = time.monotonic()
+    assert not notifications.close(timeout=0.2)
+    assert time.monotonic() - started < 0.5
+    release.set()
+    assert transcripts.close(timeout=1)
+
+
+def test_notification_queue_full():
+    release = threading.Event()
+
+    class Blocked:
+        def send_application_notification(self, user_type, application_data):
+            release.wait(5)
+            return True
+
+    notifications = NotificationQueue(Blocked, max_queue_size=1)
+    results = [notifications.submit("individual", {"session_id": str(i)}) for i in range(5)]
+    release.set()
+    notifications.close(timeout=5)
+
+    assert results[0] and not all(results)
+    assert notifications.dropped == results.count(False)
+
+
+def test_lifespan_warms_up_and_drains(manager):
+    manager, telegram = manager
+
+    with TestClient(app) as client:
+        assert app_state.ready
+        assert {"scenarios", "notifications", "database"} <= set(app_state.warmup)
+
+        session_id = None
+        for message in DIALOG:
+            response = client.post("/api/v1/chat", json={"session_id": session_id, "message": message})
+            session_id = response.json()["session_id"]
+        assert response.json()["completed"]
+
+    # Остановка: новые сообщения не принимаются, отправка дописана
+    assert not app_state.accepting
+    assert telegram.sent == 1
+    assert manager.notification_queue.pending == 0
+
+
+def test_chat_rejected_while_draining(manager):
+    app_state.accepting = False
+    client = TestClient(app)
+
+    response = client.post("/api/v1/chat", json={"message": ""})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    # Пробы и админ-API продолжают работать
+    assert client.get("/health").status_code == 200
+
+
+def test_close_without_usage_creates_nothing(tmp_path):
+    manager = DialogStateManager()
+    assert manager.close(timeout=1)
+    assert manager._notification_queue is None
+    assert manager._transcript_log is None
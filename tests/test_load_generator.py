@@ -0,0 +1,63 @@
+"""
+Проигрывание сгенерированных диалогов (ошибки ввода, перезапуски,
+уходы и "Нет, исправить") против менеджера диалога и HTTP API.
+"""
+import sys
+import os
+import logging
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from backend.core.config import settings
+from backend.core.dialog_manager import DialogStateManager, dialog_manager
+from tests.benchmarks.dialog_generator import CONFIRM_NO, DialogGenerator, DialogMix
+from tests.benchmarks.load_test import HttpDriver, InProcessDriver, isolate, run_load
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DialogStateManager()
+    telegram = isolate(manager, str(tmp_path))
+    yield manager, telegram
+    manager.close(timeout=5)
+
+
+def test_generator_is_reproducible():
+    first = DialogGenerator(seed=7).generate_many(20)
+    second = DialogGenerator(seed=7).generate_many(20)
+    assert [[turn.message for turn in dialog.turns] for dialog in first] == \
+           [[turn.message for turn in dialog.turns] for dialog in second]
+
+
+def test_generated_dialogs_follow_scenarios(manager):
+    """Каждый ответ приходит на ожидаемый шаг, все завершённые заявки отправлены."""
+    manager, telegram = manager
+    mix = DialogMix(invalid_input=0.3, fix_at_confirm=0.3, restart=0.2, abandon=0.05)
+    dialogs = DialogGenerator(mix, seed=1).generate_many(200)
+    assert any(turn.message == CONFIRM_NO for dialog in dialogs for turn in dialog.turns)
+    assert any(turn.restart for dialog in dialogs for turn in dialog.turns)
+
+    report = run_load(InProcessDriver(manager), dialogs, concurrency=4)
+    manager.notification_queue.flush(timeout=5)
+
+    assert report.failures == 0
+    assert report.mismatches == 0
+    assert telegram.sent == report.completed
+
+
+def test_http_driver(manager, monkeypatch):
+    """Тот же прогон через /api/v1/chat."""
+    manager, telegram = manager
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)  # все запросы с одного адреса
+    for name in ("_notification_service", "_application_repository", "_funnel_recorder", "_transcript_log"):
+        monkeypatch.setattr(dialog_manager, name, getattr(manager, name))
+
+    report = run_load(HttpDriver(), DialogGenerator(seed=3).generate_many(20))
+
+    assert report.failures == 0
+    assert report.mismatches == 0
+    assert report.percentile(0.99) > 0
@@ -0,0 +1,112 @@
+"""
+Тесты логирования: очередь без блокировки, JSON с контекстом, прореживание.
+"""
+import sys
+import os
+import io
+import json
+import logging
+import queue
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.core.logging_config import (
+    ContextFilter, JsonFormatter, NonBlockingQueueHandler, RepeatSampler, log_context, update_log_context,
+)
+
+
+def make_record(msg, *args, level=logging.ERROR, name="backend.test"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_json_record_with_context():
+    record = make_record("Ошибка отправки: %s", "timeout")
+    with log_context(session_id="abc"):
+        update_log_context(step="phone")
+        ContextFilter().filter(record)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Ошибка отправки: timeout"
+    assert entry["level"] == "ERROR"
+    assert entry["session_id"] == "abc"
+    assert entry["step"] == "phone"
+
+    # Вне блока контекст не переносится
+    other = make_record("без контекста")
+    ContextFilter().filter(other)
+    assert "session_id" not in json.loads(JsonFormatter().format(other))
+
+
+def test_sampler_limits_repeats_per_window():
+    now = [0.0]
+    sampler = RepeatSampler(window=60, burst=3, clock=lambda: now[0])
+
+    passed = [sampler.filter(make_record("Ошибка отправки в Telegram: %s", i)) for i in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+
+    # Другой шаблон и уровень INFO не прореживаются
+    assert sampler.filter(make_record("Другая ошибка"))
+    assert all(sampler.filter(make_record("Заявка %s", i, level=logging.INFO)) for i in range(10))
+
+    # В новом окне первая запись сообщает число пропущенных
+    now[0] = 61
+    record = make_record("Ошибка отправки в Telegram: %s", 11)
+    assert sampler.filter(record)
+    assert record.suppressed == 7
+
+
+def test_queue_handler_drops_when_full():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(make_record("первая"))
+    handler.handle(make_record("вторая"))
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_queue_handler_formats_lazily():
+    class Value:
+        calls = 0
+
+        def __str__(self):
+            Value.calls += 1
+            return "value"
+
+    logger = logging.getLogger("backend.test.lazy")
+    handler = NonBlockingQueueHandler(queue.Queue())
+    logger.addHandler(handler)
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+    try:
+        # Отключённый уровень: аргументы не форматируются
+        logger.info("значение %s", Value())
+        assert Value.calls == 0
+        assert handler.queue.empty()
+
+        # Изменяемые аргументы форматируются сразу, неизменяемые - в фоне
+        logger.warning("значение %s", Value())
+        logger.warning("сессия %s", "abc")
+        mutable, immutable = handler.queue.get_nowait(), handler.queue.get_nowait()
+        assert Value.calls == 1
+        assert (mutable.msg, mutable.args) == ("значение value", None)
+        assert immutable.args == ("abc",)
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+
+def test_queue_handler_keeps_traceback_text():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    try:
+        raise ValueError("сбой")
+    except ValueError:
+        record = logging.LogRecord("backend.test", logging.ERROR, __file__, 1, "ошибка", None, sys.exc_info())
+    handler.handle(record)
+
+    prepared = handler.queue.get_nowait()
+    assert prepared.exc_info is None
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    output.handle(prepared)
+    assert "ValueError: сбой" in json.loads(stream.getvalue())["exc"]
@@ -0,0 +1,114 @@
+"""
+Тесты ASGI-middleware: CORS виджета и обход для служебных маршрутов.
+"""
+import sys
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.api.middleware import BypassMiddleware, WidgetCORSMiddleware
+
+ORIGIN = "https://bbkinvest.ru"
+
+
+def build_app(calls):
+    app = FastAPI()
+
+    @app.post("/api/v1/chat")
+    async def chat():
+        return {"ok": True}
+
+    @app.get("/api/v1/chat/state/{session_id}")
+    async def chat_state(session_id: str):
+        return {"ok": True}
+
+    @app.post("/api/v1/chatty")
+    async def chatty():
+        return {"ok": True}
+
+    @app.get("/api/v1/admin/funnel")
+    async def admin():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    class Counter:
+        def __init__(self, app):
+            self.app = app
+
+        async def __call__(self, scope, receive, send):
+            calls.append(scope["path"])
+            await self.app(scope, receive, send)
+
+    app.add_middleware(Counter)
+    app.add_middleware(WidgetCORSMiddleware, allow_origins=[ORIGIN], max_age=300)
+    app.add_middleware(BypassMiddleware, router=app.router)
+    return app
+
+
+def preflight(client, path, origin=ORIGIN):
+    return client.options(path, headers={
+        "Origin": origin,
+        "Access-Control-Request-Method": "POST",
+        "Access-Control-Request-Headers": "content-type",
+    })
+
+
+def test_widget_preflight_cached():
+    client = TestClient(build_app([]))
+
+    response = preflight(client, "/api/v1/chat")
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert response.headers["access-control-max-age"] == "300"
+    assert "access-control-allow-credentials" not in response.headers
+
+
+def test_widget_rejects_unknown_origin():
+    client = TestClient(build_app([]))
+
+    assert preflight(client, "/api/v1/chat", origin="https://evil.example").status_code == 400
+    response = client.post("/api/v1/chat", headers={"Origin": "https://evil.example"})
+    assert "access-control-allow-origin" not in response.headers
+
+
+def test_cors_only_on_widget_routes():
+    client = TestClient(build_app([]))
+
+    response = client.post("/api/v1/chat", headers={"Origin": ORIGIN})
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+    response = client.get("/api/v1/admin/funnel", headers={"Origin": ORIGIN})
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
+
+    # Граница пути: вложенные пути - маршруты виджета, похожие префиксы - нет
+    response = client.get("/api/v1/chat/state/x", headers={"Origin": ORIGIN})
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    response = client.post("/api/v1/chatty", headers={"Origin": ORIGIN})
+    assert "access-control-allow-origin" not in response.headers
+
+
+def test_health_bypasses_middleware():
+    calls = []
+    client = TestClient(build_app(calls))
+
+    assert client.get("/health", headers={"Origin": ORIGIN}).json() == {"status": "healthy"}
+    assert calls == []
+
+    client.get("/api/v1/admin/funnel")
+    assert calls == ["/api/v1/admin/funnel"]
+
+
+def test_bypass_wrong_method_handled_by_app():
+    calls = []
+    client = TestClient(build_app(calls))
+
+    assert client.post("/health").status_code == 405
+    assert calls == ["/health"]
@@ -0,0 +1,122 @@
+"""
+Тесты диагностики: сэмплирующий профилировщик и трассировка запросов.
+"""
+import sys
+import os
+import threading
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.config import settings
+from backend.core.profiler import ProfilerBusy, SamplingProfiler, collapsed
+from backend.core.tracing import server_timing, span, summarize, trace
+
+
+def busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profile_collects_busy_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), daemon=True)
+    worker.start()
+    try:
+        stacks = SamplingProfiler().profile(0.2, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    text = collapsed(stacks)
+    assert f"{__name__}:busy_loop" in text
+    line = text.splitlines()[0]
+    stack, count = line.rsplit(" ", 1)
+    assert int(count) == max(stacks.values())
+    assert stack.startswith("threading:")
+
+
+def test_one_profile_at_a_time():
+    profiler = SamplingProfiler()
+    errors = []
+
+    def second():
+        try:
+            profiler.profile(0.01)
+        except ProfilerBusy as e:
+            errors.append(e)
+
+    started = threading.Thread(target=profiler.profile, args=(0.3,))
+    started.start()
+    time.sleep(0.05)
+    second()
+    started.join()
+    assert len(errors) == 1
+
+
+def test_span_outside_trace_is_noop():
+    with span("validation"):
+        pass
+
+    with trace() as spans:
+        with span("validation"):
+            pass
+        with span("validation"):
+            pass
+        with span("session.write"):
+            pass
+    with span("format"):
+        pass
+
+    assert [name for name, _ in spans] == ["validation", "validation", "session.write"]
+    summary = summarize(spans)
+    assert summary["validation"][0] == 2
+    header = server_timing(spans, 0.01)
+    assert header.startswith('validation;dur=')
+    assert 'desc="x2"' in header
+    assert header.endswith("total;dur=10.000")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from backend.main import app
+
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    return TestClient(app)
+
+
+def test_profile_endpoint(client):
+    assert client.get("/api/v1/admin/profile", params={"seconds": 0.1}).status_code == 401
+    assert client.get("/api/v1/admin/profile", params={"seconds": settings.profiler_max_seconds + 1},
+                      headers={"X-Admin-Token": "secret"}).status_code == 422
+
+    response = client.get("/api/v1/admin/profile", params={"seconds": 0.1, "idle": True},
+                          headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for line in response.text.splitlines():
+        assert line.rsplit(" ", 1)[1].isdigit()
+
+
+def test_trace_header(client, monkeypatch):
+    session_id = client.post("/api/v1/chat", json={"message": ""}).json()["session_id"]
+
+    # Без TRACE_ENABLED заголовок X-Trace игнорируется
+    response = client.post("/api/v1/chat", json={"session_id": session_id, "message": "Займ"},
+                           headers={"X-Trace": "1"})
+    assert "server-timing" not in response.headers
+
+    monkeypatch.setattr(settings, "trace_enabled", True)
+    response = client.post("/api/v1/chat", json={"session_id": session_id, "message": "Физическое лицо"},
+                           headers={"X-Trace": "1"})
+    timing = response.headers["server-timing"]
+    for name in ("session.read", "scenario", "format", "session.write", "total"):
+        assert f"{name};dur=" in timing
+
+    response = client.post("/api/v1/chat", json={"session_id": session_id, "message": "Займ"})
+    assert "server-timing" not in response.headers
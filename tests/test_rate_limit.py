@@ -0,0 +1,110 @@
+"""
+Тесты ограничения частоты запросов чата.
+"""
+import sys
+import os
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api import endpoints
+from backend.core import dialog_manager as dialog_manager_module
+from backend.core.config import settings
+from backend.core.dialog_manager import DialogStateManager
+from backend.core.rate_limit import ChatRateLimiter, RateLimited, TokenBucketLimiter
+from backend.main import app
+from tests.benchmarks.load_test import isolate
+
+DIALOG = [
+    "", "Займ", "Физическое лицо", "Иван Иванов", "Toyota Camry, 2020 год",
+    "1000000", "развитие бизнеса", "89123456789", "Да, отправить заявку",
+]
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """Свежие счётчики с маленькими лимитами."""
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_client_per_minute", 60)
+    monkeypatch.setattr(settings, "rate_limit_client_burst", 3)
+    monkeypatch.setattr(settings, "rate_limit_session_per_minute", 60)
+    monkeypatch.setattr(settings, "rate_limit_session_burst", 2)
+    monkeypatch.setattr(settings, "rate_limit_applications_per_hour", 1)
+    limiter = ChatRateLimiter()
+    monkeypatch.setattr(endpoints, "rate_limiter", limiter)
+    monkeypatch.setattr(dialog_manager_module, "rate_limiter", limiter)
+    return limiter
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucketLimiter(rate=0.5, burst=2)
+    assert bucket.acquire("ip", now=0) == 0
+    assert bucket.acquire("ip", now=0) == 0
+    assert bucket.acquire("ip", now=0) == pytest.approx(2.0)
+
+    # Через секунду восстановилась половина запроса, через две - целый
+    assert bucket.acquire("ip", now=1) == pytest.approx(1.0)
+    assert bucket.acquire("ip", now=2) == 0
+    assert bucket.acquire("other", now=2) == 0
+
+
+def test_token_bucket_keys_are_bounded():
+    bucket = TokenBucketLimiter(rate=1, burst=1, max_keys=100)
+    for i in range(1000):
+        bucket.acquire(f"10.0.{i // 256}.{i % 256}", now=0)
+    assert len(bucket) == 100
+
+
+def test_client_limit_returns_429(limiter):
+    client = TestClient(app)
+    for _ in range(3):
+        assert client.post("/api/v1/chat/quick-start", params={"option": "investor"}).status_code == 200
+
+    response = client.post("/api/v1/chat", json={"message": ""})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_session_limit(limiter):
+    limiter.client.burst = 100
+    client = TestClient(app)
+    session_id = client.post("/api/v1/chat", json={"message": ""}).json()["session_id"]
+
+    statuses = [client.post("/api/v1/chat", json={"session_id": session_id, "message": "Займ"}).status_code
+                for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    # Другие сессии с того же адреса не затронуты
+    assert client.post("/api/v1/chat", json={"message": ""}).status_code == 200
+
+
+def test_application_limit_keeps_session_on_last_step(limiter, tmp_path):
+    manager = DialogStateManager()
+    telegram = isolate(manager, str(tmp_path))
+    try:
+        def run_dialog(messages):
+            session_id = ""
+            for message in messages:
+                session_id = manager.process_user_message(session_id, message, client="203.0.113.7")["session_id"]
+            return session_id
+
+        run_dialog(DIALOG)
+        session_id = run_dialog(DIALOG[:-1])
+        with pytest.raises(RateLimited) as error:
+            manager.process_user_message(session_id, DIALOG[-1], client="203.0.113.7")
+        assert error.value.scope == "applications"
+        assert int(error.value.retry_after_header) > 3000
+
+        # Сессия осталась на подтверждении, вторая заявка не отправлена
+        state = manager.get_dialog_state(session_id)
+        assert state.current_step == "individual_confirm" and not state.completed
+        manager.notification_queue.flush(timeout=5)
+        assert telegram.sent == 1
+
+        # Без адреса (внутренние вызовы) лимит заявок не применяется
+        result = manager.process_user_message(session_id, DIALOG[-1])
+        assert result["completed"]
+    finally:
+        manager.close(timeout=5)
@@ -0,0 +1,123 @@
+"""
+Тесты пробы готовности: кэш проверок, группы каналов, устаревание.
+"""
+import sys
+import os
+import logging
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+
+from backend.api import lifespan as lifespan_module
+from backend.api.lifespan import app_state
+from backend.core.readiness import ReadinessChecker
+from backend.db.repository import ApplicationRepository
+from backend.integrations.telegram_sender import TelegramSender
+from backend.main import app
+from tests.fake_telegram_api import FakeTelegramAPI, FakeTelegramConfig
+
+
+class Check:
+    """Проверка с заданным результатом и счётчиком вызовов."""
+
+    def __init__(self, result=True):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_status_reads_cache_only():
+    database = Check()
+    checker = ReadinessChecker({"database": database}, required=[("database",)])
+
+    ready, checks = checker.status()
+    assert not ready
+    assert checks["database"]["ok"] is False
+
+    checker.refresh()
+    for _ in range(100):
+        assert checker.status()[0]
+    assert database.calls == 1
+
+
+def test_notification_channels_any_of():
+    telegram, email = Check(False), Check(True)
+    checker = ReadinessChecker({"database": Check(), "telegram": telegram, "email": email},
+                               required=[("database",), ("telegram", "email")])
+    checker.refresh()
+    assert checker.status()[0]
+
+    email.result = RuntimeError("SMTP недоступен")
+    checker.refresh()
+    ready, checks = checker.status()
+    assert not ready
+    assert checks["email"]["error"] == "SMTP недоступен"
+
+
+def test_stale_results_fail():
+    checker = ReadinessChecker({"database": Check()}, required=[("database",)], stale_after=30)
+    checker.refresh()
+    checked_at = checker._results["database"].checked_at
+
+    assert checker.status(now=checked_at + 10)[0]
+    ready, checks = checker.status(now=checked_at + 31)
+    assert not ready
+    assert checks["database"]["stale"] is True
+
+
+def test_background_refresh():
+    check = Check()
+    checker = ReadinessChecker({"sessions": check}, required=[("sessions",)], interval=0.01)
+    checker.start()
+    try:
+        for _ in range(200):
+            if check.calls >= 3:
+                break
+            time.sleep(0.01)
+    finally:
+        checker.close()
+    assert check.calls >= 3
+
+
+def test_telegram_ping_with_fake_api():
+    with FakeTelegramAPI(FakeTelegramConfig(token="1:x")) as api:
+        assert TelegramSender("1:x", "42", api_url=api.url).ping()
+        assert not TelegramSender("2:y", "42", api_url=api.url).ping()
+        # Проба не отправляет сообщений
+        assert api.stats.sent == 0
+
+
+def test_database_ping(tmp_path):
+    repository = ApplicationRepository(url=f"sqlite:///{tmp_path / 'ready.db'}")
+    assert repository.ping()
+
+
+def test_ready_endpoint(monkeypatch):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    database = Check()
+    checker = ReadinessChecker({"database": database}, required=[("database",)])
+    monkeypatch.setattr(lifespan_module, "readiness", checker)
+    monkeypatch.setattr(app_state, "ready", True)
+    client = TestClient(app)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+
+    checker.refresh()
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    # Остановка началась - трафик больше не нужен
+    app_state.ready = False
+    assert client.get("/ready").status_code == 503
+    assert client.get("/health").status_code == 200
+    assert database.calls == 1
@@ -0,0 +1,51 @@
+"""
+Тесты предкомпилированных сообщений ScenarioManager.
+"""
+import sys
+import os
+
+import pytest
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.core.scenario_manager import ScenarioManager, DialogStep, scenario_manager
+
+
+def test_static_messages_are_prerendered():
+    """Постоянные тексты отдаются без форматирования."""
+    message = scenario_manager.get_message(DialogStep.INDIVIDUAL_ASK_PHONE, {"name": "Иван"})
+    assert message is scenario_manager.get_static_message(DialogStep.INDIVIDUAL_ASK_PHONE)
+    assert scenario_manager.get_static_message(DialogStep.INDIVIDUAL_CONFIRM) is None
+
+
+def test_confirm_template_renders_fields():
+    """Шаблон подтверждения подставляет поля с форматом суммы."""
+    data = {
+        "name": "Иван",
+        "collateral": "Kia Sportage, 2021",
+        "amount": 1500000,
+        "purpose": "личные нужды",
+        "phone": "9123456789",
+    }
+    message = scenario_manager.get_message(DialogStep.INDIVIDUAL_CONFIRM, data)
+    assert message == ScenarioManager.MESSAGES[DialogStep.INDIVIDUAL_CONFIRM].format(**data)
+
+
+def test_confirm_template_with_missing_fields():
+    """Несобранные поля не оставляют в ответе сырой шаблон."""
+    message = scenario_manager.get_message(DialogStep.INVESTOR_CONFIRM, {"name": "Анна"})
+    assert "{" not in message
+    assert "Имя: Анна" in message
+    assert "Срок: Не указано мес." in message
+
+
+def test_unknown_template_field_fails_at_compile_time():
+    """Опечатка в имени поля обнаруживается при компиляции."""
+
+    class BrokenScenarioManager(ScenarioManager):
+        MESSAGES = dict(ScenarioManager.MESSAGES)
+        MESSAGES[DialogStep.BUSINESS_CONFIRM] = "Компания: {company}"
+
+    with pytest.raises(ValueError):
+        BrokenScenarioManager()
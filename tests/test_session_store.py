@@ -0,0 +1,34 @@
+"""
+Тесты хранилища сессий в памяти.
+"""
+import sys
+import os
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.core.session_store import SessionStore
+
+
+def test_cleanup_expired():
+    """Удаляются только сессии, которые не обновляли дольше таймаута."""
+    store = SessionStore(timeout_minutes=1)
+    idle = store.create_session()
+    active = store.create_session()
+    store._updated[idle] -= 120
+    store.update_session(active, {"current_step": "individual_ask_name"})
+
+    assert store.cleanup_expired() == 1
+    assert store.get_session(idle) is None
+    assert store.get_session(active).current_step == "individual_ask_name"
+    assert len(store) == 1
+
+
+def test_expired_session_is_not_returned():
+    store = SessionStore(timeout_minutes=1)
+    session_id = store.create_session()
+    store._updated[session_id] = time.time() - 120
+
+    assert store.get_session(session_id) is None
+    assert len(store) == 0
@@ -0,0 +1,184 @@
+"""
+Тесты хранилища сессий в разделяемой памяти.
+"""
+import sys
+import os
+import multiprocessing
+import time
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from backend.core import dialog_manager as dialog_manager_module
+from backend.core.dialog_manager import DialogStateManager
+from backend.core.models import UserType
+from backend.core.shared_session_store import _SLOT, SharedSessionStore, default_path
+from tests.benchmarks.load_test import isolate
+
+DIALOG = [
+    "", "Займ", "Физическое лицо", "Иван Иванов", "Toyota Camry, 2020 год",
+    "1000000", "развитие бизнеса", "89123456789", "Да, отправить заявку",
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SharedSessionStore(path=str(tmp_path / "sessions"), slots=256, slot_bytes=1024)
+    yield store
+    store.close()
+
+
+def test_session_round_trip(store):
+    session_id = store.create_session()
+    session = store.get_session(session_id)
+    assert session.current_step == "welcome"
+    assert session.collected_data == {} and not session.completed
+
+    store.update_session(session_id, {
+        "user_type": UserType.INDIVIDUAL,
+        "current_step": "individual_ask_amount",
+        "collected_data": {"user_type": UserType.INDIVIDUAL, "name": "Иван Иванов", "amount": 1_000_000},
+    })
+    session = store.get_session(session_id)
+    assert session.user_type == UserType.INDIVIDUAL
+    assert session.current_step == "individual_ask_amount"
+    assert session.collected_data["user_type"] is UserType.INDIVIDUAL
+    assert session.collected_data["amount"] == 1_000_000
+    assert len(store) == 1
+
+    store.delete_session(session_id)
+    assert store.get_session(session_id) is None
+    assert len(store) == 0
+
+
+def test_unknown_and_invalid_ids(store):
+    assert store.get_session("") is None
+    assert store.get_session("не-uuid") is None
+    assert store.get_session("00000000-0000-4000-8000-000000000000") is None
+    store.update_session("не-uuid", {"completed": True})
+    store.delete_session("не-uuid")
+
+
+def test_other_process_sees_sessions(store):
+    """Сессию, созданную в одном процессе, продолжает другой."""
+    session_id = store.create_session()
+
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(target=_advance, args=(store.path, session_id))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+
+    session = store.get_session(session_id)
+    assert session.current_step == "ask_loan_or_invest"
+    assert session.collected_data == {"from_pid": process.pid}
+
+
+def _advance(path, session_id):
+    other = SharedSessionStore(path=path, slots=256, slot_bytes=1024)
+    assert other.get_session(session_id).current_step == "welcome"
+    other.update_session(session_id, {"current_step": "ask_loan_or_invest",
+                                      "collected_data": {"from_pid": os.getpid()}})
+    other.close()
+
+
+def test_expired_sessions_free_slots(tmp_path):
+    store = SharedSessionStore(path=str(tmp_path / "sessions"), slots=8, slot_bytes=256, timeout_minutes=1)
+    try:
+        sessions = [store.create_session() for _ in range(8)]
+        with pytest.raises(RuntimeError):
+            store.create_session()
+
+        assert store.cleanup_expired(now=time.time() + 120) == 8
+        assert store.get_session(sessions[0]) is None
+        assert store.create_session()
+    finally:
+        store.close()
+
+
+def test_session_too_large(store):
+    session_id = store.create_session()
+    with pytest.raises(ValueError):
+        store.update_session(session_id, {"collected_data": {"collateral": "x" * 2000}})
+    assert store.get_session(session_id).collected_data == {}
+
+
+def test_layout_change_keeps_file(tmp_path):
+    path = str(tmp_path / "sessions")
+    first = SharedSessionStore(path=path, slots=16, slot_bytes=256)
+    session_id = first.create_session()
+
+    # Файл открыт первым воркером: другие размеры - ошибка, а не разметка заново
+    with pytest.raises(ValueError):
+        SharedSessionStore(path=path, slots=32, slot_bytes=256)
+    assert first.get_session(session_id) is not None
+    first.close()
+
+    same = SharedSessionStore(path=path, slots=16, slot_bytes=256)
+    assert same.get_session(session_id) is not None
+    same.close()
+
+
+def test_default_path_includes_layout():
+    assert default_path(16, 256) != default_path(32, 256)
+    assert default_path(16, 256) != default_path(16, 512)
+
+
+def test_torn_length_is_not_read_past_slot(tmp_path):
+    store = SharedSessionStore(path=str(tmp_path / "sessions"), slots=16, slot_bytes=256)
+    try:
+        session_id = store.create_session()
+        key, index, _ = store._find(session_id)
+        offset = store._offset(index)
+        seq, status, stored_key, updated, _ = _SLOT.unpack_from(store._mm, offset)
+        # Процесс упал посреди записи: нечётный счётчик и испорченная длина
+        _SLOT.pack_into(store._mm, offset, seq + 1, status, stored_key, updated, 60000)
+        status, _, _, payload = store._read(index, key)
+        assert payload is None
+    finally:
+        store.close()
+
+
+def test_dialog_with_shared_store(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(dialog_manager_module, "session_store", store)
+    manager = DialogStateManager()
+    telegram = isolate(manager, str(tmp_path))
+    try:
+        session_id = ""
+        for message in DIALOG:
+            result = manager.process_user_message(session_id, message)
+            session_id = result["session_id"]
+        assert result["completed"]
+
+        manager.notification_queue.flush(timeout=5)
+        assert telegram.sent == 1
+        assert store.get_session(session_id).completed
+    finally:
+        manager.close(timeout=5)
+
+
+def test_oversized_free_text_is_validation_error(tmp_path, monkeypatch):
+    store = SharedSessionStore(path=str(tmp_path / "sessions"), slots=64)
+    monkeypatch.setattr(dialog_manager_module, "session_store", store)
+    manager = DialogStateManager()
+    isolate(manager, str(tmp_path))
+    try:
+        session_id = ""
+        for message in DIALOG[:4]:
+            session_id = manager.process_user_message(session_id, message)["session_id"]
+
+        # ~2800 байт UTF-8 - больше прежнего слота; ответ отклоняется, шаг сохраняется
+        result = manager.process_user_message(session_id, "Автомобиль и квартира в залог " * 50)
+        assert result["step"] == "individual_ask_collateral"
+        assert result["message"].startswith("❌ Слишком длинный ответ")
+
+        longest = "Ж" * 300
+        assert manager.process_user_message(session_id, longest)["step"] == "individual_ask_amount"
+        manager.process_user_message(session_id, "1000000")
+        assert manager.process_user_message(session_id, longest)["step"] == "individual_ask_phone"
+        assert store.get_session(session_id).collected_data["purpose"] == longest
+    finally:
+        manager.close(timeout=5)
+        store.close()
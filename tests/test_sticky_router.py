@@ -0,0 +1,103 @@
+"""
+Тесты липкой маршрутизации: номер воркера в ID сессии и маршрутизатор.
+"""
+import sys
+import os
+import json
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.sticky_router import StickyRouter, parse_upstreams
+from backend.core.config import settings
+from backend.core.session_store import SessionStore
+from backend.core.sharding import make_session_id, session_worker
+
+UPSTREAMS = ["http://worker0", "http://worker1", "http://worker2"]
+
+
+def test_session_id_carries_worker():
+    assert session_worker(make_session_id(7)) == 7
+    assert session_worker(make_session_id()) is None
+    assert session_worker("") is None
+    assert session_worker("abc.def") is None
+    assert session_worker("12345.x") is None
+
+
+def test_store_uses_worker_id(monkeypatch):
+    monkeypatch.setattr(settings, "worker_id", 2)
+    store = SessionStore()
+    session_id = store.create_session()
+    assert session_id.startswith("2.")
+    assert store.get_session(session_id).session_id == session_id
+
+
+def test_parse_upstreams():
+    assert parse_upstreams(["http://a:1/", "5=http://b:2"]) == {0: "http://a:1", 5: "http://b:2"}
+
+
+def test_route_by_session():
+    router = StickyRouter(UPSTREAMS)
+    session_id = make_session_id(2)
+
+    assert router.route("POST", "/api/v1/chat", {}, json.dumps({"session_id": session_id}).encode()) == 2
+    assert router.route("GET", f"/api/v1/chat/state/{session_id}", {}, b"") == 2
+    assert router.route("POST", "/api/v1/chat/quick-start", {b"x-session-id": session_id.encode()}, b"") == 2
+
+    # Новые сессии и неразборчивые запросы - по кругу
+    assert [router.route("POST", "/api/v1/chat", {}, b'{"message": ""}') for _ in range(4)] == [0, 1, 2, 0]
+    assert router.route("POST", "/api/v1/chat", {}, b"not json") in (0, 1, 2)
+
+
+def test_draining_worker_keeps_its_sessions():
+    router = StickyRouter(UPSTREAMS, draining=[1])
+    assert router.route("POST", "/api/v1/chat", {}, json.dumps({"session_id": make_session_id(1)}).encode()) == 1
+    assert {router.route("POST", "/api/v1/chat", {}, b"{}") for _ in range(10)} == {0, 2}
+
+    # Сессии удалённого воркера уходят активным (диалог начнётся заново)
+    removed = StickyRouter(UPSTREAMS[:2])
+    assert removed.route("POST", "/api/v1/chat", {}, json.dumps({"session_id": make_session_id(2)}).encode()) in (0, 1)
+
+    with pytest.raises(ValueError):
+        StickyRouter(UPSTREAMS[:1], draining=[0])
+
+
+def test_proxy_forwards_to_session_worker():
+    seen = []
+
+    def worker(request: httpx.Request) -> httpx.Response:
+        number = int(request.url.host[-1])
+        seen.append((number, request.url.path, request.headers.get("x-forwarded-for")))
+        body = json.loads(request.content or b"{}")
+        payload = json.dumps({"session_id": body.get("session_id") or make_session_id(number)}).encode()
+        # Поток, как у настоящего соединения (ответ с json= MockTransport отдаёт уже прочитанным)
+        return httpx.Response(200, stream=httpx.ByteStream(payload),
+                              headers={"X-Worker": str(number), "Content-Type": "application/json"})
+
+    router = StickyRouter(UPSTREAMS)
+    router._client = httpx.AsyncClient(transport=httpx.MockTransport(worker))
+    client = TestClient(router)
+
+    session_id = client.post("/api/v1/chat", json={"message": ""}).json()["session_id"]
+    owner = session_worker(session_id)
+    for _ in range(3):
+        response = client.post("/api/v1/chat", json={"session_id": session_id, "message": "Займ"})
+        assert response.headers["X-Worker"] == str(owner)
+
+    assert [number for number, _, _ in seen[1:]] == [owner] * 3
+    assert seen[0][2] == "testclient"
+
+    assert client.post("/api/v1/chat", content=b"x" * (router.max_body + 1)).status_code == 413
+
+
+def test_unavailable_worker_returns_502():
+    def down(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    router = StickyRouter(UPSTREAMS)
+    router._client = httpx.AsyncClient(transport=httpx.MockTransport(down))
+    assert TestClient(router).get("/health").status_code == 502
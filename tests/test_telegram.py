@@ -6,10 +6,11 @@ load_dotenv()
 
 TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org').rstrip('/')
 
 
 def send_test_message():
-    url = f'https://api.telegram.org/bot{TOKEN}/sendMessage'
+    url = f'{API_URL}/bot{TOKEN}/sendMessage'
 
     data = {
         'chat_id': CHAT_ID,
@@ -0,0 +1,174 @@
+"""
+Тесты журнала переписки.
+"""
+import sys
+import os
+import json
+import multiprocessing
+import time
+from unittest.mock import Mock
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+
+from backend.api.admin import get_transcript_log
+from backend.core.config import settings
+from backend.core.dialog_manager import DialogStateManager
+from backend.core.transcripts import TranscriptLog
+from backend.db.export import export_transcripts
+from backend.main import app
+
+
+def make_log(tmp_path, **kwargs) -> TranscriptLog:
+    return TranscriptLog(directory=str(tmp_path / "transcripts"), fsync_interval=0.05, **kwargs)
+
+
+def test_append_and_lookup(tmp_path):
+    """Записи сессии находятся по индексу в порядке записи."""
+    log = make_log(tmp_path)
+    for i in range(50):
+        log.append(f"s{i % 5}", "welcome", f"ввод {i}", f"ответ {i}")
+    assert log.flush(timeout=5)
+
+    records = log.get_transcript("s3")
+    assert [record["in"] for record in records] == [f"ввод {i}" for i in range(3, 50, 5)]
+    assert records[0]["out"] == "ответ 3"
+    assert log.get_transcript("нет такой") == []
+    log.close(timeout=5)
+
+
+def test_rotation_and_restart(tmp_path):
+    """Сегменты ротируются по размеру, индекс восстанавливается после перезапуска."""
+    log = make_log(tmp_path, segment_max_bytes=500)
+    for i in range(40):
+        log.append("session", "step", "x" * 20, f"ответ {i}")
+    assert log.close(timeout=5)
+
+    segments = os.listdir(tmp_path / "transcripts")
+    assert len(segments) > 1
+
+    restored = make_log(tmp_path)
+    assert [record["out"] for record in restored.get_transcript("session")] == [f"ответ {i}" for i in range(40)]
+
+    # После перезапуска запись идёт в новый сегмент
+    restored.append("session", "step", "ещё", "ответ")
+    assert restored.close(timeout=5)
+    assert len(os.listdir(tmp_path / "transcripts")) == len(segments) + 1
+    assert len(make_log(tmp_path).get_transcript("session")) == 41
+
+
+def test_retention_sweep(tmp_path):
+    """Сегменты старше срока хранения удаляются вместе с записями индекса."""
+    log = make_log(tmp_path, retention_hours=1)
+    log.append("old", "step", "ввод", "ответ")
+    assert log.close(timeout=5)
+
+    log = make_log(tmp_path, retention_hours=1)
+    assert "old" in log
+    assert log.sweep(now=time.time() + 2 * 3600) == 1
+    assert "old" not in log
+    assert os.listdir(tmp_path / "transcripts") == []
+
+
+def test_sweep_keeps_segments_in_use(tmp_path):
+    """Чужой открытый сегмент не удаляется; свой простаивающий закрывается и удаляется."""
+    directory = str(tmp_path / "transcripts")
+    other = TranscriptLog(directory=directory, fsync_interval=0.05, writer="w1", retention_hours=1)
+    other.append("s", "step", "ввод", "ответ")
+    assert other.flush(timeout=5)
+
+    log = TranscriptLog(directory=directory, fsync_interval=0.05, writer="w0", retention_hours=1)
+    assert log.sweep(now=time.time() + 2 * 3600) == 0
+    assert "s" in log
+
+    # Воркер w1 простаивает дольше срока хранения: его поток закрывает сегмент
+    path = os.path.join(directory, "transcript-w1-00000001.jsonl")
+    os.utime(path, (time.time() - 2 * 3600,) * 2)
+    other._last_sweep = 0.0
+    deadline = time.time() + 5
+    while os.path.exists(path) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not os.path.exists(path)
+    assert "s" not in log
+
+    # Следующая запись идёт в новый сегмент
+    other.append("s", "step", "снова", "ответ")
+    assert other.close(timeout=5)
+    assert os.listdir(directory) == ["transcript-w1-00000002.jsonl"]
+    log.close(timeout=5)
+
+
+def test_dialog_is_recorded(tmp_path):
+    """Менеджер диалога пишет каждый обмен в журнал."""
+    manager = DialogStateManager()
+    manager._notification_service = Mock()
+    manager._application_repository = Mock()
+    manager._funnel_recorder = Mock()
+    manager._transcript_log = make_log(tmp_path)
+
+    session_id = manager.process_user_message("", "")["session_id"]
+    manager.process_user_message(session_id, "Займ")
+    assert manager.transcript_log.flush(timeout=5)
+
+    records = manager.transcript_log.get_transcript(session_id)
+    assert [record["in"] for record in records] == ["", "Займ"]
+    assert records[1]["step"] == "ask_individual_or_business"
+    manager.transcript_log.close(timeout=5)
+
+
+def test_export_and_endpoint(tmp_path, monkeypatch):
+    log = make_log(tmp_path)
+    log.append("s1", "welcome", "привет", "ответ, с запятой")
+    log.append("s2", "welcome", "", "ответ")
+    assert log.flush(timeout=5)
+
+    lines = b"".join(export_transcripts(log, "jsonl")).decode().splitlines()
+    assert [json.loads(line)["s"] for line in lines] == ["s1", "s2"]
+    csv_text = b"".join(export_transcripts(log, "csv")).decode()
+    assert csv_text.splitlines()[0] == "session_id,timestamp,step,user_message,bot_message"
+    assert '"ответ, с запятой"' in csv_text
+
+    monkeypatch.setattr(settings, "admin_token", "token")
+    app.dependency_overrides[get_transcript_log] = lambda: log
+    try:
+        client = TestClient(app, headers={"X-Admin-Token": "token"})
+        assert client.get("/api/v1/admin/transcripts/s1").json()["records"][0]["in"] == "привет"
+        assert client.get("/api/v1/admin/transcripts/none").status_code == 404
+        assert len(client.get("/api/v1/admin/export/transcripts").text.splitlines()) == 2
+    finally:
+        app.dependency_overrides.clear()
+        log.close(timeout=5)
+
+
+def _write_from_worker(directory, session_id):
+    log = TranscriptLog(directory=directory, fsync_interval=0.05, writer="w1")
+    log.append(session_id, "ask_individual_or_business", "Займ", "ответ воркера 1")
+    assert log.close(timeout=5)
+
+
+def test_two_workers_share_directory(tmp_path):
+    """Оба воркера пишут журнал, переписка сессии собирается из сегментов обоих."""
+    directory = str(tmp_path / "transcripts")
+    log = TranscriptLog(directory=directory, fsync_interval=0.05, writer="w0")
+    log.append("s", "welcome", "", "ответ воркера 0")
+    assert log.flush(timeout=5)
+    assert [record["out"] for record in log.get_transcript("s")] == ["ответ воркера 0"]
+
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(target=_write_from_worker, args=(directory, "s"))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+
+    log.append("s", "individual_ask_name", "Физическое лицо", "снова воркер 0")
+    assert log.flush(timeout=5)
+    assert [record["out"] for record in log.get_transcript("s")] == [
+        "ответ воркера 0", "ответ воркера 1", "снова воркер 0"]
+    assert sorted(os.listdir(directory)) == ["transcript-w0-00000001.jsonl", "transcript-w1-00000001.jsonl"]
+
+    # Сегмент другого воркера, удалённый по сроку хранения, пропадает из индекса
+    os.remove(os.path.join(directory, "transcript-w1-00000001.jsonl"))
+    assert len(log.get_transcript("s")) == 2
+    log.close(timeout=5)
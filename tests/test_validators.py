@@ -0,0 +1,90 @@
+"""
+Тесты валидаторов данных.
+"""
+import sys
+import os
+
+import pytest
+
+# Добавляем путь к проекту
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.core.validators import validators, parse_amount
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1000000", 1_000_000),
+    ("1 000 000", 1_000_000),
+    ("1\xa0000\xa0000", 1_000_000),
+    ("1,000,000", 1_000_000),
+    ("100.000", 100_000),
+    ("1.5 млн", 1_500_000),
+    ("1,5 млн", 1_500_000),
+    ("500к", 500_000),
+    ("500 K", 500_000),
+    ("250 тыс. руб.", 250_000),
+    ("2 миллиона", 2_000_000),
+    ("3млн руб", 3_000_000),
+    ("12 000,50 ₽", 12_000),
+    ("сто тысяч", None),
+])
+def test_parse_amount(text, expected):
+    """Разбор распространённых форматов суммы."""
+    assert parse_amount(text) == expected
+
+
+def test_validate_amount_limits_and_fallback():
+    """Границы суммы и медленный путь для произвольного текста."""
+    assert validators.validate_amount("около 500000 рублей") == (True, 500_000)
+    assert validators.validate_amount("5000")[0] is False
+    assert validators.validate_amount("1.2 млрд")[0] is False
+    assert validators.validate_amount("abc") == (False, "Введите корректную сумму (только цифры)")
+
+
+def test_validate_term_months_units():
+    """Срок принимается в месяцах и годах."""
+    assert validators.validate_term_months("12") == (True, 12)
+    assert validators.validate_term_months("18 мес.") == (True, 18)
+    assert validators.validate_term_months("2 года") == (True, 24)
+    assert validators.validate_term_months("20 лет")[0] is False
+    assert validators.validate_term_months("долго")[0] is False
+
+
+def test_validate_many_matches_single_validators():
+    """Пакетная проверка даёт те же результаты, что и поштучная."""
+    columns = {
+        "name": ["Иван", "A", "Иван", "R2D2"],
+        "phone": ["89123456789", "+7 (912) 345-67-89", "123", "89123456789"],
+        "amount": ["500к", "1 000 000", "10", "500к"],
+        "term_months": ["12", "0", "1 год", "12"],
+        "company_name": ["ООО Ромашка", "ИП Иванов", "ИП Иванов Иван", "X"],
+    }
+
+    results = validators.validate_many(columns)
+
+    for field, values in columns.items():
+        validator = validators.get_field_validator(field)
+        assert results[field] == [validator(value) for value in values]
+
+
+def test_validate_many_unknown_field():
+    """Неизвестное поле - ошибка, а не молчаливый пропуск."""
+    with pytest.raises(ValueError):
+        validators.validate_many({"email": ["a@b.c"]})
+
+
+def test_validate_text_length():
+    assert validators.validate_text("  Kia Rio,\n2020\x00 год ") == (True, "Kia Rio, 2020 год")
+    assert validators.validate_text("Ж" * 300)[0]
+    is_valid, error = validators.validate_text("Ж" * 301)
+    assert not is_valid and "300" in error
+    assert not validators.validate_company_name("ООО " + "Ж" * 200)[0]
+
+
+@pytest.mark.parametrize("text", ["²", "12²", "1 2²"])
+def test_superscript_digits_are_not_numbers(text):
+    # str.isdigit() верно для "²", но int() такие символы не принимает
+    assert parse_amount(text) is None
+    assert not validators.validate_amount(text)[0]
+    assert not validators.validate_term_months(text)[0]
+    assert [is_valid for is_valid, _ in validators.validate_many({"amount": [text]})["amount"]] == [False]